@@ -0,0 +1,76 @@
+"""
+Benchmark the streaming DOCX extractor against the python-docx object model.
+
+Usage:
+    python -m benchmarks.bench_docx [--paragraphs 200,2000,20000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+import tracemalloc
+from io import BytesIO
+import docx
+from src.extractors.docx import DocxExtractor
+
+
+def make_document(paragraphs: int) -> bytes:
+    """Build a document with a header, a table and `paragraphs` paragraphs."""
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = "Invoice No. INV-0042"
+    table = document.add_table(rows=20, cols=4)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = "Item 12.50"
+    for index in range(paragraphs):
+        document.add_paragraph(f"Line {index}: payment terms are 30 days net.")
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_extract(content: bytes) -> str:
+    """The original DocxExtractor: full object model, body paragraphs only."""
+    doc = docx.Document(BytesIO(content))
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\n"
+    return text.strip()
+
+
+def peak_kib(func) -> float:
+    """Peak Python allocation of one call, in KiB."""
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paragraphs", default="200,2000,20000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extractor = DocxExtractor()
+
+    def best(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+
+    print(
+        f"{'paragraphs':>10}{'KiB':>8}{'legacy ms':>11}{'stream ms':>11}"
+        f"{'legacy peak KiB':>17}{'stream peak KiB':>17}"
+    )
+    for count in (int(value) for value in args.paragraphs.split(",")):
+        content = make_document(count)
+        legacy = best(lambda: legacy_extract(content))
+        stream = best(lambda: extractor._extract_text_handler(content))
+        print(
+            f"{count:>10}{len(content) // 1024:>8}{legacy:>11.1f}{stream:>11.1f}"
+            f"{peak_kib(lambda: legacy_extract(content)):>17.0f}"
+            f"{peak_kib(lambda: extractor._extract_text_handler(content)):>17.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark the precompiled filename matcher against the per-type loops.
+
+Usage:
+    python -m benchmarks.bench_filename [--patterns 1000] [--filenames 500]
+"""
+
+import argparse
+import random
+import string
+import timeit
+from typing import Dict, List, Optional, Tuple
+from rapidfuzz import process
+from src.classifiers.matchers import FilenameMatcher
+from src.config import config
+
+
+def make_patterns(per_type: int, seed: int = 0) -> Dict[str, List[str]]:
+    """Pad the configured filename patterns with random words."""
+    rng = random.Random(seed)
+    patterns = config.patterns.model_dump()
+    for sources in patterns.values():
+        while len(sources) < per_type:
+            sources.append(
+                "".join(rng.choice(string.ascii_lowercase) for _ in range(8))
+            )
+    return patterns
+
+
+def legacy_substring(patterns: Dict[str, List[str]], filename: str) -> Optional[str]:
+    """The original FilenameClassifier loop."""
+    for doc_type, sources in patterns.items():
+        if any(pattern in filename for pattern in sources):
+            return doc_type
+    return None
+
+
+def legacy_fuzzy(
+    patterns: Dict[str, List[str]], filename: str
+) -> Tuple[Optional[str], float]:
+    """The original FuzzyClassifier loop: one extractOne per type."""
+    best_match, best_score = None, 0
+    for doc_type, sources in patterns.items():
+        match = process.extractOne(filename, sources)
+        if match and match[1] > best_score:
+            best_match, best_score = doc_type, match[1]
+    return best_match, best_score
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--patterns", type=int, default=1000, help="per type")
+    parser.add_argument("--filenames", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    patterns = make_patterns(args.patterns)
+    cutoff = config.classifier.similarity_threshold
+    matcher = FilenameMatcher(patterns)
+    rng = random.Random(1)
+    words = ["scan", "2024", "final", "copy", "bank", "invoice", "doc", "img"]
+    filenames = [
+        "_".join(rng.choice(words) for _ in range(3)) + ".pdf"
+        for _ in range(args.filenames)
+    ]
+
+    def time_it(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    rows = [
+        (
+            "substring",
+            time_it(lambda: [legacy_substring(patterns, f) for f in filenames]),
+            time_it(lambda: [matcher.substring_match(f) for f in filenames]),
+            time_it(lambda: matcher.substring_matches(filenames)),
+        ),
+        (
+            "fuzzy",
+            time_it(lambda: [legacy_fuzzy(patterns, f) for f in filenames]),
+            time_it(lambda: [matcher.fuzzy_match(f, cutoff) for f in filenames]),
+            time_it(lambda: matcher.fuzzy_matches(filenames, cutoff)),
+        ),
+    ]
+    count = len(filenames)
+    print(f"{sum(map(len, patterns.values()))} patterns, {count} filenames")
+    print(f"{'stage':<12}{'loop us':>10}{'single us':>11}{'batch us':>10}")
+    for name, loop, single, batch in rows:
+        print(
+            f"{name:<12}{loop / count * 1e6:>10.1f}"
+            f"{single / count * 1e6:>11.1f}{batch / count * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark the OCR pipeline against full-resolution pytesseract calls.
+
+Usage:
+    python -m benchmarks.bench_ocr [--files files] [--repeat 3] [--upscale 4000]
+"""
+
+import argparse
+import glob
+import os
+import timeit
+from io import BytesIO
+from typing import List, Tuple
+from PIL import Image
+from src.config import OCRConfig
+from src.ocr import engine
+from src.ocr.preprocess import load_image, preprocess
+
+
+def load_samples(directory: str, upscale: int) -> List[Tuple[str, bytes]]:
+    """Read the sample images, plus phone-sized copies when `upscale` is set."""
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        if path.lower().endswith((".jpg", ".jpeg", ".png")):
+            with open(path, "rb") as f:
+                samples.append((os.path.basename(path), f.read()))
+    if upscale:
+        for name, content in list(samples):
+            image = Image.open(BytesIO(content)).convert("RGB")
+            height = upscale * image.height // image.width
+            buffer = BytesIO()
+            image.resize((upscale, height)).save(buffer, "JPEG", quality=90)
+            samples.append((f"{name}@{upscale}px", buffer.getvalue()))
+    return samples
+
+
+def legacy_ocr(content: bytes) -> str:
+    """The original ImageExtractor: full-resolution image, one tesseract run."""
+    import pytesseract
+
+    return pytesseract.image_to_string(Image.open(BytesIO(content))).strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", default="files")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--upscale", type=int, default=4000, help="0 to disable")
+    args = parser.parse_args()
+
+    settings = OCRConfig()
+    samples = load_samples(args.files, args.upscale)
+
+    def best(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=args.repeat)) * 1000
+
+    try:
+        legacy_ocr(samples[0][1])
+        has_tesseract = True
+    except Exception as e:
+        print(f"OCR columns skipped, tesseract is not available: {e}")
+        has_tesseract = False
+
+    print(
+        f"{'image':<36}{'pixels':>10}{'prep ms':>9}"
+        f"{'legacy ms':>11}{'cold ms':>9}{'cached ms':>11}"
+    )
+    for name, content in samples:
+        size = Image.open(BytesIO(content)).size
+        prep = best(lambda: preprocess(load_image(content, settings), settings))
+        row = f"{name:<36}{size[0] * size[1]:>10}{prep:>9.1f}"
+        if has_tesseract:
+            legacy = best(lambda: legacy_ocr(content))
+
+            def cold() -> None:
+                engine._get_engine(settings)
+                engine._cache = engine.OCRCache(settings.cache_max_entries)
+                engine.recognize(content, settings)
+
+            cold_ms = best(cold)
+            cached = best(lambda: engine.recognize(content, settings))
+            row += f"{legacy:>11.1f}{cold_ms:>9.1f}{cached:>11.1f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
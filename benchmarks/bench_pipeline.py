@@ -0,0 +1,216 @@
+"""
+Micro-benchmark every extractor and classifier over the sample corpus.
+
+The corpus is the files in `files/` plus synthetic large PDFs, images,
+spreadsheets and Word documents. Extractors are timed in-process on their
+handlers; classifiers are timed on documents whose text is already
+extracted; the pipeline cases time the whole classifier chain on a fresh
+document, extraction included, under a neutral filename so the filename
+classifiers cannot answer before the content ones run.
+
+With --corpus, the documents of a corpus written by `src.corpus.generate`
+are used instead.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--files files] [--repeat 5]
+        [--corpus corpus] [--limit 100] [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import glob
+import logging
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+from io import BytesIO
+from typing import Awaitable, Callable, List, Optional, Tuple
+from fastapi import UploadFile
+from benchmarks import report, synthetic
+from benchmarks.bench_docx import make_document
+from src.classifier import prepare_classifiers
+from src.config import config
+from src.corpus.generate import load_manifest
+from src.document import DocumentContext
+from src.extractors.executor import executor
+from src.extractors.factory import TextExtractorFactory
+from src.snapshot import current
+
+# A named file and its bytes
+Sample = Tuple[str, bytes]
+
+
+def load_corpus(
+    directory: str, corpus: Optional[str] = None, limit: Optional[int] = None
+) -> List[Sample]:
+    """
+    Read the benchmark samples.
+
+    Args:
+        directory: Directory of sample files, used without a corpus
+        corpus: Generated corpus directory or manifest to read instead
+        limit: Maximum number of corpus documents to read
+
+    Returns:
+        List[Sample]: The sample files, plus synthetic large ones when no
+            corpus is given
+    """
+    if corpus:
+        samples = []
+        for entry in load_manifest(corpus, limit):
+            with open(entry["path"], "rb") as f:
+                samples.append((entry["filename"], f.read()))
+        return samples
+
+    samples = []
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        with open(path, "rb") as f:
+            samples.append((os.path.basename(path), f.read()))
+    samples += [
+        ("synthetic_statement_50p.pdf", synthetic.make_pdf(50)),
+        ("synthetic_photo_4000px.jpg", synthetic.make_image(3000, 4000)),
+        ("synthetic_scan_2000px.png", synthetic.make_image(1500, 2000, 1, "PNG")),
+        ("synthetic_ledger_5x2000.xlsx", synthetic.make_xlsx(5, 2000, 20)),
+        ("synthetic_export_50000.csv", synthetic.make_csv(50000, 20)),
+        ("synthetic_report_5000.docx", make_document(5000)),
+        (
+            "synthetic_notes_1mb.txt",
+            "\n".join(synthetic.make_lines(15000)).encode(),
+        ),
+    ]
+    return samples
+
+
+def peak_mib(func: Callable[[], object]) -> float:
+    """Peak Python allocation of one call, in MiB."""
+    tracemalloc.start()
+    try:
+        func()
+    finally:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+async def best_ms(func: Callable[[], Awaitable[object]], repeat: int) -> float:
+    """Fastest of `repeat` awaited calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_extractors(samples: List[Sample], repeat: int) -> report.Results:
+    """Time each sample's extractor handler and measure its peak memory."""
+    results: report.Results = {}
+    for name, content in samples:
+        file = UploadFile(file=BytesIO(content), filename=name)
+        mime_type = TextExtractorFactory.detect_mime_type(content)
+        extractor = TextExtractorFactory.get_extractor(file, mime_type=mime_type)
+        case = f"extract/{type(extractor).__name__}/{name}"
+
+        def extract() -> object:
+            return extractor._extract_pages_handler(content, 0, None)
+
+        try:
+            extract()
+        except Exception as e:
+            print(f"{case}: skipped, {e}")
+            continue
+        results[case] = {
+            "best_ms": min(timeit.repeat(extract, number=1, repeat=repeat)) * 1000,
+            "peak_mib": peak_mib(extract),
+            "size_kib": len(content) / 1024,
+        }
+    return results
+
+
+async def bench_classifiers(samples: List[Sample], repeat: int) -> report.Results:
+    """Time each classifier on pre-extracted documents and the full chain."""
+    results: report.Results = {}
+    for name, content in samples:
+        document = DocumentContext(UploadFile(file=BytesIO(content), filename=name))
+        try:
+            await document.get_text()
+        except Exception as e:
+            # Classifiers still run; content ones fail fast on the memoized error
+            print(f"{name}: text unavailable, {e}")
+
+        snapshot = current()
+        for c in snapshot.classifiers:
+            results[f"classify/{type(c).__name__}/{name}"] = {
+                "best_ms": await best_ms(lambda: c.classify(document), repeat)
+            }
+
+        upload_name = "upload." + name.rsplit(".", 1)[-1]
+
+        def fresh() -> Awaitable[object]:
+            return snapshot.classifier.classify(
+                DocumentContext(
+                    UploadFile(file=BytesIO(content), filename=upload_name)
+                )
+            )
+
+        results[f"pipeline/{name}"] = {"best_ms": await best_ms(fresh, repeat)}
+    return results
+
+
+async def run(samples: List[Sample], repeat: int) -> report.Results:
+    """Run the classifier benchmarks with the extraction pools started."""
+    executor.start()
+    try:
+        return await bench_classifiers(samples, repeat)
+    finally:
+        executor.shutdown(wait=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", default="files")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", help="generated corpus to use instead")
+    parser.add_argument("--limit", type=int, help="corpus documents to use")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # Failures are part of the run, such as OCR without tesseract
+    logging.disable(logging.ERROR)
+
+    # Measure the work itself, not cache or admission behaviour
+    config.cache.enabled = False
+    config.admission.enabled = False
+    prepare_classifiers()
+    samples = load_corpus(args.files, args.corpus, args.limit)
+
+    results = bench_extractors(samples, args.repeat)
+    results.update(asyncio.run(run(samples, args.repeat)))
+
+    print(f"\n{'case':<72}{'best ms':>10}{'peak MiB':>10}")
+    for case, metrics in results.items():
+        peak = metrics.get("peak_mib")
+        print(
+            f"{case:<72}{metrics['best_ms']:>10.2f}"
+            f"{'' if peak is None else f'{peak:.2f}':>10}"
+        )
+
+    if args.output:
+        report.save(
+            args.output,
+            "pipeline",
+            results,
+            repeat=args.repeat,
+            corpus=args.corpus,
+            limit=args.limit,
+        )
+    if args.baseline:
+        print()
+        sys.exit(report.check(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark the single-pass regex matcher against the per-pattern loop.
+
+Usage:
+    python -m benchmarks.bench_regex [--pages 200] [--repeat 5]
+"""
+
+import argparse
+import random
+import re
+import timeit
+from typing import Dict, List, Optional, Pattern
+from src.classifiers.matchers import MultiPatternMatcher
+from src.config import config
+
+FILLER_WORDS = (
+    "date description amount deposit withdrawal transfer ref payee merchant "
+    "card the of and to usd total posted pending fee interest"
+).split()
+
+
+def make_text(pages: int, needle: str, position: str, seed: int = 0) -> str:
+    """Build a statement-like text with an optional needle phrase."""
+    rng = random.Random(seed)
+    lines = [
+        " ".join(rng.choice(FILLER_WORDS) for _ in range(12))
+        for _ in range(pages * 50)
+    ]
+    if needle:
+        index = {"start": 0, "middle": len(lines) // 2, "end": len(lines) - 1}
+        lines.insert(index[position], needle)
+    return "\n".join(lines)
+
+
+def legacy_first_match(
+    patterns: Dict[str, List[Pattern[str]]], text: str
+) -> Optional[str]:
+    """The original RegexClassifier loop: one search per pattern."""
+    for doc_type, regex_patterns in patterns.items():
+        if any(pattern.search(text) for pattern in regex_patterns):
+            return doc_type
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sources = config.regex_patterns.model_dump()
+    legacy = {
+        doc_type: [re.compile(p, re.IGNORECASE) for p in patterns]
+        for doc_type, patterns in sources.items()
+    }
+    matcher = MultiPatternMatcher(sources)
+
+    cases = [
+        ("no match", "", "end"),
+        ("invoice at start", "INVOICE NUMBER 42", "start"),
+        ("invoice at end", "INVOICE NUMBER 42", "end"),
+        ("licence at end", "Driver's permit DL number 1234", "end"),
+    ]
+    print(f"{'case':<20}{'chars':>10}{'loop ms':>10}{'single ms':>11}{'speedup':>9}")
+    for name, needle, position in cases:
+        text = make_text(args.pages, needle, position)
+        assert legacy_first_match(legacy, text) == matcher.first_match(text)
+        loop = min(
+            timeit.repeat(
+                lambda: legacy_first_match(legacy, text), number=1, repeat=args.repeat
+            )
+        )
+        single = min(
+            timeit.repeat(
+                lambda: matcher.first_match(text), number=1, repeat=args.repeat
+            )
+        )
+        counts = min(
+            timeit.repeat(
+                lambda: matcher.count_matches(text), number=1, repeat=args.repeat
+            )
+        )
+        print(
+            f"{name:<20}{len(text):>10}{loop * 1000:>10.1f}"
+            f"{single * 1000:>11.1f}{loop / single:>8.1f}x"
+        )
+        print(f"{'  (all counts)':<30}{'':>10}{counts * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
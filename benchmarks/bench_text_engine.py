@@ -0,0 +1,181 @@
+"""
+Compare the TF-IDF and hashing text engines on memory, latency and accuracy.
+
+Each engine is trained on synthetic documents from `src.corpus.content` at
+every training size, then measured on held-out documents: training time and
+peak allocation, the size of the pickled model, single-document prediction
+latency and accuracy. The online case times adding a batch of new examples:
+a `partial_fit` update for the hashing engines, a full refit for TF-IDF.
+
+Usage:
+    python -m benchmarks.bench_text_engine [--sizes 300,1200] [--test 300]
+        [--update 32] [--languages en] [--repeat 3] [--output results.json] [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import io
+import logging
+import random
+import sys
+import timeit
+from typing import Callable, Dict, List, Sequence, Tuple
+import joblib
+from benchmarks import report
+from benchmarks.bench_pipeline import peak_mib
+from src.classifiers.hashing import HashingClassifier
+from src.classifiers.tfidf import TFIDFClassifier
+from src.config import config
+from src.corpus.content import LABELS, make_document
+
+# Engine case names and how to build each
+ENGINES: Dict[str, Callable[[], TFIDFClassifier]] = {
+    "tfidf": TFIDFClassifier,
+    "hashing-sgd": lambda: _hashing("sgd"),
+    "hashing-nb": lambda: _hashing("nb"),
+}
+
+
+def _hashing(model: str) -> HashingClassifier:
+    """Build a hashing classifier with the given linear model."""
+    settings = config.model_copy(deep=True)
+    settings.classifier.hashing_model = model
+    return HashingClassifier(settings)
+
+
+def make_examples(
+    count: int, languages: Sequence[str], seed: str
+) -> Tuple[List[str], List[str]]:
+    """Generate `count` labelled document texts, taking the labels in turn."""
+    texts, labels = [], []
+    for index in range(count):
+        rng = random.Random(f"{seed}:{index}")
+        label = LABELS[index % len(LABELS)]
+        document = make_document(rng, label, rng.choice(languages), rng.randint(1, 2))
+        texts.append("\n".join(document.lines()))
+        labels.append(label)
+    return texts, labels
+
+
+def _grouped(texts: List[str], labels: List[str]) -> Dict[str, List[str]]:
+    """Key example texts by label, as the classifiers train on them."""
+    training_data: Dict[str, List[str]] = {}
+    for text, label in zip(texts, labels):
+        training_data.setdefault(label, []).append(text)
+    return training_data
+
+
+def model_mib(classifier: TFIDFClassifier) -> float:
+    """Size of the pickled vectorizer and model, in MiB."""
+    buffer = io.BytesIO()
+    joblib.dump((classifier.vectorizer, classifier.classifier), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def bench_engine(
+    name: str,
+    train: Tuple[List[str], List[str]],
+    test: Tuple[List[str], List[str]],
+    new: Tuple[List[str], List[str]],
+    repeat: int,
+) -> Dict[str, float]:
+    """Train one engine and measure it; see the module docstring."""
+    training_data = _grouped(*train)
+
+    def fit() -> TFIDFClassifier:
+        classifier = ENGINES[name]()
+        classifier.train(training_data)
+        return classifier
+
+    train_ms = min(timeit.repeat(fit, number=1, repeat=repeat)) * 1000
+    train_peak = peak_mib(fit)
+    classifier = fit()
+
+    texts, labels = test
+    predicted = classifier.classifier.predict(classifier.vectorizer.transform(texts))
+    accuracy = sum(p == label for p, label in zip(predicted, labels)) / len(labels)
+
+    # One document at a time, as requests arrive
+    sample = texts[:50]
+
+    def predict_each() -> None:
+        for text in sample:
+            X = classifier.vectorizer.transform([text])
+            classifier.classifier.predict_proba(X)
+
+    predict_seconds = min(timeit.repeat(predict_each, number=1, repeat=repeat))
+
+    if isinstance(classifier, HashingClassifier):
+        update_ms = min(
+            timeit.repeat(lambda: classifier.update(*new), number=1, repeat=repeat)
+        )
+    else:
+        combined = _grouped(train[0] + new[0], train[1] + new[1])
+
+        def refit() -> None:
+            ENGINES[name]().train(combined)
+
+        update_ms = min(timeit.repeat(refit, number=1, repeat=repeat))
+
+    return {
+        "train_ms": train_ms,
+        "train_peak_mib": train_peak,
+        "model_mib": model_mib(classifier),
+        "predict_ms": predict_seconds * 1000 / len(sample),
+        "update_ms": update_ms * 1000,
+        "accuracy": accuracy,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="300,1200", help="training set sizes")
+    parser.add_argument("--test", type=int, default=300, help="held-out documents")
+    parser.add_argument("--update", type=int, default=32, help="online batch size")
+    parser.add_argument("--languages", default="en")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    languages = args.languages.split(",")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    test = make_examples(args.test, languages, "test")
+    new = make_examples(args.update, languages, "update")
+
+    results: report.Results = {}
+    for size in sizes:
+        train = make_examples(size, languages, "train")
+        for name in ENGINES:
+            results[f"{name}/n={size}"] = bench_engine(
+                name, train, test, new, args.repeat
+            )
+
+    columns = ("train_ms", "train_peak_mib", "model_mib", "predict_ms", "update_ms")
+    print(f"{'case':<22}" + "".join(f"{c:>16}" for c in columns) + f"{'accuracy':>10}")
+    for case, metrics in results.items():
+        print(
+            f"{case:<22}"
+            + "".join(f"{metrics[c]:>16.3f}" for c in columns)
+            + f"{metrics['accuracy']:>10.3f}"
+        )
+
+    if args.output:
+        report.save(
+            args.output,
+            "text_engine",
+            results,
+            sizes=sizes,
+            test=args.test,
+            update=args.update,
+            languages=languages,
+            repeat=args.repeat,
+        )
+    if args.baseline:
+        print()
+        sys.exit(report.check(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Drive /classify_file in-process at a fixed concurrency and report latency.
+
+Requests go through the ASGI app directly, with the app's lifespan and
+extraction pools running, so the numbers cover upload parsing, admission
+control, extraction and the classifier chain without any network in the
+way. The result cache is off unless --cache is given, so every request
+does the full work. With --corpus, documents of a corpus written by
+`src.corpus.generate` are sent instead, and the accuracy of the answers
+against the corpus labels is reported too.
+
+Usage:
+    python -m benchmarks.load_test [--files files] [--concurrency 8]
+        [--requests 200] [--cache] [--corpus corpus] [--limit 500]
+        [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import logging
+import resource
+import sys
+import time
+from collections import Counter
+from itertools import cycle
+from typing import Dict, List, Optional, Tuple
+import httpx
+from benchmarks import report
+from benchmarks.bench_pipeline import Sample, load_corpus
+from src.config import config
+from src.corpus.generate import load_manifest
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mib() -> Tuple[float, float]:
+    """Peak resident memory of this process and of its worker processes."""
+    # ru_maxrss is in KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+async def drive(
+    samples: List[Sample],
+    concurrency: int,
+    requests: int,
+    labels: Optional[Dict[str, str]] = None,
+) -> Tuple[List[float], Dict[int, int], float, int]:
+    """
+    Send `requests` uploads from `concurrency` concurrent clients.
+
+    Args:
+        samples: Files to send, in turn
+        concurrency: Number of concurrent clients
+        requests: Total number of requests
+        labels: Expected document type per filename, if known
+
+    Returns:
+        Tuple[List[float], Dict[int, int], float, int]: Latencies of
+            successful requests in milliseconds, counts per status code,
+            the wall time of the run in seconds, and the number of
+            successful answers that matched their label
+    """
+    from src.app import app
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = Counter()
+    files = cycle(samples)
+    remaining = requests
+    correct = 0
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=None
+        ) as client:
+
+            async def worker() -> None:
+                nonlocal remaining, correct
+                while remaining > 0:
+                    remaining -= 1
+                    name, content = next(files)
+                    start = time.perf_counter()
+                    response = await client.post(
+                        "/classify_file", files={"file": (name, content)}
+                    )
+                    elapsed = (time.perf_counter() - start) * 1000
+                    statuses[response.status_code] += 1
+                    if response.status_code == 200:
+                        latencies.append(elapsed)
+                        expected = (labels or {}).get(name)
+                        if expected == response.json()["document_type"]:
+                            correct += 1
+
+            # One request per sample first, so pools and models are warm
+            for name, content in samples:
+                await client.post("/classify_file", files={"file": (name, content)})
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            wall = time.perf_counter() - start
+    return latencies, dict(statuses), wall, correct
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", default="files")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--cache", action="store_true", help="keep the result cache")
+    parser.add_argument("--corpus", help="generated corpus to send instead")
+    parser.add_argument("--limit", type=int, help="corpus documents to send")
+    parser.add_argument(
+        "--corpus-only",
+        action="store_true",
+        help="send only the files in --files, not the synthetic large ones",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # Failures are part of the run, such as OCR without tesseract
+    logging.disable(logging.ERROR)
+
+    config.cache.enabled = args.cache
+    samples = load_corpus(args.files, args.corpus, args.limit)
+    labels = (
+        {entry["filename"]: entry["label"] for entry in load_manifest(args.corpus)}
+        if args.corpus
+        else None
+    )
+    if args.corpus_only:
+        samples = [
+            sample for sample in samples if not sample[0].startswith("synthetic")
+        ]
+
+    latencies, statuses, wall, correct = asyncio.run(
+        drive(samples, args.concurrency, args.requests, labels)
+    )
+    own_rss, worker_rss = peak_rss_mib()
+    print(f"Status codes: {statuses}")
+    if not latencies:
+        sys.exit("No request succeeded")
+
+    metrics = {
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "throughput_rps": len(latencies) / wall,
+        "error_rate": 1 - len(latencies) / args.requests,
+        "peak_rss_mib": own_rss,
+        "worker_peak_rss_mib": worker_rss,
+    }
+    if labels:
+        metrics["accuracy"] = correct / len(latencies)
+    for metric, value in metrics.items():
+        print(f"{metric:<22}{value:>10.2f}")
+
+    case = f"classify_file/c{args.concurrency}"
+    results = {case: metrics}
+    if args.output:
+        report.save(
+            args.output,
+            "load",
+            results,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            cache=args.cache,
+            corpus=args.corpus,
+            samples=[name for name, _ in samples],
+        )
+    if args.baseline:
+        print()
+        sys.exit(report.check(results, args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Save benchmark results as JSON and compare them against a baseline.
+
+Results are a mapping of case name to metrics. A metric's suffix says
+which way is better: `_ms` and `_mib` should fall, `_rps` and `accuracy`
+should rise.
+Other metrics are reported but never count as regressions.
+
+Usage:
+    python -m benchmarks.report results.json baseline.json [--tolerance 0.2]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+Results = Dict[str, Dict[str, float]]
+
+LOWER_IS_BETTER = ("_ms", "_mib")
+HIGHER_IS_BETTER = ("_rps", "accuracy")
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and revision the results were measured on."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "revision": revision,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def save(path: str, suite: str, results: Results, **parameters: Any) -> None:
+    """
+    Write results to a JSON file along with how they were measured.
+
+    Args:
+        path: Output file
+        suite: Name of the benchmark that produced the results
+        results: Metrics per case
+        parameters: Benchmark settings, such as concurrency
+    """
+    document = {
+        "suite": suite,
+        "environment": environment(),
+        "parameters": parameters,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    print(f"Results written to {path}")
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Read a results file written by `save`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: Results, baseline: Results, tolerance: float) -> List[str]:
+    """
+    Print each metric next to its baseline and list the regressions.
+
+    Args:
+        current: Metrics per case from this run
+        baseline: Metrics per case from the stored baseline
+        tolerance: Relative change allowed before a metric regresses
+
+    Returns:
+        List[str]: One line per metric worse than its baseline by more
+            than the tolerance
+    """
+    regressions = []
+    print(f"{'case':<64}{'metric':<20}{'baseline':>12}{'current':>12}{'change':>9}")
+    for case, metrics in sorted(current.items()):
+        for metric, value in sorted(metrics.items()):
+            before: Optional[float] = baseline.get(case, {}).get(metric)
+            if before is None:
+                continue
+            change = (value - before) / before if before else 0.0
+            worse = (metric.endswith(LOWER_IS_BETTER) and change > tolerance) or (
+                metric.endswith(HIGHER_IS_BETTER) and change < -tolerance
+            )
+            marker = "  !" if worse else ""
+            print(
+                f"{case:<64}{metric:<20}{before:>12.2f}{value:>12.2f}"
+                f"{change:>+9.0%}{marker}"
+            )
+            if worse:
+                regressions.append(f"{case} {metric}: {before:.2f} -> {value:.2f}")
+    return regressions
+
+
+def check(results: Results, baseline_path: str, tolerance: float) -> int:
+    """
+    Compare results against a baseline file and summarize the outcome.
+
+    Returns:
+        int: Exit status, 1 if anything regressed
+    """
+    regressions = compare(results, load(baseline_path)["results"], tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {tolerance:.0%}")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("results")
+    parser.add_argument("baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    sys.exit(check(load(args.results)["results"], args.baseline, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
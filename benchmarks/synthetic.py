@@ -0,0 +1,73 @@
+"""
+Synthetic documents for benchmarks: large PDFs, images and spreadsheets.
+
+Everything is generated in memory from a seed, so runs are comparable
+without checking large binaries into the repository. For realistic,
+labelled documents use `src.corpus.generate` instead.
+"""
+
+import random
+from typing import List
+from src.corpus.render import (
+    paginate,
+    render_csv,
+    render_image,
+    render_pdf,
+    render_xlsx,
+)
+
+WORDS = (
+    "invoice total amount due payment terms account statement balance "
+    "opening closing transaction deposit withdrawal licence driver date "
+    "birth address number customer reference period item quantity price"
+).split()
+
+
+def make_lines(count: int, seed: int = 0, words: int = 10) -> List[str]:
+    """Make `count` lines of random words from a document-like vocabulary."""
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=words)) for _ in range(count)]
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """Build a PDF with a text layer of `lines_per_page` lines on each page."""
+    lines = make_lines(pages * lines_per_page, seed)
+    return render_pdf(paginate(lines, lines_per_page))
+
+
+def make_image(
+    width: int, height: int, seed: int = 0, image_format: str = "JPEG"
+) -> bytes:
+    """Draw lines of black text on a white image of the given size."""
+    lines = make_lines(height // 50, seed, words=6)
+    return render_image(lines, (width, height), image_format)
+
+
+def make_xlsx(sheets: int, rows: int, columns: int, seed: int = 0) -> bytes:
+    """Build a workbook of `sheets` sheets with a header row and random cells."""
+    rng = random.Random(seed)
+    return render_xlsx(
+        [
+            (
+                f"Sheet {index + 1}",
+                [rng.choices(WORDS, k=columns)]
+                + [
+                    [round(rng.uniform(0, 10000), 2) for _ in range(columns)]
+                    for _ in range(rows)
+                ],
+            )
+            for index in range(sheets)
+        ]
+    )
+
+
+def make_csv(rows: int, columns: int, seed: int = 0) -> bytes:
+    """Build a CSV file with a header row and `rows` rows of random numbers."""
+    rng = random.Random(seed)
+    return render_csv(
+        [rng.choices(WORDS, k=columns)]
+        + [
+            [round(rng.uniform(0, 10000), 2) for _ in range(columns)]
+            for _ in range(rows)
+        ]
+    )
@@ -1,49 +1,429 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from src.classifier import classify_file
-from src.models import ClassificationError, ClassificationResponse
-from src.config import ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB
-from src.utils.request_validation import allowed_file, file_size_check
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from src.classifier import (
+    classifier_statistics,
+    classify_file,
+    classify_files,
+    classify_stored_file,
+    iter_classify_files,
+    prepare_classifiers,
+)
+from src.extractors.admission import AdmissionRejectedError
+from src.extractors.executor import executor
+from src.feedback import (
+    FeedbackError,
+    model_registry,
+    model_versions,
+    record_feedback,
+)
+from src.jobs import QueueFullError, get_job, job_queue, submit_job
+from src.snapshot import config_watcher, current
+from src.metrics import (
+    REQUEST_SECONDS,
+    STAGE_SECONDS,
+    mark_worker_stopped,
+    render_metrics,
+)
+from src.models import (
+    BatchClassificationResponse,
+    ClassificationError,
+    ClassificationResponse,
+    ClassifierStatsResponse,
+    FeedbackResponse,
+    JobResponse,
+    ModelVersionsResponse,
+)
+from src.config import config
+from src.utils.archive import expand_archive, is_archive
+from src.utils.request_validation import validate_file
+from src.utils.upload import (
+    SpoolingRoute,
+    UploadTooLargeError,
+    parse_multipart_to_disk,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the extraction pools with the app and drain them on shutdown."""
+    # Fails startup if the TF-IDF artifact does not match the config
+    prepare_classifiers()
+    # Serve the model version trained on feedback, if there is one
+    await model_registry.start(lambda: current().text_classifier)
+    config_watcher.start()
+    executor.start()
+    job_queue.start(classify_stored_file)
+    try:
+        yield
+    finally:
+        await job_queue.stop()
+        await config_watcher.stop()
+        await model_registry.stop()
+        executor.shutdown(wait=True)
+        mark_worker_stopped()
 
 
 app = FastAPI(
     title="Heron File Classifier",
     description="API for classifying files based on content and metadata",
     version="1.0.0",
+    lifespan=lifespan,
 )
+# Uploads are spooled to disk with the size limit enforced while they stream in
+app.router.route_class = SpoolingRoute
 
 
-@app.post("/classify_file", response_model=ClassificationResponse)
-async def classify_file_route(file: UploadFile = File(default=None)):
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    """Time every request and note when it arrived for the stage metrics."""
+    request.state.received_at = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(route.path if route else "unmatched").observe(
+        time.perf_counter() - request.state.received_at
+    )
+    return response
+
+
+def _observe_upload_parse(request: Request) -> None:
+    """Record the time FastAPI spent receiving and parsing the form."""
+    STAGE_SECONDS.labels("upload_parse").observe(
+        time.perf_counter() - request.state.received_at
+    )
+
+
+@app.post(
+    "/classify_file",
+    response_model=ClassificationResponse,
+    response_model_exclude_none=True,
+)
+async def classify_file_route(request: Request, file: UploadFile = File(default=None)):
     """
     Classify a file into a document type.
 
     Args:
+        request: The incoming request
         file: The file to classify; Maximum file size is 10MB
 
     Returns:
         ClassificationResponse: Classification result with document type and metadata
     """
-    if not file or not file.filename:
-        raise HTTPException(status_code=400, detail="No file or filename provided")
+    _observe_upload_parse(request)
+    problem = await validate_file(file)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
 
-    if not allowed_file(file.filename):
-        allowed = ", ".join(ALLOWED_EXTENSIONS)
+    try:
+        result = await classify_file(file)
+        return result
+    except AdmissionRejectedError as e:
+        error = ClassificationError(error="Overloaded", details=str(e))
         raise HTTPException(
-            status_code=400, detail=f"File type not allowed. Allowed types: {allowed}"
+            status_code=e.status_code,
+            detail=error.model_dump(),
+            headers={"Retry-After": str(e.retry_after)},
         )
+    except Exception as e:
+        error = ClassificationError(error="Classification failed", details=str(e))
+        raise HTTPException(status_code=500, detail=error.model_dump())
 
-    if not await file_size_check(file):
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB",
-        )
 
+@app.post(
+    "/classify_files",
+    response_model=BatchClassificationResponse,
+    response_model_exclude_none=True,
+)
+async def classify_files_route(
+    request: Request, files: List[UploadFile] = File(default=None)
+):
+    """
+    Classify a batch of files into document types.
+
+    Args:
+        request: The incoming request
+        files: The files to classify; zip and tar archives are expanded
+            into their members
+
+    Returns:
+        BatchClassificationResponse: Per-file results in upload order
+    """
+    _observe_upload_parse(request)
+    uploads = await _expand_uploads(files)
     try:
-        result = await classify_file(file)
-        return result
+        results = await classify_files(uploads)
+        return BatchClassificationResponse(results=results)
     except Exception as e:
         error = ClassificationError(error="Classification failed", details=str(e))
         raise HTTPException(status_code=500, detail=error.model_dump())
+    finally:
+        await _close_uploads(uploads)
+
+
+@app.post("/classify_files/stream")
+async def classify_files_stream_route(request: Request):
+    """
+    Classify a batch of files, streaming one NDJSON line per file.
+
+    Filename matches are sent first, the remaining files as soon as their
+    content classification finishes, so lines are not in upload order; each
+    line carries the file's `index` in the batch. Uploads are spooled to
+    disk while the request is parsed instead of being held in memory, and
+    the request is rejected with 413 as soon as a file exceeds the limit.
+
+    Args:
+        request: A multipart/form-data request with one or more `files` fields
+
+    Returns:
+        StreamingResponse: application/x-ndjson stream of BatchItemResult lines
+    """
+    try:
+        with STAGE_SECONDS.labels("upload_parse").time():
+            form = await parse_multipart_to_disk(request, config.batch.max_files)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    files = [
+        item for item in form.getlist("files") if isinstance(item, StarletteUploadFile)
+    ]
+    uploads = await _expand_uploads(files)
+
+    async def stream_results():
+        try:
+            async for item in iter_classify_files(uploads):
+                yield item.model_dump_json(exclude_none=True) + "\n"
+        finally:
+            # Also runs when the client disconnects mid-stream
+            await _close_uploads(uploads)
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@app.post(
+    "/jobs",
+    response_model=JobResponse,
+    response_model_exclude_none=True,
+    status_code=202,
+)
+async def submit_job_route(
+    request: Request,
+    file: UploadFile = File(default=None),
+    priority: int = Form(default=0, ge=0, le=9),
+):
+    """
+    Queue a file for classification and return without waiting for it.
+
+    Suited to heavy documents, such as large scanned PDFs, whose
+    classification may outlast a client timeout. Poll `/jobs/{job_id}` for
+    the result. Resubmitting a file returns its existing job.
+
+    Args:
+        request: The incoming request
+        file: The file to classify; Maximum file size is 10MB
+        priority: From 0 to 9; jobs with a higher priority run first
+
+    Returns:
+        JobResponse: The queued job
+    """
+    _observe_upload_parse(request)
+    problem = await validate_file(file)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+
+    try:
+        return await submit_job(file, priority)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(config.jobs.retry_after_seconds)},
+        )
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse, response_model_exclude_none=True)
+async def job_route(job_id: str):
+    """
+    Get the status of a job and, once it has succeeded, its result.
+
+    Args:
+        job_id: The identifier returned when the job was submitted
+
+    Returns:
+        JobResponse: The job
+    """
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post(
+    "/feedback",
+    response_model=FeedbackResponse,
+    response_model_exclude_none=True,
+    status_code=202,
+)
+async def feedback_route(
+    request: Request,
+    file: UploadFile = File(default=None),
+    document_type: str = Form(...),
+):
+    """
+    Record the correct document type of a misclassified file.
+
+    The file's text is stored with the label; a background trainer learns
+    the collected feedback into a new model version, which every worker
+    then swaps in without pausing requests.
+
+    Args:
+        request: The incoming request
+        file: The misclassified file; Maximum file size is 10MB
+        document_type: The correct document type
+
+    Returns:
+        FeedbackResponse: The recorded feedback
+    """
+    _observe_upload_parse(request)
+    problem = await validate_file(file)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+
+    try:
+        return await record_feedback(file, document_type, current().text_classifier)
+    except FeedbackError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except AdmissionRejectedError as e:
+        error = ClassificationError(error="Overloaded", details=str(e))
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=error.model_dump(),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+@app.get("/admin/model", response_model=ModelVersionsResponse)
+async def model_route():
+    """
+    List the stored versions of the text model and the feedback backlog.
+
+    Returns:
+        ModelVersionsResponse: The versions, newest first
+    """
+    return await model_versions(current().text_classifier)
+
+
+@app.post("/admin/model/train", response_model=ModelVersionsResponse)
+async def train_model_route():
+    """
+    Learn all pending feedback now rather than at the next training interval.
+
+    Returns:
+        ModelVersionsResponse: The versions, with the new one active
+    """
+    text_classifier = current().text_classifier
+    await model_registry.train(text_classifier, min_examples=1)
+    await model_registry.sync(text_classifier)
+    return await model_versions(text_classifier)
+
+
+@app.post("/admin/model/rollback", response_model=ModelVersionsResponse)
+async def rollback_model_route(version: Optional[str] = None):
+    """
+    Activate an earlier model version in every worker.
+
+    Args:
+        version: The version to activate; defaults to the one trained
+            before the active version
+
+    Returns:
+        ModelVersionsResponse: The versions, with the chosen one active
+    """
+    try:
+        await model_registry.rollback(version)
+    except FeedbackError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    text_classifier = current().text_classifier
+    await model_registry.sync(text_classifier)
+    return await model_versions(text_classifier)
+
+
+@app.get("/metrics")
+async def metrics_route():
+    """
+    Expose Prometheus metrics, merged across all uvicorn workers.
+
+    Returns:
+        Response: The metrics in the Prometheus text format
+    """
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/admin/classifier_stats", response_model=ClassifierStatsResponse)
+async def classifier_stats_route():
+    """
+    Show each classifier's running hit rate and latency per file type.
+
+    Statistics are kept per uvicorn worker, so successive calls may be
+    answered by different workers.
+
+    Returns:
+        ClassifierStatsResponse: The statistics and current classifier order
+    """
+    return classifier_statistics()
+
+
+async def _expand_uploads(files: Optional[List[UploadFile]]) -> List[UploadFile]:
+    """
+    Expand archives in a batch into their members and check the batch size.
+
+    Args:
+        files: The uploaded files
+
+    Returns:
+        List[UploadFile]: The files to classify, in upload order
+
+    Raises:
+        HTTPException: If the batch is empty, too large or has a bad archive
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="No files provided")
+
+    uploads: List[UploadFile] = []
+    for file in files:
+        if file.filename and is_archive(file.filename):
+            try:
+                members = await asyncio.to_thread(
+                    expand_archive, file, config.batch.max_files
+                )
+            except ValueError as e:
+                await _close_uploads(uploads)
+                raise HTTPException(status_code=400, detail=str(e))
+            # The archive itself is no longer needed once expanded
+            await file.close()
+            uploads.extend(members)
+        else:
+            uploads.append(file)
+
+    if len(uploads) > config.batch.max_files:
+        await _close_uploads(uploads)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Maximum batch size is {config.batch.max_files}",
+        )
+    return uploads
+
+
+async def _close_uploads(uploads: List[UploadFile]) -> None:
+    """Close the temporary files backing a batch of uploads."""
+    for upload in uploads:
+        await upload.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from .config import CacheConfig, config
+from .metrics import CACHE_LOOKUPS
+from .utils.content import Content
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ResultCache:
+    """
+    Two-tier cache of classification results keyed on file content.
+
+    The first tier is an in-memory LRU with a TTL, private to each worker.
+    The optional second tier is an SQLite file in WAL mode, which survives
+    restarts and is shared by every uvicorn worker on the host. It is only
+    touched from one thread of its own, so waiting on another worker's
+    write lock never blocks the event loop.
+    """
+
+    def __init__(self, settings: CacheConfig, fingerprint: str):
+        """
+        Initialize the cache.
+
+        Args:
+            settings: Size, TTL and disk tier configuration
+            fingerprint: Fingerprint of the active classification config
+        """
+        self.settings = settings
+        self.fingerprint = fingerprint
+        # Set when a model version is activated, so results of the previous
+        # model are not served
+        self.model_version = ""
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        self._disk_thread = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="result-cache"
+        )
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def make_key(
+        self,
+        content: Content,
+        filename: Optional[str],
+        fingerprint: Optional[str] = None,
+    ) -> str:
+        """
+        Build the cache key for a file.
+
+        The filename is part of the key because the filename classifiers
+        can classify identical bytes differently under different names.
+
+        Args:
+            content: The file content
+            filename: The name of the uploaded file
+            fingerprint: Fingerprint of the configuration the result comes
+                from; defaults to the active one
+
+        Returns:
+            str: The cache key
+        """
+        digest = hashlib.blake2b(content, digest_size=20)
+        digest.update(b"\0" + (filename or "").lower().encode("utf-8"))
+        digest.update(b"\0" + (fingerprint or self.fingerprint).encode("ascii"))
+        digest.update(b"\0" + self.model_version.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_disk(self) -> Optional[sqlite3.Connection]:
+        """Open the shared SQLite tier on first use, if one is configured."""
+        if self._disk is None and self.settings.disk_path:
+            connection = sqlite3.connect(
+                self.settings.disk_path, timeout=1.0, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS results_created_at "
+                "ON results (created_at)"
+            )
+            connection.commit()
+            self._disk = connection
+        return self._disk
+
+    async def _on_disk(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a disk tier operation on the cache's own thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._disk_thread, function, *args)
+
+    def _read(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        """Read a live entry from the disk tier, if one is configured."""
+        disk = self._get_disk()
+        if disk is None:
+            return None
+        return disk.execute(
+            "SELECT value, expires_at FROM results WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+
+    def _write(self, key: str, value: str, expires_at: float, now: float) -> None:
+        """Write an entry to the disk tier, pruning it every so often."""
+        disk = self._get_disk()
+        if disk is None:
+            return
+        disk.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (key, value, expires_at, now),
+        )
+        self._disk_writes += 1
+        # Pruning scans the table, so only do it every so often
+        if self._disk_writes % 100 == 0:
+            disk.execute(
+                "DELETE FROM results WHERE expires_at <= ? OR key IN ("
+                "SELECT key FROM results ORDER BY created_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (now, self.settings.disk_max_entries),
+            )
+        disk.commit()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Optional[Dict[str, Any]]: The cached result, or None on a miss
+        """
+        if not self.settings.enabled:
+            return None
+
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                CACHE_LOOKUPS.labels("memory_hit").inc()
+                return value
+            del self._memory[key]
+
+        try:
+            row = None
+            if self.settings.disk_path:
+                row = await self._on_disk(self._read, key, now)
+            if row is not None:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self.stats["disk_hits"] += 1
+                CACHE_LOOKUPS.labels("disk_hit").inc()
+                return value
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading from the disk cache: {str(e)}")
+
+        self.stats["misses"] += 1
+        CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers.
+
+        Args:
+            key: The cache key
+            value: The JSON-serializable classification result
+        """
+        if not self.settings.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + self.settings.ttl_seconds
+        self._remember(key, value, expires_at)
+
+        if not self.settings.disk_path:
+            return
+        try:
+            await self._on_disk(self._write, key, json.dumps(value), expires_at, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing to the disk cache: {str(e)}")
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.settings.max_entries:
+            self._memory.popitem(last=False)
+
+    def _clear_disk(self) -> None:
+        """Delete every entry of the disk tier, if one is configured."""
+        disk = self._get_disk()
+        if disk is not None:
+            disk.execute("DELETE FROM results")
+            disk.commit()
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        self._memory.clear()
+        self._disk_thread.submit(self._clear_disk).result()
+
+
+result_cache = ResultCache(config.cache, config.fingerprint())
@@ -1,45 +1,378 @@
+import asyncio
 import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from fastapi import UploadFile
-from .classifiers.regex import RegexClassifier
-from .classifiers.filename import FilenameClassifier
-from .classifiers.tfidf import TFIDFClassifier
-from .classifiers.fuzzy import FuzzyClassifier
 from .classifiers.composite import CompositeClassifier
-from .models import ClassificationResponse
+from .classifiers.stats import StageStats
+from .cache import result_cache
+from .config import config
+from .document import DocumentContext
+from .extractors.admission import AdmissionRejectedError
+from .metrics import DECISIONS, STAGE_SECONDS
+from .models import (
+    BatchItemResult,
+    ClassificationError,
+    ClassificationResponse,
+    ClassifierResult,
+    ClassifierStageStats,
+    ClassifierStatsResponse,
+)
+from .snapshot import ClassifierSnapshot, classifier_stats, current
+from .utils.request_validation import validate_file
 
 logger = logging.getLogger(__name__)
 
-# Initialize classifiers in order of preference
-classifiers = [
-    FilenameClassifier(),
-    FuzzyClassifier(),
-    RegexClassifier(),
-    TFIDFClassifier(),
-]
+# Response fields that describe the result itself rather than this request
+CACHED_FIELDS = {"document_type", "classifier_name"}
 
-classifier = CompositeClassifier(classifiers)
 
+def prepare_classifiers() -> None:
+    """
+    Load or train every model-backed classifier before traffic arrives.
 
-async def classify_file(file: UploadFile) -> ClassificationResponse:
+    Raises:
+        ModelArtifactError: If a configured model artifact does not match
+            the current configuration
     """
-    Classify a file using a sequence of classifiers with fallback.
-    Each classifier is tried in sequence until a valid result is found.
-    If all classifiers fail, returns unknown.
+    current().text_classifier.prepare()
+
+
+async def _classify_document(
+    document: DocumentContext,
+    chain: CompositeClassifier,
+    snapshot: ClassifierSnapshot,
+) -> ClassificationResponse:
+    """
+    Classify a document with the given chain, going through the result cache.
 
     Args:
-        file: The uploaded file to classify
+        document: The document to classify
+        chain: The composite classifier to run on a cache miss
+        snapshot: The snapshot the chain belongs to
 
     Returns:
         ClassificationResponse: The classification result with metadata
+
+    Raises:
+        AdmissionRejectedError: If extraction was turned away and degraded
+            mode could not answer from the filename
     """
     try:
-        result = await classifier.classify(file)
-        return ClassificationResponse(
-            document_type=result.document_type, classifier_name=result.classifier_name
+        key = result_cache.make_key(
+            await document.get_content(), document.filename, snapshot.fingerprint
         )
+        with STAGE_SECONDS.labels("cache_lookup").time():
+            cached = await result_cache.get(key)
+        if cached is not None:
+            return ClassificationResponse(
+                **cached, cached=True, config_version=snapshot.version
+            )
+
+        with STAGE_SECONDS.labels("classification").time():
+            result = await chain.classify(document)
+        degraded = document.rejection is not None
+        if degraded:
+            result = _degraded_result(document, result, snapshot)
+        DECISIONS.labels(result.classifier_name, result.document_type).inc()
+        response = ClassificationResponse(
+            document_type=result.document_type,
+            classifier_name=result.classifier_name,
+            score=result.score,
+            votes=result.votes,
+            degraded=degraded or None,
+            config_version=snapshot.version,
+        )
+        if document.paged:
+            response.pages_processed = document.pages_processed
+            response.pages_total = document.page_count
+            if document.ocr_pages:
+                response.ocr_pages = [index + 1 for index in document.ocr_pages]
+            logger.info(
+                f"Extracted {document.pages_processed} of {document.page_count} "
+                f"pages of '{document.filename}'"
+            )
+        # Do not pin a result produced while extraction was overloaded
+        if document.cacheable:
+            await result_cache.set(key, response.model_dump(include=CACHED_FIELDS))
+        return response
+    except AdmissionRejectedError:
+        raise
     except Exception as e:
-        logger.error(f"Error in {classifier.__class__.__name__}: {str(e)}")
+        logger.error(f"Error in {chain.__class__.__name__}: {str(e)}")
         logger.warning("All classifiers failed to classify the file")
+        DECISIONS.labels("SequentialClassifier", "unknown").inc()
         return ClassificationResponse(
-            document_type="unknown", classifier_name="SequentialClassifier"
+            document_type="unknown",
+            classifier_name="SequentialClassifier",
+            config_version=snapshot.version,
+        )
+
+
+def _degraded_result(
+    document: DocumentContext, result: ClassifierResult, snapshot: ClassifierSnapshot
+) -> ClassifierResult:
+    """
+    Answer for a document whose extraction was turned away by admission control.
+
+    Args:
+        document: The document whose extraction was rejected
+        result: What the chain made of the document without its content
+        snapshot: The snapshot the document is classified with
+
+    Returns:
+        ClassifierResult: The chain's result if it found one, otherwise the
+            filename classifiers' result
+
+    Raises:
+        AdmissionRejectedError: If degraded mode is off, or the filename
+            alone does not classify the document
+    """
+    if config.admission.degraded_mode:
+        if result.document_type == "unknown":
+            result = classify_filenames([document.filename or ""], snapshot)[0]
+        if result.document_type != "unknown":
+            logger.warning(
+                f"Classified '{document.filename}' by filename only: "
+                f"{document.rejection}"
+            )
+            return result
+    raise document.rejection
+
+
+async def classify_file(file: UploadFile) -> ClassificationResponse:
+    """
+    Classify a file using a sequence of classifiers with fallback.
+    Each classifier is tried in sequence until a valid result is found.
+    If all classifiers fail, returns unknown. Results are cached by file
+    content, filename and configuration fingerprint.
+
+    Args:
+        file: The uploaded file to classify
+
+    Returns:
+        ClassificationResponse: The classification result with metadata
+
+    Raises:
+        AdmissionRejectedError: If content extraction is saturated and the
+            filename alone does not classify the file
+    """
+    snapshot = current()
+    document = DocumentContext(file)
+    try:
+        return await _classify_document(document, snapshot.classifier, snapshot)
+    finally:
+        document.close()
+
+
+async def classify_stored_file(
+    path: str, filename: str
+) -> Tuple[ClassificationResponse, bool]:
+    """
+    Classify a file kept on disk, as the job queue stores them.
+
+    Args:
+        path: Path of the stored file
+        filename: Name the file was uploaded under
+
+    Returns:
+        Tuple[ClassificationResponse, bool]: The classification result and
+            whether it is final; it is not if extraction was overloaded or
+            cut short, so a retry may do better
+    """
+    snapshot = current()
+    with open(path, "rb") as f:
+        document = DocumentContext(UploadFile(file=f, filename=filename))
+        try:
+            response = await _classify_document(
+                document, snapshot.classifier, snapshot
+            )
+        finally:
+            document.close()
+    return response, document.cacheable
+
+
+def classify_filenames(
+    filenames: List[str], snapshot: Optional[ClassifierSnapshot] = None
+) -> List[ClassifierResult]:
+    """
+    Classify many filenames at once with the filename-only classifiers.
+
+    Each classifier runs once over the filenames still unclassified, in
+    the same order as the composite chain.
+
+    Args:
+        filenames: The filenames to classify
+        snapshot: The snapshot to classify with; defaults to the current one
+
+    Returns:
+        List[ClassifierResult]: The first valid result per filename, or
+            unknown from the composite
+    """
+    results = [
+        ClassifierResult(classifier_name=CompositeClassifier.__name__)
+        for _ in filenames
+    ]
+    pending = list(range(len(filenames)))
+    for c in (snapshot or current()).filename_classifier.classifiers:
+        if not pending:
+            break
+        try:
+            batch = c.classify_filenames([filenames[i].lower() for i in pending])
+        except Exception as e:
+            logger.error(f"Error in classifier {c.__class__.__name__}: {str(e)}")
+            continue
+        still_pending = []
+        for index, result in zip(pending, batch):
+            if result.document_type != "unknown":
+                results[index] = result
+            else:
+                still_pending.append(index)
+        pending = still_pending
+    return results
+
+
+async def iter_classify_files(
+    files: List[UploadFile],
+) -> AsyncIterator[BatchItemResult]:
+    """
+    Classify a batch of files, yielding each result as soon as it is ready.
+
+    The filename classifiers run over the whole batch first. Files they
+    cannot classify fan out to content extraction with bounded concurrency
+    and are yielded in completion order. In scoring mode every file goes
+    through the full scoring chain instead. A file that fails validation
+    gets an error entry instead of failing the whole batch.
+
+    Args:
+        files: The uploaded files to classify
+
+    Yields:
+        BatchItemResult: Per-file results, tagged with their batch index
+    """
+    snapshot = current()
+    scoring = snapshot.scoring
+    valid: List[int] = []
+    for index, file in enumerate(files):
+        problem = await validate_file(file)
+        if problem:
+            yield BatchItemResult(
+                index=index,
+                filename=file.filename if file and file.filename else "",
+                error=ClassificationError(error="Invalid file", details=problem),
+            )
+        else:
+            valid.append(index)
+
+    misses: List[int] = valid if scoring else []
+    names: List[ClassifierResult] = []
+    if not scoring:
+        # The filename pass over a large batch takes long enough to be worth
+        # moving off the loop
+        with STAGE_SECONDS.labels("filename_batch").time():
+            names = await asyncio.to_thread(
+                classify_filenames, [files[index].filename for index in valid], snapshot
+            )
+    for index, result in zip(valid, names):
+        if result.document_type == "unknown":
+            misses.append(index)
+            continue
+        DECISIONS.labels(result.classifier_name, result.document_type).inc()
+        yield BatchItemResult(
+            index=index,
+            filename=files[index].filename,
+            result=ClassificationResponse(
+                document_type=result.document_type,
+                classifier_name=result.classifier_name,
+                config_version=snapshot.version,
+            ),
         )
+
+    semaphore = asyncio.Semaphore(config.batch.max_concurrency)
+
+    async def classify_miss(index: int) -> BatchItemResult:
+        async with semaphore:
+            # A context per task lets the file content be freed once it is done
+            document = DocumentContext(files[index])
+            chain = snapshot.classifier if scoring else snapshot.content_classifier
+            try:
+                response = await _classify_document(document, chain, snapshot)
+            except AdmissionRejectedError as e:
+                return BatchItemResult(
+                    index=index,
+                    filename=document.filename,
+                    error=ClassificationError(error="Overloaded", details=str(e)),
+                )
+            finally:
+                document.close()
+            return BatchItemResult(
+                index=index, filename=document.filename, result=response
+            )
+
+    tasks = [asyncio.ensure_future(classify_miss(index)) for index in misses]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Stop outstanding work if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+
+    logger.info(
+        f"Classified batch of {len(files)} files, "
+        f"{len(misses)} needed content classification"
+    )
+
+
+async def classify_files(files: List[UploadFile]) -> List[BatchItemResult]:
+    """
+    Classify a batch of files.
+
+    Args:
+        files: The uploaded files to classify
+
+    Returns:
+        List[BatchItemResult]: Per-file results in the order of the input
+    """
+    results = [item async for item in iter_classify_files(files)]
+    return sorted(results, key=lambda item: item.index)
+
+
+def classifier_statistics() -> ClassifierStatsResponse:
+    """
+    Describe the running statistics and current order of the classifiers.
+
+    Returns:
+        ClassifierStatsResponse: Per file type, every classifier in the order
+            the next request would run it
+    """
+    snapshot = current()
+    adaptive = snapshot.adaptive
+    file_types: Dict[str, List[ClassifierStageStats]] = {}
+    for file_type in classifier_stats.file_types():
+        if adaptive is None:
+            ranked = [(c, False) for c in snapshot.classifiers]
+        else:
+            ranked = classifier_stats.rank(
+                file_type, list(snapshot.classifiers), adaptive
+            )
+        file_types[file_type] = []
+        for c, skipped in ranked:
+            name = c.__class__.__name__
+            stage = classifier_stats.get(file_type, name) or StageStats()
+            file_types[file_type].append(
+                ClassifierStageStats(
+                    classifier_name=name,
+                    samples=stage.samples,
+                    hit_rate=round(stage.hit_rate, 4),
+                    explored_hit_rate=round(stage.explored_hit_rate, 4),
+                    mean_latency_ms=round(stage.mean_seconds * 1000, 3),
+                    skipped=skipped,
+                )
+            )
+    return ClassifierStatsResponse(
+        mode=snapshot.settings.classifier.composite_mode,
+        pinned_order=adaptive.pinned_order if adaptive else None,
+        worker_pid=os.getpid(),
+        file_types=file_types,
+    )
@@ -1,25 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import Union
 from fastapi import UploadFile
+from ..document import DocumentContext
 from ..models import ClassifierResult
 
 
 class BaseClassifier(ABC):
     """Base class for all document classifiers."""
 
+    # Whether the classifier reads the file content, or only its name
+    requires_content: bool = True
+
     @abstractmethod
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file.
 
         Args:
-            file: The file to classify
+            file: The file to classify, or a document context wrapping it
 
         Returns:
             ClassifierResult: The classification result
         """
         pass
 
-    def _get_filename(self, file: UploadFile) -> str:
+    def _get_filename(self, file: Union[UploadFile, DocumentContext]) -> str:
         """
         Get the filename from the uploaded file.
 
@@ -32,3 +39,21 @@ class BaseClassifier(ABC):
         if not file or not file.filename:
             raise ValueError("File must have a filename")
         return file.filename.lower()
+
+    def _get_document(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> DocumentContext:
+        """
+        Get the shared document context for the given file.
+
+        Args:
+            file: The uploaded file, or an existing document context
+
+        Returns:
+            DocumentContext: The existing context, or a new one for the file
+        """
+        if isinstance(file, DocumentContext):
+            return file
+        if not file:
+            raise ValueError("File must be provided")
+        return DocumentContext(file)
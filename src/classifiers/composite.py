@@ -1,7 +1,12 @@
-from typing import List
+from typing import List, Optional, Tuple, Union
 import logging
+import time
 from fastapi import UploadFile
 from .base import BaseClassifier
+from .stats import ClassifierStats
+from ..config import AdaptiveConfig
+from ..document import DocumentContext
+from ..metrics import CLASSIFIER_SECONDS
 from ..models import ClassifierResult
 
 # Set up logging
@@ -11,38 +16,79 @@ logger = logging.getLogger(__name__)
 class CompositeClassifier(BaseClassifier):
     """Composite classifier that combines multiple classifiers."""
 
-    def __init__(self, classifiers: List[BaseClassifier]):
+    def __init__(
+        self,
+        classifiers: List[BaseClassifier],
+        stats: Optional[ClassifierStats] = None,
+        adaptive: Optional[AdaptiveConfig] = None,
+    ):
         """
         Initialize the composite classifier.
 
         Args:
             classifiers: List of classifiers to use in order
+            stats: Statistics to record every classifier run in
+            adaptive: When given, classifiers are reordered and skipped
+                according to the recorded statistics
         """
         self.classifiers = classifiers
+        self.stats = stats
+        self.adaptive = adaptive
 
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    def _plan(self, file_type: str) -> Tuple[List[BaseClassifier], bool]:
+        """Get the classifiers to run for a file type, in order, and whether
+        to run all of them to measure their hit rates."""
+        if self.stats is None or self.adaptive is None:
+            return self.classifiers, False
+        return self.stats.plan(file_type, self.classifiers, self.adaptive)
+
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file using multiple classifiers in sequence.
 
+        An exploring request keeps running the classifiers after the first
+        hit, for their statistics, and still returns the first hit.
+
         Args:
             file: The file to classify
 
         Returns:
             ClassifierResult: The first valid classification result
         """
-        for classifier in self.classifiers:
+        # Share one document context so text is extracted at most once
+        document = self._get_document(file)
+        file_type = document.file_type
+        plan, explore = self._plan(file_type)
+        found: Optional[ClassifierResult] = None
+        for classifier in plan:
+            name = classifier.__class__.__name__
+            hit = False
+            start = time.perf_counter()
             try:
-                result = await classifier.classify(file)
-                if result.document_type != "unknown":
-                    return ClassifierResult(
-                        document_type=result.document_type,
-                        classifier_name=result.classifier_name,
-                    )
+                with CLASSIFIER_SECONDS.labels(name).time():
+                    result = await classifier.classify(document)
+                hit = result.document_type != "unknown"
             except Exception as e:
-                logger.error(
-                    f"Error in classifier {classifier.__class__.__name__}: " f"{str(e)}"
-                )
+                logger.error(f"Error in classifier {name}: " f"{str(e)}")
+                # A failed run says nothing about the stage's hit rate, and
+                # shed or timed-out runs would count as fast misses
                 continue
+            if self.stats is not None:
+                self.stats.record(
+                    file_type, name, hit, time.perf_counter() - start, explore
+                )
+            if hit and found is None:
+                found = ClassifierResult(
+                    document_type=result.document_type,
+                    classifier_name=result.classifier_name,
+                )
+                # Extraction failing in the stages still to run for
+                # exploration does not make this answer degraded
+                document.settle()
+            if found is not None and not explore:
+                break
 
         # If no classifier succeeded, return unknown
-        return ClassifierResult(classifier_name=self.__class__.__name__)
+        return found or ClassifierResult(classifier_name=self.__class__.__name__)
@@ -1,8 +1,11 @@
 import logging
+from typing import List, Optional, Union
 from fastapi import UploadFile
 from .base import BaseClassifier
+from .matchers import FilenameMatcher
+from ..document import DocumentContext
 from ..models import ClassifierResult
-from ..config import config
+from ..config import AppConfig, config
 from ..utils.decorators import handle_classifier_errors
 
 logger = logging.getLogger(__name__)
@@ -11,12 +14,31 @@ logger = logging.getLogger(__name__)
 class FilenameClassifier(BaseClassifier):
     """Classifier that uses filename patterns to classify files."""
 
-    def __init__(self):
+    requires_content = False
+
+    def __init__(self, settings: Optional[AppConfig] = None):
+        settings = settings or config
         # Keywords and patterns for each document type
-        self.patterns = config.patterns.model_dump()
+        self.patterns = settings.patterns.model_dump()
+        self.matcher = FilenameMatcher(self.patterns)
+
+    def _result(self, filename: str, doc_type) -> ClassifierResult:
+        """Build the result for one filename, logging the outcome."""
+        if doc_type:
+            logger.info(f"Classified '{filename}' as '{doc_type}' by filename pattern")
+            # A pattern in the filename is taken at face value
+            return ClassifierResult(
+                document_type=doc_type,
+                classifier_name=self.__class__.__name__,
+                score=1.0,
+            )
+        logger.info("No matching patterns found, returning unknown")
+        return ClassifierResult(classifier_name=self.__class__.__name__)
 
     @handle_classifier_errors
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file based on its filename.
 
@@ -27,16 +49,21 @@ class FilenameClassifier(BaseClassifier):
             ClassifierResult: The classification result
         """
         filename = self._get_filename(file)
+        return self._result(filename, self.matcher.substring_match(filename))
 
-        # Check each document type's patterns
-        for doc_type, patterns in self.patterns.items():
-            if any(pattern in filename for pattern in patterns):
-                logger.info(
-                    f"Classified as '{doc_type}' using pattern " f"'{patterns}'"
-                )
-                return ClassifierResult(
-                    document_type=doc_type,
-                    classifier_name=self.__class__.__name__,
-                )
-        logger.info("No matching patterns found, returning unknown")
-        return ClassifierResult(classifier_name=self.__class__.__name__)
+    def classify_filenames(self, filenames: List[str]) -> List[ClassifierResult]:
+        """
+        Classify many filenames in one call.
+
+        Args:
+            filenames: The lowercased filenames to classify
+
+        Returns:
+            List[ClassifierResult]: The classification result per filename
+        """
+        return [
+            self._result(filename, doc_type)
+            for filename, doc_type in zip(
+                filenames, self.matcher.substring_matches(filenames)
+            )
+        ]
@@ -1,8 +1,10 @@
 import logging
+from typing import List, Optional, Union
 from fastapi import UploadFile
-from rapidfuzz import process
 from .base import BaseClassifier
-from ..config import config
+from .matchers import FilenameMatcher
+from ..document import DocumentContext
+from ..config import AppConfig, config
 from ..models import ClassifierResult
 from ..utils.decorators import handle_classifier_errors
 
@@ -12,12 +14,37 @@ logger = logging.getLogger(__name__)
 class FuzzyClassifier(BaseClassifier):
     """Classifier that uses fuzzy string matching to classify files."""
 
-    def __init__(self):
-        self.patterns = config.patterns.model_dump()
-        self.similarity_threshold = config.classifier.similarity_threshold
+    requires_content = False
+
+    def __init__(self, settings: Optional[AppConfig] = None):
+        settings = settings or config
+        self.patterns = settings.patterns.model_dump()
+        self.similarity_threshold = settings.classifier.similarity_threshold
+        self.matcher = FilenameMatcher(self.patterns)
+
+    def _result(self, best_match: Optional[str], best_score: float) -> ClassifierResult:
+        """Apply the similarity threshold to the best match for one filename."""
+        # Return the best match if it exceeds the threshold
+        if best_match and best_score >= self.similarity_threshold:
+            logger.info(
+                f"Classified as '{best_match}' with similarity "
+                f"score {best_score:.1f}"
+            )
+            return ClassifierResult(
+                document_type=best_match,
+                classifier_name=self.__class__.__name__,
+                score=best_score / 100,
+            )
+
+        logger.info(
+            f"No match above similarity {self.similarity_threshold}, returning unknown"
+        )
+        return ClassifierResult(classifier_name=self.__class__.__name__)
 
     @handle_classifier_errors
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file using fuzzy string matching on the filename.
 
@@ -28,28 +55,23 @@ class FuzzyClassifier(BaseClassifier):
             ClassifierResult: The classification result
         """
         filename = self._get_filename(file)
-        # Calculate similarity scores for each document type
-        best_match = None
-        best_score = 0
+        return self._result(
+            *self.matcher.fuzzy_match(filename, self.similarity_threshold)
+        )
 
-        for doc_type, patterns in self.patterns.items():
-            # Get the best matching pattern for this document type
-            match = process.extractOne(filename, patterns)
-            if match and match[1] > best_score:
-                best_score = match[1]
-                best_match = doc_type
+    def classify_filenames(self, filenames: List[str]) -> List[ClassifierResult]:
+        """
+        Classify many filenames with a single similarity computation.
 
-        # Return the best match if it exceeds the threshold
-        if best_match and best_score >= self.similarity_threshold:
-            logger.info(
-                f"Classified as '{best_match}' with similarity "
-                f"score {best_score:.1f}"
-            )
-            return ClassifierResult(
-                document_type=best_match, classifier_name=self.__class__.__name__
-            )
+        Args:
+            filenames: The lowercased filenames to classify
 
-        logger.info(
-            f"No good match found (best score: {best_score:.1f}), " "returning unknown"
-        )
-        return ClassifierResult(classifier_name=self.__class__.__name__)
+        Returns:
+            List[ClassifierResult]: The classification result per filename
+        """
+        return [
+            self._result(doc_type, score)
+            for doc_type, score in self.matcher.fuzzy_matches(
+                filenames, self.similarity_threshold
+            )
+        ]
@@ -0,0 +1,115 @@
+import copy
+import logging
+from typing import Dict, List, Optional
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from .tfidf import TFIDFClassifier
+from ..config import AppConfig
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+HASHING_MODELS = ("sgd", "nb")
+
+
+class HashingClassifier(TFIDFClassifier):
+    """Classifier that uses hashed n-gram features and a linear model that
+    can be updated online."""
+
+    engine_name = "Hashing"
+
+    def __init__(self, settings: Optional[AppConfig] = None):
+        super().__init__(settings)
+        model = self.settings.classifier.hashing_model
+        if model not in HASHING_MODELS:
+            raise ValueError(
+                f"Unknown hashing model '{model}', expected one of {HASHING_MODELS}"
+            )
+        # Stateless: there is no vocabulary, so memory does not grow with the
+        # corpus and new examples need no refit of the features
+        self.vectorizer = HashingVectorizer(
+            n_features=self.settings.classifier.hashing_n_features,
+            stop_words="english",
+            ngram_range=(1, 2),
+            alternate_sign=False,
+        )
+        if model == "sgd":
+            self.classifier = SGDClassifier(loss="log_loss", random_state=0)
+        else:
+            self.classifier = MultinomialNB(alpha=0.01)
+
+    def _compact(self, classifier) -> None:
+        """Store SGD weights sparsely, as most hashed features are never seen
+        and a dense product over all of them dominates prediction time."""
+        if isinstance(classifier, SGDClassifier):
+            classifier.sparsify()
+
+    def train(self, training_data: Optional[Dict[str, List[str]]] = None):
+        """
+        Train the classifier with the training data.
+
+        Args:
+            training_data: Labelled examples to fit on instead of the
+                configured training data
+        """
+        super().train(training_data)
+        with self._train_lock:
+            self._compact(self.classifier)
+
+    def fingerprint(self) -> str:
+        """Get the hash of the settings the trained model depends on."""
+        return self.settings.hashing_fingerprint()
+
+    def update(
+        self,
+        texts: List[str],
+        labels: List[str],
+        training_data: Optional[Dict[str, List[str]]] = None,
+    ) -> str:
+        """
+        Fit the model further on new labelled examples, without a refit.
+
+        The update runs on a copy of the model that replaces the live one
+        once it is done, so requests classifying meanwhile see either the
+        old or the new model, and a memory-mapped artifact stays untouched.
+
+        Args:
+            texts: The example texts
+            labels: The document type of each text
+            training_data: Examples to train on first if the model is not
+                trained yet, instead of the configured training data
+
+        Returns:
+            str: The version of the updated model
+
+        Raises:
+            ValueError: If the lists differ in length, or a label is not a
+                document type the model was trained on
+        """
+        if len(texts) != len(labels):
+            raise ValueError("Every text needs exactly one label")
+        if not self.is_trained:
+            self.train(training_data)
+
+        with self._train_lock:
+            unknown = set(labels) - set(self.classifier.classes_)
+            if unknown:
+                raise ValueError(
+                    f"Unknown document types {sorted(unknown)}; "
+                    "retrain the model to add document types"
+                )
+            classifier = copy.deepcopy(self.classifier)
+            if isinstance(classifier, SGDClassifier):
+                classifier.densify()
+            classifier.partial_fit(self.vectorizer.transform(texts), labels)
+            self._compact(classifier)
+            base, _, updates = (self.model_version or "inline").partition("+")
+            self.classifier = classifier
+            self.model_version = f"{base}+{int(updates or 0) + 1}"
+        logger.info(
+            f"Updated {self.engine_name} model to {self.model_version} "
+            f"with {len(texts)} examples"
+        )
+        return self.model_version
+
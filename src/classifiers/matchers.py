@@ -0,0 +1,399 @@
+import logging
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+logger = logging.getLogger(__name__)
+
+# Characters that may form a literal anchor; anything else ends the anchor
+_ANCHOR_CHARS = re.compile(r"[A-Za-z0-9_ ]")
+# Quantifiers that make the preceding character optional or repeatable
+_QUANTIFIERS = "?*{+"
+# Constructs that cannot be moved into a combined pattern safely
+_UNSPLITTABLE = re.compile(r"\||\\[1-9]|\(\?P=")
+
+
+def literal_anchor(pattern: str) -> str:
+    """
+    Get the literal text every match of a regex must start with.
+
+    The anchor is the leading run of plain characters, minus any character
+    a quantifier applies to, so the remainder never starts with one. Patterns with an alternation, a
+    backreference or a non-literal start have no anchor.
+
+    Args:
+        pattern: The regular expression
+
+    Returns:
+        str: The lowercased anchor, or an empty string if there is none
+    """
+    if _UNSPLITTABLE.search(pattern):
+        return ""
+    anchor = []
+    for index, char in enumerate(pattern):
+        if not _ANCHOR_CHARS.match(char):
+            break
+        following = pattern[index + 1 : index + 2]
+        if following and following in _QUANTIFIERS:
+            break
+        anchor.append(char)
+    return "".join(anchor).lower()
+
+
+class MultiPatternMatcher:
+    """
+    Matches the regexes of every document type in a single pass.
+
+    Each regex is split into its literal anchor and the remainder. The
+    anchors are arranged in a trie with the remainders at its leaves and
+    compiled into one pattern, so the text is scanned once and the regex
+    engine only tries remainders where an anchor occurs. Regexes
+    without an anchor fall back to their own search.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        """
+        Compile the matcher.
+
+        Args:
+            patterns: Regex sources keyed by document type, in priority order
+        """
+        self.doc_types = list(patterns)
+        self.patterns: Dict[str, List[Pattern[str]]] = {}
+        # (anchor, priority, compiled regex) for every anchored regex
+        self._anchored: List[Tuple[str, int, Pattern[str]]] = []
+        self._unanchored: List[Tuple[int, Pattern[str]]] = []
+        trie: Dict[str, dict] = {}
+
+        for priority, (doc_type, sources) in enumerate(patterns.items()):
+            self.patterns[doc_type] = []
+            for source in sources:
+                compiled = re.compile(source, re.IGNORECASE)
+                self.patterns[doc_type].append(compiled)
+                anchor = literal_anchor(source)
+                if not anchor:
+                    self._unanchored.append((priority, compiled))
+                    continue
+                node = trie
+                for char in anchor:
+                    node = node.setdefault(char, {})
+                node.setdefault("", []).append(
+                    (len(self._anchored), source[len(anchor) :])
+                )
+                self._anchored.append((anchor, priority, compiled))
+
+        # Anchored regexes grouped by the first character of their anchor
+        self._by_first_char: Dict[str, List[Tuple[str, int, Pattern[str]]]] = {}
+        for entry in self._anchored:
+            self._by_first_char.setdefault(entry[0][0], []).append(entry)
+
+        source = self._build(trie) if trie else "(?!)"
+        try:
+            self._combined = re.compile(source)
+            self._combined_ignorecase = re.compile(source, re.IGNORECASE)
+        except re.error as e:
+            logger.warning(f"Cannot combine regex patterns, matching one by one: {e}")
+            self._unanchored.extend((p, c) for _, p, c in self._anchored)
+            self._anchored = []
+            self._by_first_char = {}
+            self._combined = self._combined_ignorecase = re.compile("(?!)")
+
+    def _build(self, node: Dict[str, dict]) -> str:
+        """Turn a trie node into regex source, remainders before children."""
+        branches = [
+            f"(?P<p{index}>(?i:{remainder}))"
+            for index, remainder in node.get("", [])
+        ]
+        branches += [
+            re.escape(char) + self._build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    def _scan(self, text: str, first_only: bool) -> List[int]:
+        """
+        Count matching positions per document type.
+
+        Args:
+            text: The text to search
+            first_only: Stop as soon as the highest-priority type with a
+                match is known
+
+        Returns:
+            List[int]: Match counts indexed by document type priority
+        """
+        counts = [0] * len(self.doc_types)
+        best = len(self.doc_types)
+
+        for priority, pattern in self._unanchored:
+            if first_only:
+                if priority < best and pattern.search(text):
+                    best = priority
+                    counts[priority] += 1
+            else:
+                counts[priority] += sum(1 for _ in pattern.finditer(text))
+
+        lowered = text.lower()
+        folded = len(lowered) == len(text)
+        combined = self._combined
+        if not folded:
+            # Some characters change length when lowercased; scan the
+            # original text so positions stay aligned
+            lowered = text
+            combined = self._combined_ignorecase
+
+        position = -1
+        while True:
+            # Resume right after the previous start rather than its end, so
+            # matches starting inside another match are still found
+            hit = combined.search(lowered, position + 1)
+            if hit is None:
+                break
+            position = hit.start()
+            # Only one branch is reported per position, so check the other
+            # regexes anchored here; true hits are rare, so this is cheap
+            matched = set()
+            for anchor, priority, pattern in self._by_first_char.get(
+                lowered[position].lower(), ()
+            ):
+                if priority in matched or (first_only and priority >= best):
+                    continue
+                segment = lowered[position : position + len(anchor)]
+                if not folded:
+                    segment = segment.lower()
+                if segment == anchor and pattern.match(text, position):
+                    matched.add(priority)
+                    counts[priority] += 1
+                    best = min(best, priority)
+            if first_only and best == 0:
+                break
+
+        return counts
+
+    def count_matches(self, text: str) -> Dict[str, int]:
+        """
+        Count the positions where each document type's regexes match.
+
+        Args:
+            text: The text to search
+
+        Returns:
+            Dict[str, int]: Match counts keyed by document type
+        """
+        return dict(zip(self.doc_types, self._scan(text, first_only=False)))
+
+    def first_match(self, text: str) -> Optional[str]:
+        """
+        Get the highest-priority document type with any matching regex.
+
+        This gives the same answer as trying each type's regexes in order.
+
+        Args:
+            text: The text to search
+
+        Returns:
+            Optional[str]: The matching document type, or None
+        """
+        counts = self._scan(text, first_only=True)
+        for doc_type, count in zip(self.doc_types, counts):
+            if count:
+                return doc_type
+        return None
+
+
+class AhoCorasick:
+    """
+    Aho–Corasick automaton over labelled keywords.
+
+    Finds the lowest label of any keyword occurring in a text in a single
+    pass over the text, however many keywords there are.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, int]]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: (keyword, label) pairs; lower labels win
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Lowest label of any keyword ending at each state, or None
+        self._out: List[Optional[int]] = [None]
+
+        for keyword, label in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._out[state] = self._min(self._out[state], label)
+
+        # Breadth-first, so each fail target is complete before it is used
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._min(
+                    self._out[child], self._out[self._fail[child]]
+                )
+
+    @staticmethod
+    def _min(a: Optional[int], b: Optional[int]) -> Optional[int]:
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return min(a, b)
+
+    def first_label(self, text: str) -> Optional[int]:
+        """
+        Get the lowest label of any keyword occurring in the text.
+
+        Args:
+            text: The text to search
+
+        Returns:
+            Optional[int]: The lowest matching label, or None
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        best = out[0]
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            label = out[state]
+            if label is not None and (best is None or label < best):
+                best = label
+                if best == 0:
+                    break
+        return best
+
+
+class FilenameMatcher:
+    """
+    Matches filenames against the filename patterns of every document type.
+
+    The substring stage runs an Aho–Corasick automaton over all patterns.
+    The fuzzy stage scores filenames against one flattened pattern list in
+    a single rapidfuzz call and maps the best column back to its type.
+    Both give the same answers as checking each document type in order.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        """
+        Compile the matcher.
+
+        Args:
+            patterns: Filename patterns keyed by document type, in priority order
+        """
+        self.doc_types = list(patterns)
+        self._automaton = AhoCorasick(
+            (pattern, priority)
+            for priority, sources in enumerate(patterns.values())
+            for pattern in sources
+        )
+        # A pattern listed under several types only counts for the first
+        first_type: Dict[str, int] = {}
+        for priority, sources in enumerate(patterns.values()):
+            for pattern in sources:
+                first_type.setdefault(pattern, priority)
+        self._choices = list(first_type)
+        self._choice_types = np.array(list(first_type.values()), dtype=np.intp)
+
+    def substring_match(self, filename: str) -> Optional[str]:
+        """
+        Get the highest-priority document type with a pattern in the filename.
+
+        Args:
+            filename: The filename to check
+
+        Returns:
+            Optional[str]: The matching document type, or None
+        """
+        priority = self._automaton.first_label(filename)
+        return None if priority is None else self.doc_types[priority]
+
+    def substring_matches(self, filenames: Sequence[str]) -> List[Optional[str]]:
+        """
+        Run the substring stage over many filenames.
+
+        Args:
+            filenames: The filenames to check
+
+        Returns:
+            List[Optional[str]]: The matching document type per filename
+        """
+        return [self.substring_match(filename) for filename in filenames]
+
+    def fuzzy_matches(
+        self, filenames: Sequence[str], score_cutoff: float = 0
+    ) -> List[Tuple[Optional[str], float]]:
+        """
+        Find the most similar pattern for each filename.
+
+        Args:
+            filenames: The filenames to score
+            score_cutoff: Scores below this are treated as no match, which
+                lets the scorer skip hopeless pairs early
+
+        Returns:
+            List[Tuple[Optional[str], float]]: The document type of the best
+                pattern and its score per filename, or (None, 0) when no
+                pattern reaches the cutoff
+        """
+        if not filenames:
+            return []
+        if not self._choices:
+            return [(None, 0.0)] * len(filenames)
+        scores = process.cdist(
+            list(filenames),
+            self._choices,
+            scorer=fuzz.WRatio,
+            score_cutoff=score_cutoff,
+            workers=-1 if len(filenames) > 1 else 1,
+        )
+        # argmax takes the first column on ties, i.e. the higher-priority type
+        best = scores.argmax(axis=1)
+        results: List[Tuple[Optional[str], float]] = []
+        for row, column in enumerate(best):
+            score = float(scores[row, column])
+            if score <= 0:
+                results.append((None, 0.0))
+            else:
+                results.append((self.doc_types[self._choice_types[column]], score))
+        return results
+
+    def fuzzy_match(
+        self, filename: str, score_cutoff: float = 0
+    ) -> Tuple[Optional[str], float]:
+        """
+        Find the most similar pattern for a single filename.
+
+        Args:
+            filename: The filename to score
+            score_cutoff: Scores below this are treated as no match
+
+        Returns:
+            Tuple[Optional[str], float]: The document type of the best
+                pattern and its score
+        """
+        return self.fuzzy_matches([filename], score_cutoff)[0]
@@ -1,10 +1,11 @@
-import re
 import logging
+from typing import Optional, Union
 from fastapi import UploadFile
 from .base import BaseClassifier
+from .matchers import MultiPatternMatcher
+from ..document import DocumentContext
 from ..models import ClassifierResult
-from ..config import config
-from ..extractors.factory import TextExtractorFactory
+from ..config import AppConfig, config
 from ..utils.decorators import handle_classifier_errors
 
 logger = logging.getLogger(__name__)
@@ -13,14 +14,16 @@ logger = logging.getLogger(__name__)
 class RegexClassifier(BaseClassifier):
     """Classifier that uses regex patterns to identify document types."""
 
-    def __init__(self):
-        self.patterns = {
-            doc_type: [re.compile(pattern, re.IGNORECASE) for pattern in doc_patterns]
-            for doc_type, doc_patterns in config.regex_patterns.model_dump().items()
-        }
+    def __init__(self, settings: Optional[AppConfig] = None):
+        settings = settings or config
+        # All patterns are matched in one pass over the text
+        self.matcher = MultiPatternMatcher(settings.regex_patterns.model_dump())
+        self.mode = settings.classifier.regex_mode
 
     @handle_classifier_errors
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file based on regex patterns in its content.
 
@@ -30,15 +33,33 @@ class RegexClassifier(BaseClassifier):
         Returns:
             str: The classification result
         """
-        extractor = TextExtractorFactory.get_extractor(file)
-        text = await extractor.extract_text(file)
-
-        for doc_type, regex_patterns in self.patterns.items():
-            if any(pattern.search(text) for pattern in regex_patterns):
-                logger.info(f"Classified '{file.filename}' as '{doc_type}'")
-                return ClassifierResult(
-                    document_type=doc_type,
-                    classifier_name=self.__class__.__name__,
-                )
+        document = self._get_document(file)
+        score = 1.0
+
+        if self.mode == "most_matches":
+            text = await document.get_text()
+            counts = self.matcher.count_matches(text)
+            logger.info(f"Regex match counts for '{file.filename}': {counts}")
+            # max() keeps the first, highest-priority type on ties
+            doc_type = max(counts, key=counts.get) if any(counts.values()) else None
+            if doc_type:
+                # Share of all matches that went to the winning type
+                score = counts[doc_type] / sum(counts.values())
+        else:
+            # Scan page by page and stop at the first page with a match,
+            # leaving the remaining pages unextracted
+            doc_type = None
+            async for page in document.iter_pages():
+                doc_type = self.matcher.first_match(page)
+                if doc_type:
+                    break
+
+        if doc_type:
+            logger.info(f"Classified '{file.filename}' as '{doc_type}'")
+            return ClassifierResult(
+                document_type=doc_type,
+                classifier_name=self.__class__.__name__,
+                score=score,
+            )
 
         return ClassifierResult(classifier_name=self.__class__.__name__)
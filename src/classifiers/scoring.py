@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Union
+from fastapi import UploadFile
+from .base import BaseClassifier
+from .composite import CompositeClassifier
+from ..config import ScoringConfig
+from ..document import DocumentContext
+from ..metrics import CLASSIFIER_SECONDS
+from ..models import ClassifierResult, ClassifierVote
+
+logger = logging.getLogger(__name__)
+
+
+class ScoringClassifier(CompositeClassifier):
+    """
+    Composite classifier that combines the weighted scores of its classifiers.
+
+    The filename-only classifiers run first, then the content classifiers
+    run concurrently over the shared document. Each vote adds its weight
+    times its calibrated score to its document type. Once the leading type
+    is far enough ahead, or no pending vote could overtake it, the
+    classifiers still running are cancelled.
+    """
+
+    def __init__(self, classifiers: List[BaseClassifier], settings: ScoringConfig):
+        """
+        Initialize the scoring classifier.
+
+        Args:
+            classifiers: List of classifiers to combine, cheapest first
+            settings: Weights, decision margin and minimum score
+        """
+        super().__init__(classifiers)
+        self.settings = settings
+
+    async def _run(
+        self, classifier: BaseClassifier, document: DocumentContext, vote: ClassifierVote
+    ) -> None:
+        """Run one classifier and record its outcome on its vote."""
+        start = time.perf_counter()
+        try:
+            result = await classifier.classify(document)
+            if not isinstance(result, ClassifierResult):
+                # The error decorator returns a ClassificationError instead
+                raise ValueError(result.details)
+            vote.document_type = result.document_type
+            if result.document_type != "unknown":
+                vote.score = result.score if result.score is not None else 1.0
+            vote.status = "completed"
+        except Exception as e:
+            logger.error(f"Error in classifier {vote.classifier_name}: {str(e)}")
+            vote.status = "failed"
+        finally:
+            elapsed = time.perf_counter() - start
+            vote.elapsed_ms = round(elapsed * 1000, 3)
+            CLASSIFIER_SECONDS.labels(vote.classifier_name).observe(elapsed)
+
+    def _decided(self, totals: Dict[str, float], pending_weight: float) -> bool:
+        """Whether the pending votes can no longer change the outcome enough."""
+        ranked = sorted(totals.values(), reverse=True) + [0.0, 0.0]
+        if ranked[0] < self.settings.min_score:
+            return False
+        lead = ranked[0] - ranked[1]
+        return lead >= self.settings.decision_margin or lead > pending_weight
+
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
+        """
+        Classify a file by combining the weighted votes of every classifier.
+
+        Args:
+            file: The file to classify
+
+        Returns:
+            ClassifierResult: The leading document type with its combined
+                score and every classifier's vote
+        """
+        document = self._get_document(file)
+        votes = [
+            ClassifierVote(
+                classifier_name=c.__class__.__name__,
+                weight=self.settings.weights.get(c.__class__.__name__, 1.0),
+                status="cancelled",
+            )
+            for c in self.classifiers
+        ]
+        stages = [
+            [i for i, c in enumerate(self.classifiers) if not c.requires_content],
+            [i for i, c in enumerate(self.classifiers) if c.requires_content],
+        ]
+        totals: Dict[str, float] = {}
+        pending_weight = sum(vote.weight for vote in votes)
+        decided = False
+
+        for stage in stages:
+            if decided:
+                break
+            tasks = {
+                asyncio.ensure_future(
+                    self._run(self.classifiers[i], document, votes[i])
+                ): i
+                for i in stage
+            }
+            pending = set(tasks)
+            try:
+                while pending and not decided:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        vote = votes[tasks[task]]
+                        pending_weight -= vote.weight
+                        if vote.document_type != "unknown":
+                            totals[vote.document_type] = (
+                                totals.get(vote.document_type, 0.0)
+                                + vote.weight * vote.score
+                            )
+                    decided = self._decided(totals, pending_weight)
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+        completed = [vote for vote in votes if vote.status == "completed"]
+        completed_weight = sum(vote.weight for vote in completed) or 1.0
+        if totals:
+            doc_type = max(totals, key=totals.get)
+            if totals[doc_type] >= self.settings.min_score:
+                # Credit the classifier with the largest share of the decision
+                top = max(
+                    (vote for vote in completed if vote.document_type == doc_type),
+                    key=lambda vote: vote.weight * vote.score,
+                )
+                logger.info(
+                    f"Scored '{document.filename}' as '{doc_type}' "
+                    f"({totals[doc_type]:.2f} of {completed_weight:.2f})"
+                )
+                return ClassifierResult(
+                    document_type=doc_type,
+                    classifier_name=top.classifier_name,
+                    score=round(totals[doc_type] / completed_weight, 4),
+                    votes=votes,
+                )
+
+        logger.info("No document type reached the minimum score, returning unknown")
+        return ClassifierResult(classifier_name=self.__class__.__name__, votes=votes)
@@ -0,0 +1,205 @@
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+from .base import BaseClassifier
+from ..config import AdaptiveConfig
+
+
+class StageStats:
+    """
+    Exponentially decayed hit and latency totals of one classifier.
+
+    In a chain that stops at the first hit, a stage only runs once every
+    stage before it has missed, so its hit rate over those runs depends on
+    the order it was measured in. Exploration runs every stage whatever
+    the others return; only those runs count towards `explored_hit_rate`.
+    """
+
+    __slots__ = (
+        "samples",
+        "runs",
+        "hits",
+        "seconds",
+        "explored",
+        "explored_runs",
+        "explored_hits",
+    )
+
+    def __init__(self):
+        self.samples = 0
+        self.runs = 0.0
+        self.hits = 0.0
+        self.seconds = 0.0
+        self.explored = 0
+        self.explored_runs = 0.0
+        self.explored_hits = 0.0
+
+    def record(
+        self, hit: bool, seconds: float, decay: float, explored: bool = False
+    ) -> None:
+        """
+        Add one run, fading out older runs.
+
+        Args:
+            hit: Whether the classifier returned a document type
+            seconds: Time the classifier took
+            decay: Weight kept by the previous totals
+            explored: Whether every stage of the chain ran on this request
+        """
+        self.samples += 1
+        self.runs = self.runs * decay + 1
+        self.hits = self.hits * decay + (1 if hit else 0)
+        self.seconds = self.seconds * decay + seconds
+        if explored:
+            self.explored += 1
+            self.explored_runs = self.explored_runs * decay + 1
+            self.explored_hits = self.explored_hits * decay + (1 if hit else 0)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.runs if self.runs else 0.0
+
+    @property
+    def explored_hit_rate(self) -> float:
+        return self.explored_hits / self.explored_runs if self.explored_runs else 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.runs if self.runs else 0.0
+
+
+class ClassifierStats:
+    """
+    Running hit-rate and latency statistics of each classifier, per file type.
+
+    The statistics drive the adaptive order of the composite classifier:
+    for a chain that stops at the first hit, running stages in increasing
+    order of mean latency over hit rate minimizes the expected cost per
+    request. Hit rates are taken from exploration requests only, which run
+    every stage, so the order they were measured in does not bias them.
+    Stages that hardly ever hit are skipped.
+    """
+
+    def __init__(self, decay: float = 0.99):
+        """
+        Initialize empty statistics.
+
+        Args:
+            decay: Weight kept by older runs on every new run
+        """
+        self.decay = decay
+        self._stages: Dict[str, Dict[str, StageStats]] = {}
+
+    def record(
+        self,
+        file_type: str,
+        name: str,
+        hit: bool,
+        seconds: float,
+        explored: bool = False,
+    ) -> None:
+        """
+        Record one classifier run.
+
+        Args:
+            file_type: The file type of the document
+            name: The classifier's class name
+            hit: Whether the classifier returned a document type
+            seconds: Time the classifier took
+            explored: Whether every stage of the chain ran on this request
+        """
+        stages = self._stages.setdefault(file_type, {})
+        stages.setdefault(name, StageStats()).record(
+            hit, seconds, self.decay, explored
+        )
+
+    def get(self, file_type: str, name: str) -> Optional[StageStats]:
+        """Get the statistics of a classifier for a file type, if any."""
+        return self._stages.get(file_type, {}).get(name)
+
+    def file_types(self) -> List[str]:
+        """Get the file types seen so far."""
+        return sorted(self._stages)
+
+    def _measured(
+        self,
+        file_type: str,
+        classifiers: Sequence[BaseClassifier],
+        settings: AdaptiveConfig,
+    ) -> List[Optional[StageStats]]:
+        """Get the statistics of each classifier, or an empty list until
+        every one has enough exploration runs."""
+        stats = [self.get(file_type, c.__class__.__name__) for c in classifiers]
+        if any(s is None or s.explored < settings.min_samples for s in stats):
+            return []
+        return stats
+
+    def rank(
+        self,
+        file_type: str,
+        classifiers: Sequence[BaseClassifier],
+        settings: AdaptiveConfig,
+    ) -> List[Tuple[BaseClassifier, bool]]:
+        """
+        Order classifiers by expected cost and flag the ones to skip.
+
+        Args:
+            file_type: The file type of the document
+            classifiers: The classifiers in their default order
+            settings: Pinned order, sample and skip thresholds
+
+        Returns:
+            List[Tuple[BaseClassifier, bool]]: Classifiers in run order, each
+                with whether it is skipped
+        """
+        if settings.pinned_order is not None:
+            by_name = {c.__class__.__name__: c for c in classifiers}
+            return [(by_name[n], False) for n in settings.pinned_order if n in by_name]
+
+        stats = self._measured(file_type, classifiers, settings)
+        # Keep the default order until every stage has been measured
+        if not stats:
+            return [(c, False) for c in classifiers]
+
+        def expected_cost(index: int) -> float:
+            hit_rate = stats[index].explored_hit_rate
+            return stats[index].mean_seconds / max(hit_rate, 1e-6)
+
+        order = sorted(range(len(classifiers)), key=expected_cost)
+        ranked = [
+            (classifiers[i], stats[i].explored_hit_rate < settings.skip_hit_rate)
+            for i in order
+        ]
+        if all(skipped for _, skipped in ranked):
+            return [(c, False) for c, _ in ranked]
+        return ranked
+
+    def plan(
+        self,
+        file_type: str,
+        classifiers: Sequence[BaseClassifier],
+        settings: AdaptiveConfig,
+    ) -> Tuple[List[BaseClassifier], bool]:
+        """
+        Get the classifiers to run for one request, in order.
+
+        A request explores while the file type is not measured yet, and on
+        `explore_rate` of requests after that.
+
+        Args:
+            file_type: The file type of the document
+            classifiers: The classifiers in their default order
+            settings: Pinned order, sample, skip and exploration settings
+
+        Returns:
+            Tuple[List[BaseClassifier], bool]: The classifiers to run, and
+                whether to explore by running all of them past the first hit
+        """
+        ranked = self.rank(file_type, classifiers, settings)
+        if settings.pinned_order is not None:
+            return [c for c, _ in ranked], False
+        if (
+            not self._measured(file_type, classifiers, settings)
+            or random.random() < settings.explore_rate
+        ):
+            return [c for c, _ in ranked], True
+        return [c for c, skipped in ranked if not skipped], False
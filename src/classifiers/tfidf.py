@@ -1,55 +1,203 @@
 import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
 from fastapi import UploadFile
+import joblib
 import numpy as np
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from .base import BaseClassifier
-from ..config import config
+from ..document import DocumentContext
+from ..config import AppConfig, config
 from ..models import ClassifierResult
-from ..extractors.factory import TextExtractorFactory
 from ..utils.decorators import handle_classifier_errors
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the layout of the saved artifact changes
+ARTIFACT_FORMAT_VERSION = 1
+
+
+class ModelArtifactError(ValueError):
+    """Raised when a saved model artifact cannot be used with this config."""
+
+
+def build_training_set(
+    training_data: Dict[str, List[str]],
+) -> Tuple[List[str], List[str]]:
+    """
+    Flatten labelled examples into parallel lists of texts and labels.
+
+    Args:
+        training_data: Example texts keyed by document type
+
+    Returns:
+        Tuple[List[str], List[str]]: The texts and their labels
+    """
+    texts = []
+    labels = []
+
+    for doc_type, examples in training_data.items():
+        texts.extend(examples)
+        labels.extend([doc_type] * len(examples))
+
+    return texts, labels
+
 
 class TFIDFClassifier(BaseClassifier):
     """Classifier that uses TF-IDF and Naïve Bayes for
     document classification."""
 
-    def __init__(self):
+    # How log and error messages refer to the model
+    engine_name = "TF-IDF"
+
+    def __init__(self, settings: Optional[AppConfig] = None):
+        self.settings = settings or config
         self.vectorizer = TfidfVectorizer(
-            max_features=config.classifier.max_features,
+            max_features=self.settings.classifier.max_features,
             stop_words="english",
             ngram_range=(1, 2),
         )
         self.classifier = MultinomialNB()
         self.is_trained = False
-        self.training_data = config.tfidf_training_data
+        self.model_version: Optional[str] = None
+        self.training_data = self.settings.tfidf_training_data
+        self._train_lock = threading.Lock()
 
-    def train(self):
-        """Train the classifier with the training data."""
-        if self.is_trained:
-            return
+    def train(self, training_data: Optional[Dict[str, List[str]]] = None):
+        """
+        Train the classifier with the training data.
 
-        # Prepare training data
-        texts = []
-        labels = []
+        Args:
+            training_data: Labelled examples to fit on instead of the
+                configured TF-IDF training data
+        """
+        # Concurrent first requests must not fit the same model twice
+        with self._train_lock:
+            if self.is_trained:
+                return
 
-        for doc_type, examples in self.training_data.items():
-            texts.extend(examples)
-            labels.extend([doc_type] * len(examples))
+            # Prepare training data
+            texts, labels = build_training_set(training_data or self.training_data)
 
-        # Transform text to TF-IDF features
-        X = self.vectorizer.fit_transform(texts)
+            # Transform text to TF-IDF features
+            X = self.vectorizer.fit_transform(texts)
+
+            # Train the classifier
+            self.classifier.fit(X, labels)
+            self.model_version = f"inline-{self.fingerprint()[:12]}"
+            self.is_trained = True
+            logger.info(f"{self.engine_name} classifier trained successfully")
+
+    def fingerprint(self) -> str:
+        """Get the hash of the settings the trained model depends on."""
+        return self.settings.tfidf_fingerprint()
+
+    def save(self, path: str, version: Optional[str] = None) -> str:
+        """
+        Write the trained model to a versioned artifact.
 
-        # Train the classifier
-        self.classifier.fit(X, labels)
-        self.is_trained = True
-        logger.info("TF-IDF classifier trained successfully")
+        The artifact is stored uncompressed so its numpy arrays can be
+        memory-mapped, and shared between workers, when it is loaded.
+
+        Args:
+            path: Destination file of the artifact
+            version: Version to record; defaults to the current time and
+                the configuration fingerprint
+
+        Returns:
+            str: The version of the saved model
+        """
+        if not self.is_trained:
+            raise ModelArtifactError("Cannot save an untrained model")
+
+        fingerprint = self.fingerprint()
+        version = version or time.strftime("%Y%m%d%H%M%S") + f"-{fingerprint[:12]}"
+        artifact = {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "model_version": version,
+            "fingerprint": fingerprint,
+            "sklearn_version": sklearn.__version__,
+            "engine": self.__class__.__name__,
+            "vectorizer": self.vectorizer,
+            "classifier": self.classifier,
+        }
+        joblib.dump(artifact, path)
+        self.model_version = version
+        logger.info(f"Saved {self.engine_name} model {version} to {path}")
+        return version
+
+    def load(self, path: str) -> None:
+        """
+        Load a pre-trained model artifact, memory-mapping its arrays.
+
+        Args:
+            path: The artifact written by `save`
+
+        Raises:
+            ModelArtifactError: If the artifact was built for another
+                format version, another engine or another configuration
+        """
+        artifact = joblib.load(path, mmap_mode="r")
+        if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+            raise ModelArtifactError(
+                f"Unsupported {self.engine_name} artifact format "
+                f"{artifact.get('format_version')} in {path}"
+            )
+        engine = artifact.get("engine", TFIDFClassifier.__name__)
+        if engine != self.__class__.__name__:
+            raise ModelArtifactError(
+                f"Artifact {path} holds a {engine} model, not a "
+                f"{self.__class__.__name__} one"
+            )
+        if artifact["fingerprint"] != self.fingerprint():
+            raise ModelArtifactError(
+                f"{self.engine_name} artifact {path} was trained for another "
+                "configuration; retrain it with `python -m src.train`"
+            )
+        if artifact["sklearn_version"] != sklearn.__version__:
+            logger.warning(
+                f"{self.engine_name} artifact was built with scikit-learn "
+                f"{artifact['sklearn_version']}, running {sklearn.__version__}"
+            )
+
+        with self._train_lock:
+            self.vectorizer = artifact["vectorizer"]
+            self.classifier = artifact["classifier"]
+            self.model_version = artifact["model_version"]
+            self.is_trained = True
+        logger.info(
+            f"Loaded {self.engine_name} model {self.model_version} from {path}"
+        )
+
+    def prepare(self) -> None:
+        """Load the configured artifact, or train in-process if there is none."""
+        if self.settings.classifier.tfidf_model_path:
+            self.load(self.settings.classifier.tfidf_model_path)
+        else:
+            self.train()
+
+    def adopt(self, other: "TFIDFClassifier") -> None:
+        """
+        Serve the trained model of another instance, such as the one built
+        for the previous configuration, instead of training again.
+
+        Args:
+            other: A trained classifier with the same fingerprint
+        """
+        with other._train_lock:
+            state = other.vectorizer, other.classifier, other.model_version
+        with self._train_lock:
+            self.vectorizer, self.classifier, self.model_version = state
+            self.is_trained = True
 
     @handle_classifier_errors
-    async def classify(self, file: UploadFile) -> ClassifierResult:
+    async def classify(
+        self, file: Union[UploadFile, DocumentContext]
+    ) -> ClassifierResult:
         """
         Classify a file using TF-IDF and Naïve Bayes.
 
@@ -63,26 +211,35 @@ class TFIDFClassifier(BaseClassifier):
         if not self.is_trained:
             self.train()
 
-        extractor = TextExtractorFactory.get_extractor(file)
+        document = self._get_document(file)
+
+        # Classify on the leading pages only, reusing any earlier extraction
+        text = await document.get_text_prefix(
+            max_pages=self.settings.classifier.tfidf_max_pages,
+            max_chars=self.settings.classifier.tfidf_max_chars,
+        )
 
-        # Extract text from the file
-        text = await extractor.extract_text(file)
+        # A model swapped in meanwhile must not be mixed with the old one
+        with self._train_lock:
+            vectorizer, model = self.vectorizer, self.classifier
 
         # Transform text to TF-IDF features
-        X = self.vectorizer.transform([text])
+        X = vectorizer.transform([text])
 
         # Get prediction and probabilities
-        prediction = self.classifier.predict(X)[0]
-        probabilities = self.classifier.predict_proba(X)[0]
+        prediction = model.predict(X)[0]
+        probabilities = model.predict_proba(X)[0]
         confidence = np.max(probabilities)
 
         # Only return prediction if confidence is high enough
-        if confidence >= config.classifier.confidence_threshold:
+        if confidence >= self.settings.classifier.confidence_threshold:
             logger.info(
                 f"Classified as '{prediction}' with confidence " f"{confidence:.2f}"
             )
             return ClassifierResult(
-                document_type=prediction, classifier_name=self.__class__.__name__
+                document_type=prediction,
+                classifier_name=self.__class__.__name__,
+                score=float(confidence),
             )
 
         logger.info(
@@ -1,5 +1,23 @@
+import hashlib
+import json
+import os
+import tempfile
 from pydantic import BaseModel, Field
-from typing import List, Dict
+from typing import Any, List, Dict, Literal, Optional
+
+# Path of a YAML or JSON file to load the configuration from
+CONFIG_FILE_ENV = "HERON_CONFIG"
+
+# Sections applied when the configuration file changes; the others size
+# pools, queues and caches at startup and need a restart
+RELOADABLE_SECTIONS = {
+    "classifier",
+    "scoring",
+    "adaptive",
+    "patterns",
+    "regex_patterns",
+    "tfidf_training_data",
+}
 
 # Maximum file size in MB
 MAX_FILE_SIZE_MB = 10
@@ -18,6 +36,9 @@ ALLOWED_EXTENSIONS = {
     "txt",
 }
 
+# Archive extensions accepted by the batch endpoint
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz")
+
 
 class ClassifierConfig(BaseModel):
     """Configuration for classifiers."""
@@ -31,6 +52,376 @@ class ClassifierConfig(BaseModel):
     max_features: int = Field(
         default=5000, description="Maximum number of features for TF-IDF"
     )
+    composite_mode: Literal["sequential", "adaptive", "scoring"] = Field(
+        default="sequential",
+        description="'sequential' returns the first classifier's answer; "
+        "'adaptive' does too, but orders and skips classifiers by their live "
+        "hit rate and latency; 'scoring' runs every classifier and combines "
+        "weighted scores",
+    )
+    regex_mode: Literal["priority", "most_matches"] = Field(
+        default="priority",
+        description="'priority' returns the first document type whose regexes "
+        "match; 'most_matches' returns the type with the most matches",
+    )
+    tfidf_max_pages: Optional[int] = Field(
+        default=5, description="Number of leading pages TF-IDF classifies on"
+    )
+    tfidf_max_chars: Optional[int] = Field(
+        default=50_000, description="Number of leading characters TF-IDF classifies on"
+    )
+    tfidf_model_path: Optional[str] = Field(
+        default_factory=lambda: os.environ.get("TFIDF_MODEL_PATH"),
+        description="Pre-trained artifact of the text engine loaded at startup; "
+        "the model is trained in-process when unset",
+    )
+    text_engine: Literal["tfidf", "hashing"] = Field(
+        default="tfidf",
+        description="'tfidf' fits a vocabulary-based TF-IDF model; 'hashing' "
+        "uses hashed features with a fixed memory footprint and a model that "
+        "can be updated online",
+    )
+    hashing_n_features: int = Field(
+        default=2**18,
+        description="Number of hashed features of the hashing engine; its "
+        "model holds one weight per feature and document type",
+    )
+    hashing_model: Literal["sgd", "nb"] = Field(
+        default="sgd",
+        description="Linear model of the hashing engine: 'sgd' for logistic "
+        "regression trained by SGD, 'nb' for multinomial Naive Bayes",
+    )
+
+
+class ExecutorConfig(BaseModel):
+    """Configuration for the text extraction executors."""
+
+    process_workers: int = Field(
+        default=2, description="Number of worker processes for OCR and PDF parsing"
+    )
+    thread_workers: int = Field(
+        default=4, description="Number of worker threads for lightweight formats"
+    )
+    max_queue_depth: int = Field(
+        default=32,
+        description="Maximum number of queued or running jobs per pool "
+        "before new jobs are rejected",
+    )
+    job_timeout_seconds: float = Field(
+        default=30.0, description="Maximum time to wait for a single extraction job"
+    )
+    start_method: str = Field(
+        default="spawn", description="Multiprocessing start method for the pool"
+    )
+
+
+class ExtractorLimit(BaseModel):
+    """Admission limits for one extractor class."""
+
+    concurrency: int = Field(
+        default=4, description="Extractions of this class running at once"
+    )
+    max_waiting: int = Field(
+        default=16,
+        description="Extractions waiting for a slot above which new ones are "
+        "turned away at once with 429",
+    )
+    queue_timeout_seconds: float = Field(
+        default=2.0,
+        description="Time an extraction may wait for a slot before it is "
+        "turned away with 503",
+    )
+
+
+class AdmissionConfig(BaseModel):
+    """Configuration for admission control in front of text extraction."""
+
+    enabled: bool = Field(
+        default=True, description="Whether extractions are admission controlled"
+    )
+    limits: Dict[str, ExtractorLimit] = Field(
+        default={
+            "ImageExtractor": ExtractorLimit(
+                concurrency=2, max_waiting=8, queue_timeout_seconds=5.0
+            ),
+            "PDFExtractor": ExtractorLimit(
+                concurrency=4, max_waiting=16, queue_timeout_seconds=5.0
+            ),
+            "TextExtractor": ExtractorLimit(
+                concurrency=16, max_waiting=64, queue_timeout_seconds=1.0
+            ),
+        },
+        description="Limits per extractor class, so a burst of one file type "
+        "cannot starve the others",
+    )
+    default_limit: ExtractorLimit = Field(
+        default_factory=ExtractorLimit,
+        description="Limits for extractor classes not listed in `limits`",
+    )
+    degraded_mode: bool = Field(
+        default=True,
+        description="Answer from the filename classifiers when extraction is "
+        "turned away, instead of failing the request",
+    )
+    retry_after_seconds: int = Field(
+        default=2, description="Retry-After sent when a request is turned away"
+    )
+
+
+class ExtractionConfig(BaseModel):
+    """Configuration for incremental text extraction."""
+
+    stream_pages: bool = Field(
+        default=True,
+        description="Extract paged documents page by page so classifiers "
+        "can stop early",
+    )
+    first_page_batch: int = Field(
+        default=1, description="Number of pages extracted by the first batch"
+    )
+    max_page_batch: int = Field(
+        default=16, description="Upper bound for the doubling page batch size"
+    )
+    docx_max_chars: int = Field(
+        default=100_000,
+        description="Characters read from a Word document before extraction stops",
+    )
+
+
+class OCRConfig(BaseModel):
+    """Configuration for OCR of images and scanned pages."""
+
+    engine: str = Field(
+        default="auto",
+        description="'tesserocr' keeps a tesseract instance alive in each worker; "
+        "'pytesseract' runs the tesseract binary per image; 'auto' prefers tesserocr "
+        "when it is installed",
+    )
+    lang: str = Field(default="eng", description="Tesseract language(s)")
+    psm: int = Field(default=3, description="Tesseract page segmentation mode")
+    target_dpi: int = Field(
+        default=300, description="Resolution images with a real DPI are scaled to"
+    )
+    max_pixels: int = Field(
+        default=4_000_000, description="Images are downscaled to at most this area"
+    )
+    max_upscale: float = Field(
+        default=2.0, description="Largest factor a low-resolution scan is enlarged by"
+    )
+    grayscale: bool = Field(default=True, description="Convert images to grayscale")
+    binarize: bool = Field(
+        default=True, description="Threshold grayscale images with Otsu's method"
+    )
+    cache_max_entries: int = Field(
+        default=512,
+        description="OCR texts kept per worker, keyed by perceptual image hash",
+    )
+    pdf_fallback: bool = Field(
+        default=True, description="OCR PDF pages that have no text layer"
+    )
+    pdf_max_pages: int = Field(
+        default=3, description="Only the first pages of a scanned PDF are OCRed"
+    )
+    pdf_dpi: int = Field(
+        default=200, description="Resolution scanned pages are rendered at"
+    )
+    pdf_max_page_pixels: int = Field(
+        default=4_000_000, description="Largest area a page is rendered at"
+    )
+    pdf_time_budget_seconds: float = Field(
+        default=20.0,
+        description="Time after which a document's remaining page OCR is given up",
+    )
+    pdf_memory_budget_mb: int = Field(
+        default=64,
+        description="Memory a document's rendered pages may use at once, which "
+        "bounds how many of its pages are OCRed in parallel",
+    )
+    hash_size: int = Field(
+        default=16,
+        description="Side of the perceptual hash grid; larger grids tell apart "
+        "documents that share a layout",
+    )
+
+
+class TabularConfig(BaseModel):
+    """Configuration for spreadsheet and CSV extraction."""
+
+    max_sheets: int = Field(default=10, description="Workbook sheets read at most")
+    max_rows: int = Field(
+        default=50, description="Rows read from the top of each sheet or CSV file"
+    )
+    max_columns: int = Field(
+        default=20, description="Leading cells of each row that are emitted"
+    )
+    max_cells: int = Field(
+        default=2000,
+        description="Non-empty cells emitted per file, after which reading stops",
+    )
+
+
+class CacheConfig(BaseModel):
+    """Configuration for the classification result cache."""
+
+    enabled: bool = Field(default=True, description="Whether results are cached")
+    max_entries: int = Field(
+        default=4096, description="Maximum number of results kept in memory"
+    )
+    ttl_seconds: float = Field(
+        default=3600.0, description="Time after which a cached result expires"
+    )
+    disk_path: Optional[str] = Field(
+        default=None,
+        description="Path of an SQLite file shared by all workers; "
+        "disables the disk tier when unset",
+    )
+    disk_max_entries: int = Field(
+        default=100_000, description="Maximum number of results kept on disk"
+    )
+
+
+class JobsConfig(BaseModel):
+    """Configuration for the asynchronous job queue."""
+
+    directory: str = Field(
+        default=os.path.join(tempfile.gettempdir(), "heron-jobs"),
+        description="Directory holding the queue database and queued files; "
+        "shared by every uvicorn worker",
+    )
+    workers: int = Field(
+        default=2, description="Jobs run concurrently by each uvicorn worker"
+    )
+    max_queued: int = Field(
+        default=1000,
+        description="Queued and running jobs above which submissions are refused",
+    )
+    max_attempts: int = Field(
+        default=3, description="Runs of a job before it is given up"
+    )
+    retry_backoff_seconds: float = Field(
+        default=5.0,
+        description="Delay before a job is retried, doubled for every further attempt",
+    )
+    lease_seconds: float = Field(
+        default=600.0,
+        description="Time after which a running job is assumed lost with its "
+        "worker and is run again",
+    )
+    result_ttl_seconds: float = Field(
+        default=86400.0, description="Time finished jobs are kept for polling"
+    )
+    poll_interval_seconds: float = Field(
+        default=1.0,
+        description="How often idle workers look for jobs submitted to other workers",
+    )
+    retry_after_seconds: int = Field(
+        default=10, description="Retry-After sent when the queue is full"
+    )
+
+
+class FeedbackConfig(BaseModel):
+    """Configuration for label feedback and the background model trainer."""
+
+    enabled: bool = Field(
+        default=True, description="Whether feedback is learned by a background trainer"
+    )
+    directory: str = Field(
+        default=os.path.join(tempfile.gettempdir(), "heron-models"),
+        description="Directory holding the feedback database and model versions; "
+        "shared by every uvicorn worker",
+    )
+    min_examples: int = Field(
+        default=20,
+        description="Feedback examples collected before the trainer updates the model",
+    )
+    train_interval_seconds: float = Field(
+        default=300.0, description="How often the trainer looks for new feedback"
+    )
+    poll_interval_seconds: float = Field(
+        default=5.0,
+        description="How often each worker checks for a newly activated model",
+    )
+    lease_seconds: float = Field(
+        default=600.0,
+        description="Time after which a training run is assumed lost with its "
+        "worker, letting another worker train",
+    )
+    keep_versions: int = Field(
+        default=10, description="Model versions kept for rollback, the active one aside"
+    )
+
+
+class BatchConfig(BaseModel):
+    """Configuration for batch classification."""
+
+    max_files: int = Field(
+        default=1000, description="Maximum number of files in a single batch"
+    )
+    max_concurrency: int = Field(
+        default=8, description="Maximum number of files classified concurrently"
+    )
+
+
+class ScoringConfig(BaseModel):
+    """Configuration for the scoring mode of the composite classifier."""
+
+    weights: Dict[str, float] = Field(
+        default={
+            "FilenameClassifier": 0.6,
+            "FuzzyClassifier": 0.3,
+            "RegexClassifier": 1.0,
+            "TFIDFClassifier": 0.8,
+            "HashingClassifier": 0.8,
+        },
+        description="Weight of each classifier's score, by class name; both "
+        "filename classifiers together weigh less than one content match",
+    )
+    decision_margin: float = Field(
+        default=1.5,
+        description="Weighted lead over the runner-up at which the remaining "
+        "classifiers are cancelled",
+    )
+    min_score: float = Field(
+        default=0.2,
+        description="Minimum weighted score for the leading type to be returned",
+    )
+
+
+class ReloadConfig(BaseModel):
+    """Configuration for reloading the configuration file while running."""
+
+    enabled: bool = Field(
+        default=True, description="Whether the configuration file is watched"
+    )
+    poll_interval_seconds: float = Field(
+        default=2.0, description="How often the configuration file is checked"
+    )
+
+
+class AdaptiveConfig(BaseModel):
+    """Configuration for the adaptive order of the composite classifier."""
+
+    pinned_order: Optional[List[str]] = Field(
+        default=None,
+        description="Fixed classifier order by class name; overrides the learned "
+        "order, and classifiers left out are not run",
+    )
+    min_samples: int = Field(
+        default=50,
+        description="Exploration runs of every classifier on a file type before "
+        "reordering it; until then every request explores",
+    )
+    decay: float = Field(
+        default=0.99, description="Weight kept by older runs on every new run"
+    )
+    skip_hit_rate: float = Field(
+        default=0.01, description="Hit rate below which a classifier is skipped"
+    )
+    explore_rate: float = Field(
+        default=0.05,
+        description="Share of requests that explore: they run every classifier, "
+        "skipped ones and those after the first hit, to measure hit rates",
+    )
 
 
 class DocumentPatterns(BaseModel):
@@ -202,6 +593,18 @@ class AppConfig(BaseModel):
     """Main application configuration."""
 
     classifier: ClassifierConfig = Field(default_factory=ClassifierConfig)
+    executor: ExecutorConfig = Field(default_factory=ExecutorConfig)
+    extraction: ExtractionConfig = Field(default_factory=ExtractionConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
+    ocr: OCRConfig = Field(default_factory=OCRConfig)
+    tabular: TabularConfig = Field(default_factory=TabularConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    batch: BatchConfig = Field(default_factory=BatchConfig)
+    jobs: JobsConfig = Field(default_factory=JobsConfig)
+    feedback: FeedbackConfig = Field(default_factory=FeedbackConfig)
+    reload: ReloadConfig = Field(default_factory=ReloadConfig)
+    scoring: ScoringConfig = Field(default_factory=ScoringConfig)
+    adaptive: AdaptiveConfig = Field(default_factory=AdaptiveConfig)
     patterns: DocumentPatterns = Field(default_factory=DocumentPatterns)
     regex_patterns: RegexPatterns = Field(default_factory=RegexPatterns)
     model_name: str = Field(default="distilbert-base-uncased")
@@ -231,5 +634,105 @@ class AppConfig(BaseModel):
         default=default_tf_idf_training_data, description="Training data for TF-IDF"
     )
 
+    def fingerprint(self) -> str:
+        """
+        Get a stable hash of every setting that affects classification results.
+
+        Returns:
+            str: Hex digest of the classification-relevant configuration
+        """
+        relevant = self.model_dump_json(
+            exclude={
+                "executor": True,
+                "cache": True,
+                "batch": True,
+                "jobs": True,
+                "feedback": True,
+                "reload": True,
+                "admission": True,
+                "classifier": {"tfidf_model_path"},
+            }
+        )
+        return hashlib.sha256(relevant.encode("utf-8")).hexdigest()
+
+    def version(self) -> str:
+        """Get a short identifier of the classification-relevant configuration."""
+        return self.fingerprint()[:12]
+
+    def tfidf_fingerprint(self) -> str:
+        """
+        Get a stable hash of the settings a trained TF-IDF model depends on.
+
+        Returns:
+            str: Hex digest of the TF-IDF features and training data config
+        """
+        relevant = json.dumps(
+            {
+                "max_features": self.classifier.max_features,
+                "training_data": self.tfidf_training_data,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(relevant.encode("utf-8")).hexdigest()
+
+    def hashing_fingerprint(self) -> str:
+        """
+        Get a stable hash of the settings a trained hashing model depends on.
+
+        Returns:
+            str: Hex digest of the hashed features, model and training data
+        """
+        relevant = json.dumps(
+            {
+                "n_features": self.classifier.hashing_n_features,
+                "model": self.classifier.hashing_model,
+                "training_data": self.tfidf_training_data,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(relevant.encode("utf-8")).hexdigest()
+
+
+class ConfigFileError(ValueError):
+    """Raised when a configuration file cannot be read or is invalid."""
+
+
+def load_config(path: str) -> AppConfig:
+    """
+    Load the configuration from a YAML or JSON file.
+
+    Settings missing from the file keep their defaults. YAML needs PyYAML.
+
+    Args:
+        path: Path of a .yaml, .yml or .json file
+
+    Returns:
+        AppConfig: The validated configuration
+
+    Raises:
+        ConfigFileError: If the file cannot be read, parsed or validated
+    """
+    try:
+        with open(path, encoding="utf-8") as config_file:
+            if path.endswith((".yaml", ".yml")):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ConfigFileError(
+                        f"Reading {path} needs PyYAML; install it or use JSON"
+                    )
+                data: Any = yaml.safe_load(config_file)
+            else:
+                data = json.load(config_file)
+        return AppConfig.model_validate(data or {})
+    except ConfigFileError:
+        raise
+    except Exception as e:
+        raise ConfigFileError(f"Invalid configuration file {path}: {str(e)}")
+
 
-config = AppConfig()
+config = (
+    load_config(os.environ[CONFIG_FILE_ENV])
+    if os.environ.get(CONFIG_FILE_ENV)
+    else AppConfig()
+)
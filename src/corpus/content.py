@@ -0,0 +1,561 @@
+"""
+Realistic synthetic bank statements, invoices and driver's licences.
+
+Documents are built from per-language templates with random names,
+addresses, amounts and dates. Everything is drawn from the given random
+generator, so a seed fully determines the output.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Dict, List, NamedTuple, Tuple
+
+LABELS = ("bank_statement", "invoice", "drivers_licence")
+LANGUAGES = ("en", "es", "fr", "de")
+
+# Labels, titles and line item wording per language and document type
+TEMPLATES: Dict[str, Dict[str, Dict]] = {
+    "en": {
+        "invoice": {
+            "titles": ["INVOICE", "Tax Invoice", "Invoice"],
+            "fields": [
+                "Invoice Number",
+                "Invoice Date",
+                "Due Date",
+                "Bill To",
+                "Payment Terms",
+            ],
+            "terms": ["Net 30", "Net 14", "Due on receipt"],
+            "columns": ["Description", "Quantity", "Unit Price", "Amount"],
+            "totals": ["Subtotal", "Tax", "Total Amount Due"],
+            "items": [
+                "Consulting services",
+                "Office supplies",
+                "Software licence",
+                "Maintenance contract",
+                "Delivery charge",
+                "Training session",
+                "Hardware repair",
+                "Cloud hosting",
+            ],
+        },
+        "bank_statement": {
+            "titles": ["BANK STATEMENT", "Account Statement", "Monthly Statement"],
+            "fields": [
+                "Account Holder",
+                "Account Number",
+                "Statement Period",
+                "Opening Balance",
+            ],
+            "columns": ["Date", "Description", "Debit", "Credit", "Balance"],
+            "totals": ["Closing Balance"],
+            "items": [
+                "Card payment",
+                "Direct debit",
+                "Salary",
+                "Transfer to savings",
+                "ATM withdrawal",
+                "Interest",
+                "Standing order",
+                "Refund",
+            ],
+        },
+        "drivers_licence": {
+            "titles": ["DRIVER LICENCE", "DRIVER'S LICENSE", "Driving Licence"],
+            "fields": [
+                "Licence Number",
+                "Surname",
+                "Given Names",
+                "Date of Birth",
+                "Address",
+                "Issue Date",
+                "Expiry Date",
+                "Class",
+            ],
+        },
+    },
+    "es": {
+        "invoice": {
+            "titles": ["FACTURA", "Factura"],
+            "fields": [
+                "Número de factura",
+                "Fecha de factura",
+                "Fecha de vencimiento",
+                "Facturar a",
+                "Condiciones de pago",
+            ],
+            "terms": ["30 días", "15 días", "Al contado"],
+            "columns": ["Descripción", "Cantidad", "Precio unitario", "Importe"],
+            "totals": ["Subtotal", "IVA", "Total a pagar"],
+            "items": [
+                "Servicios de consultoría",
+                "Material de oficina",
+                "Licencia de software",
+                "Contrato de mantenimiento",
+                "Gastos de envío",
+                "Formación",
+                "Reparación de equipos",
+                "Alojamiento en la nube",
+            ],
+        },
+        "bank_statement": {
+            "titles": ["EXTRACTO BANCARIO", "Extracto de cuenta"],
+            "fields": [
+                "Titular",
+                "Número de cuenta",
+                "Periodo del extracto",
+                "Saldo inicial",
+            ],
+            "columns": ["Fecha", "Concepto", "Cargo", "Abono", "Saldo"],
+            "totals": ["Saldo final"],
+            "items": [
+                "Pago con tarjeta",
+                "Recibo domiciliado",
+                "Nómina",
+                "Transferencia",
+                "Retirada de cajero",
+                "Intereses",
+                "Orden permanente",
+                "Devolución",
+            ],
+        },
+        "drivers_licence": {
+            "titles": ["PERMISO DE CONDUCIR", "Permiso de conducción"],
+            "fields": [
+                "Número de permiso",
+                "Apellidos",
+                "Nombre",
+                "Fecha de nacimiento",
+                "Domicilio",
+                "Fecha de expedición",
+                "Fecha de caducidad",
+                "Clase",
+            ],
+        },
+    },
+    "fr": {
+        "invoice": {
+            "titles": ["FACTURE", "Facture"],
+            "fields": [
+                "Numéro de facture",
+                "Date de facture",
+                "Date d'échéance",
+                "Facturer à",
+                "Conditions de paiement",
+            ],
+            "terms": ["30 jours", "15 jours", "À réception"],
+            "columns": ["Désignation", "Quantité", "Prix unitaire", "Montant"],
+            "totals": ["Sous-total", "TVA", "Montant total dû"],
+            "items": [
+                "Prestations de conseil",
+                "Fournitures de bureau",
+                "Licence logicielle",
+                "Contrat de maintenance",
+                "Frais de livraison",
+                "Formation",
+                "Réparation matériel",
+                "Hébergement cloud",
+            ],
+        },
+        "bank_statement": {
+            "titles": ["RELEVÉ DE COMPTE", "Relevé bancaire"],
+            "fields": [
+                "Titulaire",
+                "Numéro de compte",
+                "Période du relevé",
+                "Solde initial",
+            ],
+            "columns": ["Date", "Libellé", "Débit", "Crédit", "Solde"],
+            "totals": ["Solde final"],
+            "items": [
+                "Paiement par carte",
+                "Prélèvement",
+                "Salaire",
+                "Virement",
+                "Retrait DAB",
+                "Intérêts",
+                "Virement permanent",
+                "Remboursement",
+            ],
+        },
+        "drivers_licence": {
+            "titles": ["PERMIS DE CONDUIRE", "Permis de conduire"],
+            "fields": [
+                "Numéro de permis",
+                "Nom",
+                "Prénoms",
+                "Date de naissance",
+                "Adresse",
+                "Date de délivrance",
+                "Date d'expiration",
+                "Catégorie",
+            ],
+        },
+    },
+    "de": {
+        "invoice": {
+            "titles": ["RECHNUNG", "Rechnung"],
+            "fields": [
+                "Rechnungsnummer",
+                "Rechnungsdatum",
+                "Fälligkeitsdatum",
+                "Rechnungsempfänger",
+                "Zahlungsbedingungen",
+            ],
+            "terms": ["30 Tage netto", "14 Tage netto", "Sofort fällig"],
+            "columns": ["Beschreibung", "Menge", "Einzelpreis", "Betrag"],
+            "totals": ["Zwischensumme", "MwSt.", "Gesamtbetrag fällig"],
+            "items": [
+                "Beratungsleistungen",
+                "Büromaterial",
+                "Softwarelizenz",
+                "Wartungsvertrag",
+                "Versandkosten",
+                "Schulung",
+                "Hardwarereparatur",
+                "Cloud-Hosting",
+            ],
+        },
+        "bank_statement": {
+            "titles": ["KONTOAUSZUG", "Kontoauszug"],
+            "fields": [
+                "Kontoinhaber",
+                "Kontonummer",
+                "Auszugszeitraum",
+                "Anfangssaldo",
+            ],
+            "columns": ["Datum", "Buchungstext", "Soll", "Haben", "Saldo"],
+            "totals": ["Endsaldo"],
+            "items": [
+                "Kartenzahlung",
+                "Lastschrift",
+                "Gehalt",
+                "Überweisung",
+                "Geldautomat",
+                "Zinsen",
+                "Dauerauftrag",
+                "Erstattung",
+            ],
+        },
+        "drivers_licence": {
+            "titles": ["FÜHRERSCHEIN", "Führerschein"],
+            "fields": [
+                "Führerscheinnummer",
+                "Name",
+                "Vornamen",
+                "Geburtsdatum",
+                "Anschrift",
+                "Ausstellungsdatum",
+                "Ablaufdatum",
+                "Klasse",
+            ],
+        },
+    },
+}
+
+# Names and places per language
+PEOPLE: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "given": ["James", "Olivia", "Amelia", "Noah", "Jack", "Isla", "Harry", "Mia"],
+        "surnames": ["Smith", "Jones", "Taylor", "Brown", "Wilson", "Evans", "Walker"],
+        "streets": ["High Street", "Station Road", "Church Lane", "Park Avenue"],
+        "cities": ["London", "Manchester", "Leeds", "Bristol", "Glasgow", "Cardiff"],
+        "companies": ["Acme Ltd", "Northwind Traders", "Blue Harbour plc"],
+    },
+    "es": {
+        "given": ["Lucía", "Hugo", "Martina", "Mateo", "Sofía", "Pablo", "Carmen"],
+        "surnames": ["García", "Martínez", "López", "Sánchez", "Pérez", "Gómez"],
+        "streets": ["Calle Mayor", "Avenida de la Paz", "Calle del Sol"],
+        "cities": ["Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao"],
+        "companies": ["Suministros Iberia S.L.", "Soluciones Norte S.A."],
+    },
+    "fr": {
+        "given": ["Léa", "Gabriel", "Chloé", "Louis", "Manon", "Jules", "Camille"],
+        "surnames": ["Martin", "Bernard", "Dubois", "Thomas", "Robert", "Petit"],
+        "streets": ["rue de la Paix", "avenue Victor Hugo", "boulevard Voltaire"],
+        "cities": ["Paris", "Lyon", "Marseille", "Toulouse", "Nantes", "Lille"],
+        "companies": ["Conseil Durand SARL", "Bureautique Lefèvre SA"],
+    },
+    "de": {
+        "given": ["Lena", "Lukas", "Mia", "Leon", "Hannah", "Felix", "Jonas"],
+        "surnames": ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Becker"],
+        "streets": ["Hauptstraße", "Bahnhofstraße", "Gartenweg", "Schulstraße"],
+        "cities": ["Berlin", "Hamburg", "München", "Köln", "Frankfurt", "Stuttgart"],
+        "companies": ["Nordlicht GmbH", "Technik Bauer AG", "Rhein Handel KG"],
+    },
+}
+
+# Filename stems per language and document type, for meaningful filenames
+FILENAME_STEMS: Dict[str, Dict[str, List[str]]] = {
+    "en": {
+        "invoice": ["invoice", "inv", "bill"],
+        "bank_statement": ["bank_statement", "statement", "account_statement"],
+        "drivers_licence": ["drivers_license", "drivers_licence", "dl_scan"],
+    },
+    "es": {
+        "invoice": ["factura"],
+        "bank_statement": ["extracto_bancario", "extracto"],
+        "drivers_licence": ["permiso_conducir", "carnet_conducir"],
+    },
+    "fr": {
+        "invoice": ["facture"],
+        "bank_statement": ["releve_compte", "releve_bancaire"],
+        "drivers_licence": ["permis_conduire"],
+    },
+    "de": {
+        "invoice": ["rechnung"],
+        "bank_statement": ["kontoauszug"],
+        "drivers_licence": ["fuehrerschein"],
+    },
+}
+
+DATE_FORMATS = {"en": "%d %b %Y", "es": "%d/%m/%Y", "fr": "%d/%m/%Y", "de": "%d.%m.%Y"}
+
+# Characters OCR and typing commonly confuse
+CONFUSIONS = {"o": "0", "0": "o", "l": "1", "1": "l", "e": "c", "a": "o", "s": "5"}
+
+# Lines of a table that fit on a page next to the document's heading
+TABLE_ROWS_PER_PAGE = 40
+
+
+class SyntheticDocument(NamedTuple):
+    """A generated document before it is rendered to a file format."""
+
+    label: str
+    language: str
+    title: str
+    # Labelled values such as the invoice number
+    fields: List[Tuple[str, str]]
+    # Column headings and rows of the document's table, if it has one
+    columns: List[str]
+    rows: List[List[str]]
+    # Labelled values after the table, such as totals
+    totals: List[Tuple[str, str]]
+
+    def lines(self) -> List[str]:
+        """The document as lines of text, as a reader would see it."""
+        lines = [self.title, ""]
+        lines += [f"{name}: {value}" for name, value in self.fields]
+        if self.columns:
+            lines += ["", "  ".join(self.columns)]
+            lines += ["  ".join(row) for row in self.rows]
+        if self.totals:
+            lines.append("")
+            lines += [f"{name}: {value}" for name, value in self.totals]
+        return lines
+
+    def table(self) -> List[List[str]]:
+        """The document as spreadsheet rows."""
+        rows = [[self.title], []]
+        rows += [[name, value] for name, value in self.fields]
+        if self.columns:
+            rows += [[], list(self.columns)] + [list(row) for row in self.rows]
+        if self.totals:
+            rows += [[]] + [[name, value] for name, value in self.totals]
+        return rows
+
+
+def money(amount: float, language: str) -> str:
+    """Format an amount the way the language writes it."""
+    text = f"{amount:,.2f}"
+    if language == "en":
+        return text
+    separator = " " if language == "fr" else "."
+    return text.replace(",", " ").replace(".", ",").replace(" ", separator)
+
+
+def _date(rng: random.Random, start: int = 2019, end: int = 2025) -> date:
+    """A random date between the start of one year and the end of another."""
+    first = date(start, 1, 1)
+    return first + timedelta(days=rng.randrange((date(end, 12, 31) - first).days))
+
+
+def _person(rng: random.Random, language: str) -> Tuple[str, str, str]:
+    """A random given name, surname and address."""
+    people = PEOPLE[language]
+    address = (
+        f"{rng.randint(1, 200)} {rng.choice(people['streets'])}, "
+        f"{rng.choice(people['cities'])}"
+    )
+    return rng.choice(people["given"]), rng.choice(people["surnames"]), address
+
+
+def _invoice(
+    rng: random.Random, language: str, template: Dict, rows: int
+) -> SyntheticDocument:
+    """Build an invoice with `rows` line items."""
+    fmt = DATE_FORMATS[language]
+    issued = _date(rng)
+    given, surname, address = _person(rng, language)
+    company = rng.choice(PEOPLE[language]["companies"])
+    customer = rng.choice([f"{given} {surname}", company])
+    values = [
+        f"INV-{issued.year}-{rng.randint(1, 99999):05d}",
+        issued.strftime(fmt),
+        (issued + timedelta(days=30)).strftime(fmt),
+        f"{customer}, {address}",
+        rng.choice(template["terms"]),
+    ]
+    items, subtotal = [], 0.0
+    for _ in range(rows):
+        quantity = rng.randint(1, 20)
+        price = round(rng.uniform(5, 500), 2)
+        subtotal += quantity * price
+        items.append(
+            [
+                rng.choice(template["items"]),
+                str(quantity),
+                money(price, language),
+                money(quantity * price, language),
+            ]
+        )
+    tax = subtotal * 0.2
+    totals = [subtotal, tax, subtotal + tax]
+    return SyntheticDocument(
+        label="invoice",
+        language=language,
+        title=rng.choice(template["titles"]),
+        fields=list(zip(template["fields"], values)),
+        columns=template["columns"],
+        rows=items,
+        totals=[
+            (name, money(amount, language))
+            for name, amount in zip(template["totals"], totals)
+        ],
+    )
+
+
+def _bank_statement(
+    rng: random.Random, language: str, template: Dict, rows: int
+) -> SyntheticDocument:
+    """Build a bank statement with `rows` transactions."""
+    fmt = DATE_FORMATS[language]
+    start = _date(rng)
+    given, surname, _ = _person(rng, language)
+    balance = round(rng.uniform(100, 20000), 2)
+    values = [
+        f"{given} {surname}",
+        f"{rng.randint(10000000, 99999999)}",
+        f"{start.strftime(fmt)} - {(start + timedelta(days=30)).strftime(fmt)}",
+        money(balance, language),
+    ]
+    transactions = []
+    for index in range(rows):
+        day = start + timedelta(days=index * 30 // max(rows, 1))
+        amount = round(rng.uniform(1, 1500), 2)
+        credit = rng.random() < 0.3
+        balance += amount if credit else -amount
+        transactions.append(
+            [
+                day.strftime(fmt),
+                rng.choice(template["items"]),
+                "" if credit else money(amount, language),
+                money(amount, language) if credit else "",
+                money(balance, language),
+            ]
+        )
+    return SyntheticDocument(
+        label="bank_statement",
+        language=language,
+        title=rng.choice(template["titles"]),
+        fields=list(zip(template["fields"], values)),
+        columns=template["columns"],
+        rows=transactions,
+        totals=[(template["totals"][0], money(balance, language))],
+    )
+
+
+def _drivers_licence(
+    rng: random.Random, language: str, template: Dict
+) -> SyntheticDocument:
+    """Build a driver's licence card."""
+    fmt = DATE_FORMATS[language]
+    given, surname, address = _person(rng, language)
+    issued = _date(rng, 2015, 2024)
+    try:
+        expires = issued.replace(year=issued.year + 10)
+    except ValueError:
+        # Issued on 29 February; the year it expires is not a leap year
+        expires = issued.replace(year=issued.year + 10, day=28)
+    values = [
+        f"{surname[:5].upper()}{rng.randint(100000, 999999)}",
+        surname.upper(),
+        given,
+        _date(rng, 1950, 2005).strftime(fmt),
+        address,
+        issued.strftime(fmt),
+        expires.strftime(fmt),
+        rng.choice(["B", "AM/B", "A/B", "B/BE", "C1"]),
+    ]
+    return SyntheticDocument(
+        label="drivers_licence",
+        language=language,
+        title=rng.choice(template["titles"]),
+        fields=list(zip(template["fields"], values)),
+        columns=[],
+        rows=[],
+        totals=[],
+    )
+
+
+def make_document(
+    rng: random.Random, label: str, language: str, pages: int = 1
+) -> SyntheticDocument:
+    """
+    Generate a document of the given type and language.
+
+    Args:
+        rng: Source of randomness
+        label: Document type, one of LABELS
+        language: Language code, one of LANGUAGES
+        pages: Pages the document's table should fill; licences have one
+
+    Returns:
+        SyntheticDocument: The generated document
+
+    Raises:
+        ValueError: If the label or language is unknown
+    """
+    if label not in LABELS or language not in LANGUAGES:
+        raise ValueError(f"Unknown document type or language: {label}, {language}")
+    template = TEMPLATES[language][label]
+    if label == "drivers_licence":
+        return _drivers_licence(rng, language, template)
+    rows = max(1, pages * TABLE_ROWS_PER_PAGE - 15)
+    if pages == 1:
+        rows = rng.randint(3, 20)
+    build = _invoice if label == "invoice" else _bank_statement
+    return build(rng, language, template, rows)
+
+
+def add_noise(
+    document: SyntheticDocument, rng: random.Random, noise: float
+) -> SyntheticDocument:
+    """
+    Garble a fraction of the characters of a document's values.
+
+    Headings and field names are kept, so noise degrades the content rather
+    than removing the cues classifiers rely on entirely.
+
+    Args:
+        document: The document to garble
+        rng: Source of randomness
+        noise: Amount of garbling from 0 to 1; at 1, one character in ten
+
+    Returns:
+        SyntheticDocument: A garbled copy of the document
+    """
+    if noise <= 0:
+        return document
+
+    def garble(text: str) -> str:
+        return "".join(
+            CONFUSIONS.get(char, char) if rng.random() < noise * 0.1 else char
+            for char in text
+        )
+
+    return document._replace(
+        fields=[(name, garble(value)) for name, value in document.fields],
+        rows=[[garble(cell) for cell in row] for row in document.rows],
+        totals=[(name, garble(value)) for name, value in document.totals],
+    )
@@ -0,0 +1,274 @@
+"""
+Generate a labelled synthetic corpus for load tests and model training.
+
+Usage:
+    python -m src.corpus.generate --output corpus [--count 3000] [--seed 0]
+        [--formats pdf,docx,xlsx,csv,txt,png,jpg] [--languages en,es,fr,de]
+        [--pages 1-5] [--width 800-2000] [--noise 0.2]
+        [--filenames meaningful|uuid|mixed]
+
+Files are written to the output directory with a `manifest.jsonl` holding
+one `{"path", "filename", "label", "format", "text", ...}` object per file,
+where `text` is what a perfect extractor would read. The manifest can be
+passed to `python -m src.train --corpus` as is, and to the benchmarks with
+`--corpus`.
+
+Each document is generated from its own seed derived from `--seed` and its
+index, so the same arguments always give the same files, and a larger
+`--count` extends a smaller corpus rather than reshuffling it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .content import LABELS, LANGUAGES, FILENAME_STEMS, add_noise, make_document
+from .render import (
+    fold_accents,
+    paginate,
+    render_csv,
+    render_docx,
+    render_image,
+    render_pdf,
+    render_text,
+    render_xlsx,
+)
+
+FORMATS = ("pdf", "docx", "xlsx", "csv", "txt", "png", "jpg")
+
+# Formats each document type realistically arrives in
+LABEL_FORMATS = {
+    "invoice": FORMATS,
+    "bank_statement": FORMATS,
+    "drivers_licence": ("pdf", "docx", "txt", "png", "jpg"),
+}
+
+FILENAME_STYLES = ("meaningful", "uuid", "mixed")
+
+MANIFEST = "manifest.jsonl"
+
+
+def _filename(
+    rng: random.Random, label: str, language: str, index: int, style: str
+) -> str:
+    """A filename stem, either telling of the document type or a UUID."""
+    if style == "mixed":
+        style = rng.choice(("meaningful", "uuid"))
+    if style == "uuid":
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    stem = rng.choice(FILENAME_STEMS[language][label])
+    separator = rng.choice(("_", "-", ""))
+    stem = stem.upper() if rng.random() < 0.1 else stem
+    return f"{stem}{separator}{index:05d}"
+
+
+def _render(
+    rng: random.Random,
+    document_lines: List[str],
+    table: List[List[str]],
+    file_format: str,
+    width: int,
+    noise: float,
+    card: bool,
+) -> Tuple[bytes, List[List[str]], Dict[str, Any]]:
+    """
+    Render a document to a file format.
+
+    Returns:
+        Tuple[bytes, List[List[str]], Dict[str, Any]]: The file, the lines
+            it shows per page, and format-specific manifest details
+    """
+    pages = paginate(document_lines)
+    if file_format == "pdf":
+        return render_pdf(pages), pages, {}
+    if file_format == "docx":
+        header = rng.choice([None, document_lines[0]])
+        body = pages if header is None else paginate(document_lines[1:])
+        shown = body if header is None else [[header] + body[0]] + body[1:]
+        return render_docx(body, header), shown, {}
+    if file_format == "txt":
+        return render_text(pages), pages, {}
+    if file_format == "xlsx":
+        return render_xlsx([(document_lines[0], table)]), [_table_lines(table)], {}
+    if file_format == "csv":
+        delimiter = rng.choice((",", ";", "\t"))
+        return render_csv(table, delimiter), [_table_lines(table)], {}
+
+    # Images show one page: a card for licences, the first page otherwise
+    lines = [fold_accents(line) for line in pages[0]]
+    height = int(width / 1.586) if card else int(width * 1.414)
+    image_format = "PNG" if file_format == "png" else "JPEG"
+    content = render_image(lines, (width, height), image_format, noise, rng, card)
+    return content, [lines], {"width": width, "height": height}
+
+
+def _table_lines(table: List[List[str]]) -> List[str]:
+    """Spreadsheet rows as the text lines a reader would see."""
+    return [" ".join(cell for cell in row if cell) for row in table]
+
+
+def _parse_range(value: str) -> Tuple[int, int]:
+    """Parse "3" or "1-5" into an inclusive range."""
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def generate(
+    output: str,
+    count: int,
+    seed: int = 0,
+    formats: Sequence[str] = FORMATS,
+    languages: Sequence[str] = LANGUAGES,
+    labels: Sequence[str] = LABELS,
+    pages: Tuple[int, int] = (1, 3),
+    width: Tuple[int, int] = (800, 2000),
+    noise: float = 0.0,
+    filenames: str = "meaningful",
+) -> List[Dict[str, Any]]:
+    """
+    Write a synthetic corpus and its manifest.
+
+    Document types take turns, so the corpus is balanced. Each document
+    gets a format its type realistically comes in, out of `formats`.
+
+    Args:
+        output: Directory to write the files and manifest to
+        count: Number of documents
+        seed: Seed the whole corpus is derived from
+        formats: File formats to produce
+        languages: Languages to write in
+        labels: Document types to produce
+        pages: Inclusive range of pages for statements and invoices
+        width: Inclusive range of image widths in pixels
+        noise: Amount of text garbling and image degradation from 0 to 1
+        filenames: "meaningful", "uuid" or "mixed" filenames
+
+    Returns:
+        List[Dict[str, Any]]: The manifest entries, also written as JSON Lines
+
+    Raises:
+        ValueError: If an option is unknown, or no requested format suits
+            any requested document type
+    """
+    unknown = (
+        set(formats) - set(FORMATS)
+        | set(languages) - set(LANGUAGES)
+        | set(labels) - set(LABELS)
+    )
+    if unknown or filenames not in FILENAME_STYLES:
+        raise ValueError(f"Unknown options: {sorted(unknown) or filenames}")
+    choices = {
+        label: [f for f in LABEL_FORMATS[label] if f in formats] for label in labels
+    }
+    labels = [label for label in labels if choices[label]]
+    if not labels:
+        raise ValueError(f"No document type comes in {', '.join(formats)}")
+
+    os.makedirs(output, exist_ok=True)
+    manifest = []
+    for index in range(count):
+        rng = random.Random(f"{seed}:{index}")
+        label = labels[index % len(labels)]
+        language = rng.choice(languages)
+        file_format = rng.choice(choices[label])
+        document = make_document(rng, label, language, rng.randint(*pages))
+        document = add_noise(document, rng, noise)
+        content, shown, details = _render(
+            rng,
+            document.lines(),
+            document.table(),
+            file_format,
+            rng.randint(*width),
+            noise,
+            label == "drivers_licence",
+        )
+        filename = f"{_filename(rng, label, language, index, filenames)}.{file_format}"
+        with open(os.path.join(output, filename), "wb") as f:
+            f.write(content)
+        manifest.append(
+            {
+                "path": filename,
+                "filename": filename,
+                "label": label,
+                "format": file_format,
+                "language": language,
+                "pages": len(shown),
+                "noise": noise,
+                "bytes": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+                **details,
+                "text": "\n".join("\n".join(lines) for lines in shown).strip(),
+            }
+        )
+
+    with open(os.path.join(output, MANIFEST), "w", encoding="utf-8") as f:
+        for entry in manifest:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return manifest
+
+
+def load_manifest(path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Read a corpus manifest, resolving file paths against its directory.
+
+    Args:
+        path: Path of the manifest.jsonl file, or of the corpus directory
+        limit: Maximum number of entries to read
+
+    Returns:
+        List[Dict[str, Any]]: The manifest entries, with absolute paths
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, MANIFEST)
+    directory = os.path.dirname(os.path.abspath(path))
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if limit is not None and len(entries) >= limit:
+                break
+            if line.strip():
+                entry = json.loads(line)
+                entry["path"] = os.path.join(directory, entry["path"])
+                entries.append(entry)
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", required=True, help="Directory to write to")
+    parser.add_argument("--count", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--languages", default=",".join(LANGUAGES))
+    parser.add_argument("--labels", default=",".join(LABELS))
+    parser.add_argument("--pages", default="1-3", help="page range, such as 1-5")
+    parser.add_argument("--width", default="800-2000", help="image width range")
+    parser.add_argument("--noise", type=float, default=0.0, help="from 0 to 1")
+    parser.add_argument("--filenames", default="meaningful", choices=FILENAME_STYLES)
+    args = parser.parse_args()
+
+    manifest = generate(
+        args.output,
+        args.count,
+        seed=args.seed,
+        formats=args.formats.split(","),
+        languages=args.languages.split(","),
+        labels=args.labels.split(","),
+        pages=_parse_range(args.pages),
+        width=_parse_range(args.width),
+        noise=args.noise,
+        filenames=args.filenames,
+    )
+    formats = Counter(entry["format"] for entry in manifest)
+    labels = Counter(entry["label"] for entry in manifest)
+    print(f"Wrote {len(manifest)} documents to {args.output}")
+    print(f"  by type:   {dict(labels)}")
+    print(f"  by format: {dict(formats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Writers that turn lines of text into PDF, DOCX, XLSX, CSV, TXT and images.
+
+Every writer is deterministic: the same input gives the same bytes, with
+ZIP timestamps and document properties pinned, so a corpus can be compared
+and cached by hash across runs.
+"""
+
+import csv
+import io
+import random
+import unicodedata
+import zipfile
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+from openpyxl import Workbook
+from openpyxl.writer.excel import ExcelWriter
+from PIL import Image, ImageDraw, ImageFilter
+
+# ZIP entry time used by every package writer
+FIXED_ZIP_TIME = (1980, 1, 1, 0, 0, 0)
+FIXED_DOCUMENT_TIME = datetime(2024, 1, 1)
+
+# Lines of text on one page of the paged formats
+LINES_PER_PAGE = 45
+
+# A sheet name and its rows
+Sheet = Tuple[str, List[List[Any]]]
+
+
+def paginate(lines: List[str], per_page: int = LINES_PER_PAGE) -> List[List[str]]:
+    """Split lines into pages of at most `per_page` lines."""
+    return [lines[i : i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+
+
+def fold_accents(text: str) -> str:
+    """Reduce text to ASCII, as Pillow's built-in font has no accented glyphs."""
+    text = unicodedata.normalize("NFKD", text.replace("ß", "ss"))
+    return text.encode("ascii", "ignore").decode()
+
+
+def _zip(members: Sequence[Tuple[str, bytes]]) -> bytes:
+    """Pack members into a ZIP archive with fixed entry times."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            info = zipfile.ZipInfo(name, FIXED_ZIP_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, data)
+    return buffer.getvalue()
+
+
+def _pdf_string(text: str) -> str:
+    """Escape text for a PDF literal string."""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(pages: List[List[str]], font_size: int = 10) -> bytes:
+    """
+    Build a PDF whose pages carry the given lines as a text layer.
+
+    Args:
+        pages: Lines of text per page; characters outside Latin-1 are dropped
+        font_size: Font size in points
+
+    Returns:
+        bytes: The PDF file
+    """
+    leading = font_size + 2
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        "/Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for lines in pages:
+        shown = " ".join(f"({_pdf_string(line)}) '" for line in lines)
+        stream = f"BT /F1 {font_size} Tf {leading} TL 50 800 Td {shown} ET"
+        length = len(stream.encode("latin-1", "ignore"))
+        objects.append(f"<< /Length {length} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R "
+            "/MediaBox [0 0 612 792] /CropBox [0 0 612 792] "
+            f"/Contents {len(objects)} 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "ignore"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n".encode()
+    )
+    return out.getvalue()
+
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+_PACKAGE_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_DOCUMENT_RELS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_WORD_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml"
+
+
+def _paragraph(text: str) -> str:
+    """A WordprocessingML paragraph holding one run of text."""
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def render_docx(pages: List[List[str]], header: Optional[str] = None) -> bytes:
+    """
+    Build a Word document with a page break between pages.
+
+    Args:
+        pages: Lines of text per page, one paragraph per line
+        header: Text of the page header, if any
+
+    Returns:
+        bytes: The docx file
+    """
+    page_break = '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+    body = page_break.join(
+        "".join(_paragraph(line) for line in lines) for lines in pages
+    )
+    section = ""
+    overrides = (
+        '<Override PartName="/word/document.xml" '
+        f'ContentType="{_WORD_TYPE}.document.main+xml"/>'
+    )
+    relationships = ""
+    members = []
+    if header is not None:
+        section = '<w:headerReference w:type="default" r:id="rId1"/>'
+        overrides += (
+            '<Override PartName="/word/header1.xml" '
+            f'ContentType="{_WORD_TYPE}.header+xml"/>'
+        )
+        relationships = (
+            f'<Relationship Id="rId1" Type="{_DOCUMENT_RELS}/header" '
+            'Target="header1.xml"/>'
+        )
+        members.append(
+            ("word/header1.xml", f"<w:hdr {_W}>{_paragraph(header)}</w:hdr>")
+        )
+
+    members = [
+        (
+            "[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+            'content-types"><Default Extension="rels" ContentType="application/'
+            'vnd.openxmlformats-package.relationships+xml"/><Default '
+            f'Extension="xml" ContentType="application/xml"/>{overrides}</Types>',
+        ),
+        (
+            "_rels/.rels",
+            f'<Relationships xmlns="{_PACKAGE_RELS}"><Relationship Id="rId1" '
+            f'Type="{_DOCUMENT_RELS}/officeDocument" Target="word/document.xml"/>'
+            "</Relationships>",
+        ),
+        (
+            "word/document.xml",
+            f"<w:document {_W} {_R}><w:body>{body}"
+            f"<w:sectPr>{section}</w:sectPr></w:body></w:document>",
+        ),
+        (
+            "word/_rels/document.xml.rels",
+            f'<Relationships xmlns="{_PACKAGE_RELS}">{relationships}</Relationships>',
+        ),
+    ] + members
+    declaration = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    return _zip([(name, (declaration + xml).encode()) for name, xml in members])
+
+
+def render_xlsx(sheets: List[Sheet]) -> bytes:
+    """
+    Build a workbook with one sheet per entry.
+
+    A regular rather than write-only workbook is used, so each sheet
+    records its dimensions as Excel does.
+
+    Args:
+        sheets: Sheet names and their rows
+
+    Returns:
+        bytes: The xlsx file
+    """
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    workbook.properties.created = FIXED_DOCUMENT_TIME
+    workbook.properties.modified = FIXED_DOCUMENT_TIME
+    for name, rows in sheets:
+        sheet = workbook.create_sheet(name[:31])
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    # Workbook.save would stamp the modified time; the writer keeps ours
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        ExcelWriter(workbook, archive).save()
+    # Entries are stamped with the current time; repack them
+    with zipfile.ZipFile(buffer) as archive:
+        members = [(info.filename, archive.read(info)) for info in archive.infolist()]
+    return _zip(members)
+
+
+def render_csv(rows: List[List[Any]], delimiter: str = ",") -> bytes:
+    """Build a UTF-8 CSV file from rows."""
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=delimiter, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def render_text(pages: List[List[str]]) -> bytes:
+    """Build a UTF-8 text file, with a blank line between pages."""
+    return "\n\n".join("\n".join(lines) for lines in pages).encode()
+
+
+def render_image(
+    lines: List[str],
+    size: Tuple[int, int],
+    image_format: str = "PNG",
+    noise: float = 0.0,
+    rng: Optional[random.Random] = None,
+    photo: bool = False,
+) -> bytes:
+    """
+    Draw lines of text as a photographed or scanned document.
+
+    Noise blends in grain, blurs and tilts the image and, for JPEG, lowers
+    the quality, roughly as a phone photo would.
+
+    Args:
+        lines: Lines of text, top to bottom, in ASCII (see `fold_accents`)
+        size: Width and height in pixels
+        image_format: Pillow format to encode with, such as JPEG or PNG
+        noise: Amount of degradation from 0 to 1
+        rng: Source of randomness for the noise
+        photo: Whether to leave room for, and draw, an ID photo on the left
+
+    Returns:
+        bytes: The encoded image
+    """
+    rng = rng or random.Random(0)
+    width, height = size
+    # Grayscale, as scans are, keeps blurring and encoding quick
+    image = Image.new("L", size, "white")
+    draw = ImageDraw.Draw(image)
+    font_size = max(8, min(height // (len(lines) + 4), width // 40))
+    left = font_size
+    if photo:
+        box = (font_size, height // 4, width // 3, height - font_size)
+        draw.rectangle(box, fill=200, outline="black")
+        left = width // 3 + font_size
+    for index, line in enumerate(lines):
+        y = font_size + index * (font_size + font_size // 3)
+        draw.text((left, y), line, fill="black", font_size=font_size)
+
+    if noise > 0:
+        grain_size = (max(1, width // 4), max(1, height // 4))
+        grain = Image.frombytes(
+            "L", grain_size, rng.randbytes(grain_size[0] * grain_size[1])
+        ).resize(size)
+        image = Image.blend(image, grain, 0.25 * noise)
+        image = image.filter(ImageFilter.GaussianBlur(noise))
+        angle = rng.uniform(-3, 3) * noise
+        image = image.rotate(angle, expand=False, fillcolor="white")
+
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.save(buffer, image_format, quality=int(90 - 40 * noise))
+    else:
+        # Grain does not compress, so spend little effort trying
+        image.save(buffer, image_format, compress_level=1)
+    return buffer.getvalue()
@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, List, Optional
+from fastapi import UploadFile
+from .config import ALLOWED_EXTENSIONS, config
+from .extractors.admission import AdmissionRejectedError, admission
+from .extractors.base import BaseTextExtractor
+from .extractors.executor import ExecutorSaturatedError
+from .extractors.factory import TextExtractorFactory
+from .metrics import EXTRACTION_FAILURES, STAGE_SECONDS
+from .utils.content import Content, close_content, read_upload
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentContext:
+    """
+    Request-scoped view of an uploaded file shared by every classifier.
+
+    The content, the detected MIME type and the extracted text are computed
+    lazily on first access and memoized, so text extraction runs at most once
+    per upload regardless of how many content classifiers are chained.
+    Paged documents are extracted a batch of pages at a time, so consumers
+    that only need the first pages never pay for the rest.
+    """
+
+    def __init__(self, file: UploadFile):
+        """
+        Initialize the document context.
+
+        Args:
+            file: The uploaded file backing this context
+        """
+        self.file = file
+        self.filename = file.filename
+        self._content: Optional[Content] = None
+        self._mime_type: Optional[str] = None
+        self._mime_detected = False
+        self._extractor: Optional[BaseTextExtractor] = None
+        self._pages: List[str] = []
+        self._page_count: Optional[int] = None
+        self._text: Optional[str] = None
+        self._text_error: Optional[Exception] = None
+        self._ocr_pages: List[int] = []
+        self._partial = False
+        # Set once the answer is known; extraction after that only feeds
+        # classifier statistics, so its failures do not affect the result
+        self._settled = False
+        self._late_error = False
+        # Set when extraction starts; bounds optional work such as OCR
+        self._deadline: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def file_type(self) -> str:
+        """The file extension, or "other" for anything unexpected."""
+        extension = (self.filename or "").rsplit(".", 1)[-1].lower()
+        return extension if extension in ALLOWED_EXTENSIONS else "other"
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether results derived from this document may be cached."""
+        if self._partial:
+            # A budget cut extraction short; a later attempt may see more
+            return False
+        if self._late_error:
+            return True
+        return not isinstance(
+            self._text_error, (ExecutorSaturatedError, TimeoutError)
+        )
+
+    @property
+    def rejection(self) -> Optional[AdmissionRejectedError]:
+        """The admission rejection that stopped extraction, if any."""
+        if isinstance(self._text_error, AdmissionRejectedError):
+            return None if self._late_error else self._text_error
+        return None
+
+    def settle(self) -> None:
+        """Mark the answer as found, before classifiers run only to be measured."""
+        self._settled = True
+
+    @property
+    def paged(self) -> bool:
+        """Whether the document's format has pages."""
+        return self._extractor is not None and self._extractor.paged
+
+    @property
+    def pages_processed(self) -> int:
+        """Number of pages extracted so far."""
+        return len(self._pages)
+
+    @property
+    def page_count(self) -> Optional[int]:
+        """Total number of pages, once known."""
+        return self._page_count
+
+    @property
+    def ocr_pages(self) -> List[int]:
+        """Indices of the pages whose text was recognized by OCR."""
+        return self._ocr_pages
+
+    async def get_content(self) -> Content:
+        """
+        Get the content of the uploaded file.
+
+        Uploads spooled to disk are memory-mapped rather than read, so
+        hashing, type detection and extraction share one view of the file.
+
+        Returns:
+            Content: The file content
+        """
+        if self._content is None:
+            with STAGE_SECONDS.labels("read").time():
+                self._content = await asyncio.to_thread(read_upload, self.file)
+        return self._content
+
+    def close(self) -> None:
+        """Release the mapped content; extraction jobs still running keep it."""
+        close_content(self._content)
+
+    async def get_mime_type(self) -> Optional[str]:
+        """
+        Get the MIME type sniffed from the file header.
+
+        Returns:
+            Optional[str]: The detected MIME type, or None if detection failed
+        """
+        if not self._mime_detected:
+            content = await self.get_content()
+            with STAGE_SECONDS.labels("mime_detect").time():
+                self._mime_type = TextExtractorFactory.detect_mime_type(content)
+            self._mime_detected = True
+        return self._mime_type
+
+    async def get_extractor(self) -> BaseTextExtractor:
+        """
+        Get the text extractor matching this document.
+
+        Returns:
+            BaseTextExtractor: The extractor for the detected file type
+        """
+        if self._extractor is None:
+            mime_type = await self.get_mime_type()
+            self._extractor = TextExtractorFactory.get_extractor(
+                self.file, mime_type=mime_type
+            )
+        return self._extractor
+
+    async def _extract_more(self, known: int, count: Optional[int]) -> bool:
+        """
+        Extract the next batch of pages.
+
+        Failures are memoized, so a document that cannot be parsed is not
+        parsed again by the next classifier in the chain. Each batch holds a
+        slot of its extractor class while it runs, so cache hits and
+        filename matches never wait on admission control.
+
+        Args:
+            known: Number of pages the caller has already seen
+            count: Number of pages to extract, or None for all remaining
+
+        Returns:
+            bool: Whether pages beyond `known` are now available
+
+        Raises:
+            ValueError: If the text cannot be extracted
+            AdmissionRejectedError: If the extractor class is saturated
+        """
+        async with self._lock:
+            if self._text_error is None and len(self._pages) <= known:
+                done = self._page_count is not None and (
+                    len(self._pages) >= self._page_count
+                )
+                if not done:
+                    try:
+                        extractor = await self.get_extractor()
+                        content = await self.get_content()
+                        if self._deadline is None:
+                            self._deadline = (
+                                time.monotonic() + config.ocr.pdf_time_budget_seconds
+                            )
+                        async with admission.admit(type(extractor).__name__):
+                            with STAGE_SECONDS.labels("extraction").time():
+                                batch = await extractor.extract_pages(
+                                    content, len(self._pages), count, self._deadline
+                                )
+                        self._page_count = batch.total
+                        self._pages.extend(batch.pages)
+                        self._ocr_pages.extend(batch.ocr_pages)
+                        if not self._settled:
+                            self._partial = self._partial or batch.partial
+                    except Exception as e:
+                        self._text_error = e
+                        self._late_error = self._settled
+                        EXTRACTION_FAILURES.labels(
+                            self.file_type, self._failure_reason(e)
+                        ).inc()
+            if self._text_error is not None:
+                raise self._text_error
+            return len(self._pages) > known
+
+    @staticmethod
+    def _failure_reason(error: Exception) -> str:
+        """Classify an extraction error for the failure metrics."""
+        if isinstance(error, AdmissionRejectedError):
+            return "shed"
+        if isinstance(error, ExecutorSaturatedError):
+            return "saturated"
+        if isinstance(error, TimeoutError):
+            return "timeout"
+        return "error"
+
+    async def iter_pages(self) -> AsyncIterator[str]:
+        """
+        Iterate over the document's pages, extracting them on demand.
+
+        Pages already extracted are replayed first. Further pages are
+        extracted in batches that double in size, so a consumer that stops
+        early leaves the remaining pages untouched.
+
+        Yields:
+            str: The text of each page in order
+
+        Raises:
+            ValueError: If the text cannot be extracted
+        """
+        settings = config.extraction
+        index = 0
+        batch = settings.first_page_batch if settings.stream_pages else None
+        while True:
+            while index < len(self._pages):
+                yield self._pages[index]
+                index += 1
+            if not await self._extract_more(index, batch):
+                return
+            if batch is not None:
+                batch = min(batch * 2, settings.max_page_batch)
+
+    async def get_text(self) -> str:
+        """
+        Get the full extracted text, extracting any remaining pages.
+
+        Returns:
+            str: The extracted text
+
+        Raises:
+            ValueError: If the text cannot be extracted
+        """
+        if self._text is None:
+            while await self._extract_more(len(self._pages), None):
+                pass
+            self._text = self._join(self._pages)
+        return self._text
+
+    async def get_text_prefix(
+        self, max_pages: Optional[int] = None, max_chars: Optional[int] = None
+    ) -> str:
+        """
+        Get the text of the leading pages only.
+
+        Args:
+            max_pages: Maximum number of pages to include
+            max_chars: Maximum number of characters to include
+
+        Returns:
+            str: The extracted text prefix
+
+        Raises:
+            ValueError: If the text cannot be extracted
+        """
+        pages: List[str] = []
+        chars = 0
+        async for page in self.iter_pages():
+            pages.append(page)
+            chars += len(page) + 1
+            if (max_pages and len(pages) >= max_pages) or (
+                max_chars and chars >= max_chars
+            ):
+                break
+        text = self._join(pages)
+        return text[:max_chars] if max_chars else text
+
+    def _join(self, pages: List[str]) -> str:
+        """
+        Join page texts the way the extractors do.
+
+        Raises:
+            ValueError: If a paged document has no text at all
+        """
+        text = "\n".join(page for page in pages if page).strip()
+        if not text and self.paged:
+            raise ValueError("No text could be extracted from the document")
+        return text
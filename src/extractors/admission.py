@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from .executor import ExecutorSaturatedError
+from ..config import AdmissionConfig, config
+from ..metrics import ADMISSION_REJECTIONS, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejectedError(ExecutorSaturatedError):
+    """Raised when admission control turns an extraction away."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        """
+        Initialize the error.
+
+        Args:
+            message: Why the extraction was turned away
+            status_code: 429 when the waiting line was full, 503 when the
+                wait for a slot ran out
+            retry_after: Seconds after which the client may retry
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds concurrent extractions separately for each extractor class.
+
+    Each class has its own slots, waiting line and queue-time budget, so a
+    burst of OCR-heavy images waits or is turned away on its own while text
+    files keep flowing. Limits apply per uvicorn worker.
+    """
+
+    def __init__(self, settings: AdmissionConfig):
+        """
+        Initialize the controller. Slots are created on first use.
+
+        Args:
+            settings: Per-class limits and rejection settings
+        """
+        self.settings = settings
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._waiting: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def waiting(self, extractor: str) -> int:
+        """Get the number of extractions of a class waiting for a slot."""
+        return self._waiting.get(extractor, 0)
+
+    @asynccontextmanager
+    async def admit(self, extractor: str) -> AsyncIterator[None]:
+        """
+        Hold one of an extractor class's slots, waiting within its budget.
+
+        Args:
+            extractor: Name of the extractor class
+
+        Raises:
+            AdmissionRejectedError: If the waiting line is full, or no slot
+                frees up within the queue-time budget
+        """
+        if not self.settings.enabled:
+            yield
+            return
+
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Semaphores belong to one event loop, as in tests that run several
+            self._loop = loop
+            self._slots = {}
+            self._waiting = {}
+
+        limit = self.settings.limits.get(extractor, self.settings.default_limit)
+        if extractor not in self._slots:
+            self._slots[extractor] = asyncio.Semaphore(limit.concurrency)
+        slots = self._slots[extractor]
+        retry_after = self.settings.retry_after_seconds
+
+        if slots.locked() and self.waiting(extractor) >= limit.max_waiting:
+            ADMISSION_REJECTIONS.labels(extractor, "queue_full").inc()
+            raise AdmissionRejectedError(
+                f"Too many {extractor} extractions waiting ({limit.max_waiting})",
+                429,
+                retry_after,
+            )
+
+        self._waiting[extractor] = self.waiting(extractor) + 1
+        try:
+            with STAGE_SECONDS.labels("admission_wait").time():
+                await asyncio.wait_for(slots.acquire(), limit.queue_timeout_seconds)
+        except TimeoutError:
+            ADMISSION_REJECTIONS.labels(extractor, "queue_timeout").inc()
+            raise AdmissionRejectedError(
+                f"No {extractor} slot freed up within "
+                f"{limit.queue_timeout_seconds}s",
+                503,
+                retry_after,
+            )
+        finally:
+            self._waiting[extractor] -= 1
+
+        try:
+            yield
+        finally:
+            slots.release()
+
+
+admission = AdmissionController(config.admission)
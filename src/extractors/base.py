@@ -1,18 +1,119 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 from fastapi import UploadFile
+from .executor import THREAD_POOL, ExecutorSaturatedError, executor
+from ..utils.content import Content, close_content, read_upload
+
+
+class PageBatch(NamedTuple):
+    """Pages returned by one extraction call."""
+
+    pages: List[str]
+    # Total number of pages in the document
+    total: int
+    # Indices of pages whose text was recognized by OCR
+    ocr_pages: Tuple[int, ...] = ()
+    # Whether a budget cut the extraction short
+    partial: bool = False
 
 
 class BaseTextExtractor(ABC):
     """Base class for text extraction from different file types."""
 
+    # Executor pool the handler runs in; CPU-heavy formats use the process pool
+    executor_pool: str = THREAD_POOL
+    # Whether the format has pages that can be extracted incrementally
+    paged: bool = False
+
     @abstractmethod
-    async def _extract_text_handler(self, file: UploadFile) -> str:
+    def _extract_text_handler(self, content: Content) -> str:
         """
         Custom handler to be implemented by subclasses
-        for text extraction from the given file.
+        for text extraction from the given file content.
+
+        Runs inside an executor worker, so it must be synchronous and
+        picklable together with its extractor instance. The content is
+        bytes or a memory-mapped upload; parse it through `open_stream`
+        rather than copying it.
         """
         pass
 
+    def _extract_pages_handler(
+        self, content: Content, start: int, count: Optional[int]
+    ) -> Tuple[List[str], int]:
+        """
+        Extract a range of pages from the given file content.
+
+        Formats without pages are treated as a single page holding the
+        whole text. Paged formats override this to extract only the
+        requested pages.
+
+        Args:
+            content: The file content
+            start: Index of the first page to extract
+            count: Number of pages to extract, or None for all remaining
+
+        Returns:
+            Tuple[List[str], int]: The page texts and the total page count
+        """
+        if start > 0:
+            return [], 1
+        return [self._extract_text_handler(content)], 1
+
+    async def _run(self, handler: Callable[..., Any], *args: Any) -> Any:
+        """Run a handler in this extractor's pool with uniform error handling."""
+        try:
+            return await executor.run(self.executor_pool, handler, *args)
+        except (ExecutorSaturatedError, TimeoutError):
+            # Transient overload, not a problem with the file itself
+            raise
+        except Exception as e:
+            raise ValueError(f"Error extracting text from file: {e}")
+
+    async def extract_content(self, content: Content) -> str:
+        """
+        Extract text from raw file content.
+
+        Args:
+            content: The file content
+
+        Returns:
+            str: The extracted text
+
+        Raises:
+            ValueError: If the content cannot be processed
+        """
+        return await self._run(self._extract_text_handler, content)
+
+    async def extract_pages(
+        self,
+        content: Content,
+        start: int = 0,
+        count: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> PageBatch:
+        """
+        Extract a range of pages from raw file content.
+
+        Args:
+            content: The file content
+            start: Index of the first page to extract
+            count: Number of pages to extract, or None for all remaining
+            deadline: time.monotonic() value after which optional work,
+                such as OCR of pages without text, is given up
+
+        Returns:
+            PageBatch: The page texts and the total page count
+
+        Raises:
+            ValueError: If the content cannot be processed
+        """
+        pages, total = await self._run(
+            self._extract_pages_handler, content, start, count
+        )
+        return PageBatch(pages, total)
+
     async def extract_text(self, file: UploadFile) -> str:
         """
         Extract text from the given file.
@@ -26,9 +127,8 @@ class BaseTextExtractor(ABC):
         Raises:
             ValueError: If the file cannot be processed
         """
+        content = await asyncio.to_thread(read_upload, file)
         try:
-            return await self._extract_text_handler(file)
-        except Exception as e:
-            raise ValueError(f"Error extracting text from file: {e}")
+            return await self.extract_content(content)
         finally:
-            await file.seek(0)
+            close_content(content)
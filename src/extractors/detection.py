@@ -0,0 +1,96 @@
+import logging
+import threading
+import zipfile
+from typing import Optional, Tuple
+from ..utils.content import Content, open_stream
+
+logger = logging.getLogger(__name__)
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Leading bytes of the formats we support, checked before libmagic
+SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# libmagic handles are not safe to share between threads
+_local = threading.local()
+
+
+def _office_type(content: Content) -> Optional[str]:
+    """
+    Tell a DOCX from an XLSX by the parts in the zip's central directory.
+
+    Args:
+        content: The complete file content
+
+    Returns:
+        Optional[str]: The Office MIME type, or None for any other zip
+    """
+    try:
+        with open_stream(content) as stream, zipfile.ZipFile(stream) as archive:
+            names = set(archive.namelist())
+    except (zipfile.BadZipFile, ValueError):
+        # Only the header was given, or the zip is damaged
+        return None
+    if "word/document.xml" in names:
+        return DOCX_MIME
+    if "xl/workbook.xml" in names:
+        return XLSX_MIME
+    return None
+
+
+def sniff_mime_type(content: Content) -> Optional[str]:
+    """
+    Detect a supported format from its magic number alone.
+
+    Args:
+        content: The file content
+
+    Returns:
+        Optional[str]: The MIME type, or None if the header is not recognised
+    """
+    header = memoryview(content)[:16].tobytes()
+    for signature, mime_type in SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    if header.startswith(ZIP_SIGNATURE):
+        return _office_type(content)
+    return None
+
+
+def _magic_handle():
+    """Get this thread's libmagic handle, loading the database on first use."""
+    handle = getattr(_local, "handle", None)
+    if handle is None:
+        import magic
+
+        handle = _local.handle = magic.Magic(mime=True)
+    return handle
+
+
+def detect_mime_type(content: Content) -> Optional[str]:
+    """
+    Detect the MIME type of file content.
+
+    The magic-number table answers for the common formats; anything else
+    goes to libmagic.
+
+    Args:
+        content: The file content, or at least its first 2048 bytes
+
+    Returns:
+        Optional[str]: The detected MIME type, or None if detection failed
+    """
+    mime_type = sniff_mime_type(content)
+    if mime_type is not None:
+        return mime_type
+    try:
+        return _magic_handle().from_buffer(memoryview(content)[:2048].tobytes())
+    except Exception as e:
+        logger.warning(f"Error occurred with mime type checking: {str(e)}")
+        return None
@@ -1,29 +1,90 @@
-from docx import Document
-from fastapi import UploadFile
-from io import BytesIO
+import re
+import zipfile
+from typing import IO, Iterator, List
+from lxml import etree
 from .base import BaseTextExtractor
+from ..config import config
+from ..utils.content import Content, open_stream
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PARAGRAPH = f"{W}p"
+RUN = f"{W}r"
+TEXT = f"{W}t"
+TAB = f"{W}tab"
+BREAKS = (f"{W}br", f"{W}cr")
+
+# Headers and footers are read before the body, as they are short and hold
+# the invoice numbers and account details a long body could push past the
+# character budget
+HEADER_FOOTER = re.compile(r"word/(header|footer)\d*\.xml")
+BODY = "word/document.xml"
+
+
+def _text_parts(names: List[str]) -> List[str]:
+    """Get the parts of a DOCX package that hold its text, in reading order."""
+    parts = [name for name in names if HEADER_FOOTER.fullmatch(name)]
+    # Headers first, then footers, each in numbering order
+    return sorted(parts, key=lambda name: ("footer" in name, name)) + [BODY]
+
+
+def _iter_text(part: IO[bytes]) -> Iterator[str]:
+    """
+    Yield the text of a WordprocessingML part in document order.
+
+    Each paragraph is discarded once read, so memory does not grow with
+    the part.
+    """
+    tags = (PARAGRAPH, TEXT, TAB) + BREAKS
+    for _, element in etree.iterparse(part, events=("end",), tag=tags):
+        if element.tag == TEXT:
+            if element.text:
+                yield element.text
+        elif element.tag == PARAGRAPH:
+            yield "\n"
+            element.clear(keep_tail=True)
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        elif element.getparent().tag == RUN:
+            # Tab stop definitions in paragraph properties are also w:tab
+            yield "\t" if element.tag == TAB else "\n"
 
 
 class DocxExtractor(BaseTextExtractor):
-    """Extractor for Word documents using python-docx."""
+    """
+    Extractor for Word documents that streams the package's XML parts.
+
+    Headers, footers and the body, tables included, are parsed straight
+    from the zip with an iterative parser instead of building a
+    python-docx object model, and reading stops at a character budget.
+    """
+
+    def __init__(self):
+        # Pickled with the handler, so workers use the parent's settings
+        self.max_chars = config.extraction.docx_max_chars
 
-    async def _extract_text_handler(self, file: UploadFile) -> str:
+    def _extract_text_handler(self, content: Content) -> str:
         """
         Extract text from a Word document.
 
         Args:
-            file: The uploaded Word document
+            content: The content of the Word document
 
         Returns:
-            str: The extracted text
+            str: The extracted text, one line per paragraph
 
         Raises:
             ValueError: If the document cannot be processed
         """
-        content = await file.read()
-        with BytesIO(content) as docx_file:
-            doc = Document(docx_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+        chunks: List[str] = []
+        size = 0
+        with open_stream(content) as stream, zipfile.ZipFile(stream) as package:
+            for name in _text_parts(package.namelist()):
+                with package.open(name) as part:
+                    for text in _iter_text(part):
+                        chunks.append(text)
+                        size += len(text)
+                        if size >= self.max_chars:
+                            break
+                if size >= self.max_chars:
+                    break
+        return "".join(chunks)[: self.max_chars].strip()
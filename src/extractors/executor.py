@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Dict, Optional
+from ..config import ExecutorConfig, config
+from ..metrics import EXECUTOR_QUEUE_DEPTH
+from ..utils.content import MappedFile
+
+logger = logging.getLogger(__name__)
+
+PROCESS_POOL = "process"
+THREAD_POOL = "thread"
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when an extraction pool has no free queue slots."""
+
+
+def _init_process_worker() -> None:
+    """Import the heavy extraction libraries and start OCR once per worker."""
+    import pdfplumber  # noqa: F401
+    from ..ocr.engine import warm_up
+
+    warm_up(config.ocr)
+
+
+def _noop() -> None:
+    """Placeholder job used to spawn worker processes ahead of traffic."""
+
+
+def _run_in_process(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a job inside a worker process.
+
+    Third-party exceptions are not always picklable (an unpicklable one
+    breaks the whole pool), so failures are sent back as a plain ValueError.
+    """
+    try:
+        return func(*args)
+    except Exception as e:
+        raise ValueError(f"{type(e).__name__}: {e}") from None
+
+
+class ExtractionExecutor:
+    """
+    Runs CPU-bound text extraction off the event loop.
+
+    Heavy formats (OCR, PDF) go to a process pool, light formats to a thread
+    pool. Each pool has a bounded number of queued or running jobs and every
+    job is awaited with a timeout, so a single slow upload cannot stall the
+    worker's event loop or grow an unbounded backlog.
+    """
+
+    def __init__(self, settings: ExecutorConfig):
+        """
+        Initialize the executor. Pools are created lazily on first use.
+
+        Args:
+            settings: Pool sizes, queue depth and timeout configuration
+        """
+        self.settings = settings
+        self._pools: Dict[str, Executor] = {}
+        self._pending: Dict[str, int] = {PROCESS_POOL: 0, THREAD_POOL: 0}
+
+    def _get_pool(self, pool: str) -> Executor:
+        """
+        Get a worker pool, creating it on first use.
+
+        Args:
+            pool: The pool name, either "process" or "thread"
+
+        Returns:
+            Executor: The worker pool
+        """
+        if pool not in self._pools:
+            if pool == PROCESS_POOL:
+                self._pools[pool] = ProcessPoolExecutor(
+                    max_workers=self.settings.process_workers,
+                    mp_context=multiprocessing.get_context(
+                        self.settings.start_method
+                    ),
+                    initializer=_init_process_worker,
+                )
+            else:
+                self._pools[pool] = ThreadPoolExecutor(
+                    max_workers=self.settings.thread_workers,
+                    thread_name_prefix="extractor",
+                )
+        return self._pools[pool]
+
+    def start(self) -> None:
+        """Create both pools and spawn the worker processes up front."""
+        process_pool = self._get_pool(PROCESS_POOL)
+        self._get_pool(THREAD_POOL)
+        # Processes are spawned on demand, so warm them before the first request
+        for _ in range(self.settings.process_workers):
+            process_pool.submit(_noop)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down both pools, dropping jobs that have not started yet.
+
+        Args:
+            wait: Whether to block until running jobs have finished
+        """
+        pools, self._pools = self._pools, {}
+        for name, pool in pools.items():
+            logger.info(f"Shutting down {name} extraction pool")
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def queue_depth(self, pool: str) -> int:
+        """
+        Get the number of queued or running jobs in a pool.
+
+        Args:
+            pool: The pool name, either "process" or "thread"
+
+        Returns:
+            int: The number of jobs currently admitted to the pool
+        """
+        return self._pending[pool]
+
+    async def run(
+        self,
+        pool: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run a function in the given pool and await its result.
+
+        Args:
+            pool: The pool name, either "process" or "thread"
+            func: A picklable callable to run
+            *args: Arguments passed to the callable
+            timeout: Overrides the configured per-job timeout
+
+        Returns:
+            Any: The value returned by the callable
+
+        Raises:
+            ExecutorSaturatedError: If the pool's queue is full
+            TimeoutError: If the job does not finish in time
+        """
+        if pool not in self._pending:
+            raise ValueError(f"Unknown extraction pool: {pool}")
+        if self._pending[pool] >= self.settings.max_queue_depth:
+            raise ExecutorSaturatedError(
+                f"Extraction pool '{pool}' is saturated "
+                f"({self.settings.max_queue_depth} jobs queued)"
+            )
+
+        executor_pool = self._get_pool(pool)
+        timeout = timeout or self.settings.job_timeout_seconds
+        self._pending[pool] += 1
+        EXECUTOR_QUEUE_DEPTH.labels(pool).set(self._pending[pool])
+        try:
+            if pool == PROCESS_POOL:
+                future = executor_pool.submit(_run_in_process, func, *args)
+            else:
+                future = executor_pool.submit(func, *args)
+            # A job outlives its caller on timeout or disconnect, so keep the
+            # mapped files it reads until it has finished
+            for arg in args:
+                if isinstance(arg, MappedFile):
+                    arg.retain()
+                    future.add_done_callback(lambda _, mapped=arg: mapped.release())
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                # A job that already started keeps its worker until it ends
+                future.cancel()
+                raise TimeoutError(
+                    f"Extraction in '{pool}' pool timed out after {timeout}s"
+                )
+            except BrokenExecutor:
+                # A crashed worker breaks the whole pool; rebuild it next time
+                logger.error(f"Extraction pool '{pool}' is broken, restarting it")
+                self._pools.pop(pool, None)
+                raise
+        finally:
+            self._pending[pool] -= 1
+            EXECUTOR_QUEUE_DEPTH.labels(pool).set(self._pending[pool])
+
+
+executor = ExtractionExecutor(config.executor)
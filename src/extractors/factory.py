@@ -1,12 +1,14 @@
-from typing import Dict, Type
+from typing import Dict, Optional, Type
 from fastapi import UploadFile
 from .base import BaseTextExtractor
+from .detection import detect_mime_type
 from .pdf import PDFExtractor
 from .docx import DocxExtractor
-from .excel import ExcelExtractor
 from .image import ImageExtractor
+from .tabular import TabularExtractor
 from .text import TextExtractor
 from ..config import config
+from ..utils.content import Content
 import logging
 
 # Set up logging
@@ -22,22 +24,41 @@ class TextExtractorFactory:
         "pdf": PDFExtractor,
         "docx": DocxExtractor,
         "doc": DocxExtractor,
-        "xlsx": ExcelExtractor,
-        "xls": ExcelExtractor,
+        "xlsx": TabularExtractor,
+        "xls": TabularExtractor,
         "png": ImageExtractor,
         "jpg": ImageExtractor,
         "jpeg": ImageExtractor,
         "txt": TextExtractor,
-        "csv": ExcelExtractor,
+        "csv": TabularExtractor,
     }
 
+    # Extractors are stateless, so one instance of each serves every request
+    _instances: Dict[Type[BaseTextExtractor], BaseTextExtractor] = {}
+
     @classmethod
-    def get_extractor(cls, file: UploadFile) -> BaseTextExtractor:
+    def detect_mime_type(cls, content: Content) -> Optional[str]:
+        """
+        Detect the MIME type of the given file content.
+
+        Args:
+            content: The file content, or at least its first 2048 bytes
+
+        Returns:
+            Optional[str]: The detected MIME type, or None if detection failed
+        """
+        return detect_mime_type(content)
+
+    @classmethod
+    def get_extractor(
+        cls, file: UploadFile, mime_type: Optional[str] = None
+    ) -> BaseTextExtractor:
         """
         Get the appropriate text extractor for the given file.
 
         Args:
             file: The uploaded file
+            mime_type: The already detected MIME type of the file, if known
 
         Returns:
             BaseTextExtractor: The appropriate text extractor
@@ -51,33 +72,31 @@ class TextExtractorFactory:
 
         extension = file.filename.rsplit(".", 1)[1].lower()
 
-        # Try to use python-magic if available
-        try:
-            import magic
-
+        if mime_type is None:
             # Read the first 2048 bytes to determine file type
             content = file.file.read(2048)
             file.file.seek(0)  # Reset file pointer
+            mime_type = cls.detect_mime_type(content)
 
-            # Use python-magic to determine file type
-            mime = magic.Magic(mime=True)
-            mime_type = mime.from_buffer(content)
-
-            mime_to_extension = config.mime_to_extension
+        mime_to_extension = config.mime_to_extension
 
-            # If we have a valid MIME type, use it
-            if mime_type in mime_to_extension:
+        # If we have a valid MIME type, use it; libmagic calls most CSV files
+        # plain text, which would lose the tabular extractor's row budget
+        if mime_type in mime_to_extension:
+            if not (extension == "csv" and mime_to_extension[mime_type] == "txt"):
                 extension = mime_to_extension[mime_type]
-            # For images, keep the original extension
-            elif mime_type.startswith("image/"):
-                pass
-            else:
-                raise ValueError(f"Unsupported MIME type: {mime_type}")
-        except Exception as e:
-            logger.warning(f"Error occurred with mime type checking: {str(e)}")
+        # For images, keep the original extension
+        elif mime_type and not mime_type.startswith("image/"):
+            logger.warning(
+                f"Error occurred with mime type checking: "
+                f"Unsupported MIME type: {mime_type}"
+            )
 
         # Get the appropriate extractor based on extension
         if extension in cls._extractors:
-            return cls._extractors[extension]()
+            extractor_class = cls._extractors[extension]
+            if extractor_class not in cls._instances:
+                cls._instances[extractor_class] = extractor_class()
+            return cls._instances[extractor_class]
 
         raise ValueError(f"Unsupported file extension: {extension}")
@@ -1,19 +1,29 @@
-import pytesseract
-from PIL import Image
-from fastapi import UploadFile
-from io import BytesIO
 from .base import BaseTextExtractor
+from .executor import PROCESS_POOL
+from ..config import config
+from ..ocr.engine import recognize
+from ..utils.content import Content
 
 
 class ImageExtractor(BaseTextExtractor):
-    """Extractor for image files using pytesseract OCR."""
+    """Extractor for image files using tesseract OCR."""
 
-    async def _extract_text_handler(self, file: UploadFile) -> str:
+    executor_pool = PROCESS_POOL
+
+    def __init__(self):
+        # Pickled with the handler, so workers use the parent's settings
+        self.ocr_settings = config.ocr
+
+    def _extract_text_handler(self, content: Content) -> str:
         """
         Extract text from an image using OCR.
 
+        The image is decoded at reduced scale, preprocessed and recognized
+        by the worker's long-lived OCR engine, with results cached by
+        perceptual hash.
+
         Args:
-            file: The uploaded image file
+            content: The content of the image file
 
         Returns:
             str: The extracted text
@@ -21,8 +31,4 @@ class ImageExtractor(BaseTextExtractor):
         Raises:
             ValueError: If the image cannot be processed
         """
-        content = await file.read()
-        with BytesIO(content) as image_file:
-            image = Image.open(image_file)
-            text = pytesseract.image_to_string(image)
-            return text.strip()
+        return recognize(content, self.ocr_settings)
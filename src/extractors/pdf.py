@@ -1,23 +1,78 @@
+import asyncio
+import math
 import pdfplumber
-from fastapi import UploadFile
-from io import BytesIO
+import time
 import logging
-from .base import BaseTextExtractor
+from typing import List, Optional, Tuple
+from .base import BaseTextExtractor, PageBatch
+from .executor import PROCESS_POOL
+from ..config import OCRConfig, config
+from ..metrics import STAGE_SECONDS
+from ..utils.content import Content, open_stream
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bytes per rendered pixel while a page is OCRed: the rendered bitmap plus
+# the grayscale and binarised copies made by preprocessing
+_BYTES_PER_PIXEL = 5
+
+
+def _ocr_pdf_page(content: Content, index: int, settings: OCRConfig) -> str:
+    """
+    Render one PDF page and recognize its text.
+
+    Runs inside a worker process. The page is rendered in grayscale at
+    `pdf_dpi`, reduced to fit `pdf_max_page_pixels`.
+
+    Args:
+        content: The content of the PDF file
+        index: Index of the page to OCR
+        settings: OCR settings
+
+    Returns:
+        str: The recognized text
+    """
+    import pypdfium2 as pdfium
+    from ..ocr.engine import recognize_image
+
+    pdf = pdfium.PdfDocument(open_stream(content), autoclose=True)
+    try:
+        page = pdf[index]
+        width, height = page.get_size()
+        # PDF sizes are in points, 72 to the inch
+        scale = settings.pdf_dpi / 72
+        pixels = width * height * scale * scale
+        if pixels > settings.pdf_max_page_pixels:
+            scale *= math.sqrt(settings.pdf_max_page_pixels / pixels)
+            # The renderer rounds each side up to whole pixels
+            while math.ceil(width * scale) * math.ceil(height * scale) > (
+                settings.pdf_max_page_pixels
+            ):
+                scale *= 0.99
+        image = page.render(scale=scale, grayscale=True).to_pil()
+        return recognize_image(image, settings)
+    finally:
+        pdf.close()
+
 
 class PDFExtractor(BaseTextExtractor):
-    """Extractor for PDF files using pdfplumber."""
+    """Extractor for PDF files using pdfplumber, with OCR for scanned pages."""
+
+    executor_pool = PROCESS_POOL
+    paged = True
+
+    def __init__(self):
+        # Pickled with the page jobs, so workers use the parent's settings
+        self.ocr_settings = config.ocr
 
-    async def _extract_text_handler(self, file: UploadFile) -> str:
+    def _extract_text_handler(self, content: Content) -> str:
         """
         Extract text from a PDF file.
 
         Args:
-            file: The uploaded PDF file
+            content: The content of the PDF file
 
         Returns:
             str: The extracted text
@@ -25,20 +80,120 @@ class PDFExtractor(BaseTextExtractor):
         Raises:
             ValueError: If the PDF cannot be processed
         """
-        content = await file.read()
-        with BytesIO(content) as pdf_file:
+        pages, _ = self._extract_pages_handler(content, 0, None)
+        text = "\n".join(page for page in pages if page).strip()
+        if not text:
+            raise ValueError("No text could be extracted from the PDF")
+        return text
+
+    def _extract_pages_handler(
+        self, content: Content, start: int, count: Optional[int]
+    ) -> Tuple[List[str], int]:
+        """
+        Extract the text of a range of pages from a PDF file.
+
+        Args:
+            content: The content of the PDF file
+            start: Index of the first page to extract
+            count: Number of pages to extract, or None for all remaining
+
+        Returns:
+            Tuple[List[str], int]: The page texts (empty for pages without
+                a text layer) and the total page count
+        """
+        with open_stream(content) as pdf_file:
             with pdfplumber.open(pdf_file) as pdf:
-                text = ""
-                for page_num, page in enumerate(pdf.pages, 1):
+                total = len(pdf.pages)
+                stop = total if count is None else min(total, start + count)
+                texts = []
+                for page in pdf.pages[start:stop]:
                     try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
+                        texts.append(page.extract_text() or "")
                     except Exception:
-                        continue
+                        texts.append("")
+                return texts, total
 
-                if not text.strip():
-                    raise ValueError("No text could be extracted from the PDF")
+    async def extract_pages(
+        self,
+        content: Content,
+        start: int = 0,
+        count: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> PageBatch:
+        """
+        Extract a range of pages, OCRing leading pages without a text layer.
+
+        Args:
+            content: The content of the PDF file
+            start: Index of the first page to extract
+            count: Number of pages to extract, or None for all remaining
+            deadline: time.monotonic() value after which OCR is given up
+
+        Returns:
+            PageBatch: The page texts, the total page count and the pages
+                whose text came from OCR
+
+        Raises:
+            ValueError: If the PDF cannot be processed
+        """
+        batch = await super().extract_pages(content, start, count, deadline)
+        settings = self.ocr_settings
+        missing = [
+            start + offset
+            for offset, text in enumerate(batch.pages)
+            if not text.strip() and start + offset < settings.pdf_max_pages
+        ]
+        if not settings.pdf_fallback or not missing:
+            return batch
+
+        with STAGE_SECONDS.labels("pdf_ocr").time():
+            texts, partial = await self._ocr_pages(content, missing, deadline)
+        pages = list(batch.pages)
+        ocr_pages = []
+        for index, text in zip(missing, texts):
+            if text:
+                pages[index - start] = text
+                ocr_pages.append(index)
+        return PageBatch(pages, batch.total, tuple(ocr_pages), partial)
+
+    async def _ocr_pages(
+        self, content: Content, indices: List[int], deadline: Optional[float]
+    ) -> Tuple[List[str], bool]:
+        """
+        OCR pages in parallel within the document's memory and time budgets.
+
+        Args:
+            content: The content of the PDF file
+            indices: Indices of the pages to OCR
+            deadline: time.monotonic() value after which pages are given up
+
+        Returns:
+            Tuple[List[str], bool]: The text per page (empty if it failed or
+                ran out of time) and whether any page ran out of time
+        """
+        settings = self.ocr_settings
+        page_bytes = settings.pdf_max_page_pixels * _BYTES_PER_PIXEL
+        parallel = max(1, settings.pdf_memory_budget_mb * 1024 * 1024 // page_bytes)
+        semaphore = asyncio.Semaphore(parallel)
 
-                return text.strip()
+        async def ocr_page(index: int) -> str:
+            async with semaphore:
+                try:
+                    return await self._run(_ocr_pdf_page, content, index, settings)
+                except Exception as e:
+                    logger.warning(f"OCR of PDF page {index + 1} failed: {str(e)}")
+                    return ""
 
+        tasks = [asyncio.ensure_future(ocr_page(index)) for index in indices]
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                f"OCR time budget exhausted, {len(pending)} of {len(tasks)} "
+                f"PDF pages skipped"
+            )
+        texts = [task.result() if task in done else "" for task in tasks]
+        return texts, bool(pending)
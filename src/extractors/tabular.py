@@ -0,0 +1,121 @@
+import csv
+import io
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Sequence, Tuple
+from openpyxl import load_workbook
+from .base import BaseTextExtractor
+from .detection import ZIP_SIGNATURE
+from ..config import config
+from ..utils.content import Content, open_stream
+
+# Characters of a CSV file used to guess its delimiter
+CSV_SNIFF_CHARS = 16 * 1024
+
+# A sheet's name, or None for a CSV file, and its rows
+Sheet = Tuple[Optional[str], Iterable[Sequence[Any]]]
+
+
+def _csv_rows(stream: BinaryIO) -> Iterator[Sequence[str]]:
+    """
+    Read the rows of a CSV file lazily, guessing its delimiter.
+
+    Malformed input, such as a field past the csv module's size limit, ends
+    the rows instead of failing, since the rows before it are still usable.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    sample = text.read(CSV_SNIFF_CHARS)
+    # A partial last line would skew the guess
+    sample = sample[: sample.rfind("\n") + 1] or sample
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+    try:
+        yield from csv.reader(text, dialect)
+    except csv.Error:
+        return
+
+
+class TabularExtractor(BaseTextExtractor):
+    """
+    Extractor for spreadsheets and CSV files that reads only their top rows.
+
+    Workbooks are streamed with openpyxl in read-only mode and CSV files with
+    the csv module, so neither is ever loaded whole. Each sheet contributes
+    its first rows, cut to their leading cells, which is where headers and
+    titles live, until the file's cell budget runs out.
+    """
+
+    def __init__(self):
+        # Pickled with the handler, so workers use the parent's settings
+        self.settings = config.tabular
+
+    def _extract_text_handler(self, content: Content) -> str:
+        """
+        Extract the top of each sheet of an xlsx workbook or a CSV file.
+
+        Args:
+            content: The content of the workbook or CSV file
+
+        Returns:
+            str: The extracted text, one line per row
+
+        Raises:
+            ValueError: If the workbook cannot be processed
+        """
+        settings = self.settings
+        with open_stream(content) as stream:
+            if memoryview(content)[:4].tobytes() != ZIP_SIGNATURE:
+                return self._render([(None, _csv_rows(stream))])
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+            try:
+                sheets = (
+                    (
+                        sheet.title,
+                        sheet.iter_rows(
+                            max_row=settings.max_rows,
+                            max_col=settings.max_columns,
+                            values_only=True,
+                        ),
+                    )
+                    for sheet in workbook.worksheets
+                )
+                return self._render(sheets)
+            finally:
+                workbook.close()
+
+    def _render(self, sheets: Iterable[Sheet]) -> str:
+        """
+        Render the leading rows and cells of each sheet within the budgets.
+
+        Args:
+            sheets: The sheets to render, read lazily
+
+        Returns:
+            str: One block per sheet, titled with the sheet name
+        """
+        settings = self.settings
+        cells = 0
+        blocks = []
+        for name, rows in islice(sheets, settings.max_sheets):
+            lines = [] if name is None else [f"Sheet: {name}"]
+            for row in islice(rows, settings.max_rows):
+                values = [
+                    text
+                    for text in (
+                        str(value).strip()
+                        for value in islice(row, settings.max_columns)
+                        if value is not None
+                    )
+                    if text
+                ][: settings.max_cells - cells]
+                cells += len(values)
+                if values:
+                    lines.append(" ".join(values))
+                if cells >= settings.max_cells:
+                    break
+            blocks.append("\n".join(lines))
+            if cells >= settings.max_cells:
+                break
+        return "\n\n".join(blocks).strip()
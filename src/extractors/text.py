@@ -1,16 +1,16 @@
-from fastapi import UploadFile
 from .base import BaseTextExtractor
+from ..utils.content import Content
 
 
 class TextExtractor(BaseTextExtractor):
     """Extractor for plain text files."""
 
-    async def _extract_text_handler(self, file: UploadFile) -> str:
+    def _extract_text_handler(self, content: Content) -> str:
         """
         Extract text from a plain text file.
 
         Args:
-            file: The uploaded text file
+            content: The content of the text file
 
         Returns:
             str: The extracted text
@@ -18,5 +18,4 @@ class TextExtractor(BaseTextExtractor):
         Raises:
             ValueError: If the text file cannot be processed
         """
-        content = await file.read()
-        return content.decode("utf-8").strip()
+        return str(content, "utf-8").strip()
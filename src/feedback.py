@@ -0,0 +1,640 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+from fastapi import UploadFile
+from .cache import result_cache
+from .classifiers.hashing import HashingClassifier
+from .classifiers.tfidf import ModelArtifactError, TFIDFClassifier
+from .config import FeedbackConfig, config
+from .document import DocumentContext
+from .metrics import FEEDBACK, MODEL_SWAPS
+from .models import FeedbackResponse, ModelVersion, ModelVersionsResponse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class FeedbackError(ValueError):
+    """Raised when feedback cannot be learned from."""
+
+
+class ModelRegistry:
+    """
+    Corrected labels and the model versions trained on them.
+
+    Feedback, versions and the pointer to the active version live in an
+    SQLite database in WAL mode, next to one artifact per version, in a
+    directory shared by every uvicorn worker. One worker at a time, holding
+    a lease, learns new feedback into a new version and moves the pointer.
+    Every worker polls the pointer and loads the version it names into its
+    live classifier, which swaps the model in between two requests.
+
+    The database methods run synchronously; coroutines call them through
+    `_on_db`, which runs them on a thread of the registry's own, so waiting
+    on another worker's write lock never blocks the event loop.
+    """
+
+    def __init__(self, settings: FeedbackConfig):
+        """
+        Initialize the registry. The database is opened on first use.
+
+        Args:
+            settings: Location, training and polling configuration
+        """
+        self.settings = settings
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_thread = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model-registry"
+        )
+        # A version that failed to load, so it is not tried on every poll
+        self._skipped: Optional[str] = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._holder = f"{os.getpid()}-{uuid.uuid4().hex}"
+
+    def _get_db(self) -> sqlite3.Connection:
+        """Open the registry database, creating it on first use."""
+        if self._db is None:
+            os.makedirs(self._versions_dir(), exist_ok=True)
+            connection = sqlite3.connect(
+                os.path.join(self.settings.directory, "feedback.db"),
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS feedback ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "document_type TEXT NOT NULL, text TEXT NOT NULL, "
+                "filename TEXT NOT NULL, sha256 TEXT NOT NULL, "
+                "created_at REAL NOT NULL, UNIQUE (sha256, document_type))"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS versions ("
+                "version TEXT PRIMARY KEY, engine TEXT NOT NULL, "
+                "path TEXT NOT NULL, feedback_id INTEGER NOT NULL, "
+                "examples INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            # A single row: the active version, the last feedback learned
+            # and the training lease
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS state ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), active TEXT, "
+                "feedback_id INTEGER NOT NULL, trainer TEXT, "
+                "trainer_until REAL NOT NULL)"
+            )
+            connection.execute(
+                "INSERT OR IGNORE INTO state VALUES (1, NULL, 0, NULL, 0)"
+            )
+            self._db = connection
+        return self._db
+
+    async def _on_db(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a registry operation on the registry's own thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._db_thread, lambda: function(*args, **kwargs)
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements under the database write lock."""
+        db = self._get_db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _versions_dir(self) -> str:
+        return os.path.join(self.settings.directory, "versions")
+
+    def _state(self) -> Dict[str, Any]:
+        return dict(self._get_db().execute("SELECT * FROM state").fetchone())
+
+    def add(
+        self, text: str, document_type: str, filename: str, sha256: str
+    ) -> Tuple[int, bool]:
+        """
+        Record a corrected label.
+
+        Args:
+            text: The document text the classifier saw
+            document_type: The correct document type
+            filename: Name of the uploaded file
+            sha256: Hash of the file content
+
+        Returns:
+            Tuple[int, bool]: The feedback identifier and whether the same
+                file was already given the same label
+        """
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM feedback WHERE sha256 = ? AND document_type = ?",
+                (sha256, document_type),
+            ).fetchone()
+            if row is not None:
+                return row["id"], True
+            cursor = db.execute(
+                "INSERT INTO feedback (document_type, text, filename, sha256, "
+                "created_at) VALUES (?, ?, ?, ?, ?)",
+                (document_type, text, filename, sha256, time.time()),
+            )
+        return cursor.lastrowid, False
+
+    def pending(self) -> int:
+        """Get the number of feedback examples not yet learned."""
+        return (
+            self._get_db()
+            .execute(
+                "SELECT COUNT(*) FROM feedback WHERE id > "
+                "(SELECT feedback_id FROM state)"
+            )
+            .fetchone()[0]
+        )
+
+    def active(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the active model version.
+
+        Returns:
+            Optional[Dict[str, Any]]: The version, or None until feedback
+                has been learned
+        """
+        row = (
+            self._get_db()
+            .execute(
+                "SELECT versions.* FROM versions "
+                "JOIN state ON versions.version = state.active"
+            )
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Get the kept model versions, newest first."""
+        return [
+            dict(row)
+            for row in self._get_db().execute(
+                "SELECT * FROM versions ORDER BY created_at DESC, rowid DESC"
+            )
+        ]
+
+    def activate(self, version: Optional[str] = None) -> str:
+        """
+        Point every worker at a kept model version, such as for a rollback.
+
+        Feedback already learned is not learned again by later versions.
+
+        Args:
+            version: The version to activate; defaults to the one trained
+                before the active version
+
+        Returns:
+            str: The activated version
+
+        Raises:
+            FeedbackError: If the version is unknown, or there is no
+                earlier version to roll back to
+        """
+        with self._transaction() as db:
+            if version is None:
+                active = self.active()
+                row = db.execute(
+                    "SELECT version FROM versions WHERE created_at < ? "
+                    "ORDER BY created_at DESC, rowid DESC LIMIT 1",
+                    (active["created_at"] if active else 0,),
+                ).fetchone()
+            else:
+                row = db.execute(
+                    "SELECT version FROM versions WHERE version = ?", (version,)
+                ).fetchone()
+            if row is None:
+                raise FeedbackError(
+                    f"Unknown model version '{version}'"
+                    if version
+                    else "There is no earlier model version to roll back to"
+                )
+            db.execute("UPDATE state SET active = ?", (row["version"],))
+        logger.info(f"Activated model version {row['version']}")
+        return row["version"]
+
+    async def rollback(self, version: Optional[str] = None) -> str:
+        """
+        Activate a kept model version from a coroutine; see `activate`.
+
+        Args:
+            version: The version to activate; defaults to the one trained
+                before the active version
+
+        Returns:
+            str: The activated version
+
+        Raises:
+            FeedbackError: If the version is unknown, or there is no
+                earlier version to roll back to
+        """
+        return await self._on_db(self.activate, version)
+
+    def _load(self, live: TFIDFClassifier, path: str) -> TFIDFClassifier:
+        """Load an artifact into a new classifier with the live settings."""
+        classifier = type(live)(live.settings)
+        classifier.load(path)
+        return classifier
+
+    async def sync(self, classifier: TFIDFClassifier) -> bool:
+        """
+        Load the active version into a live classifier if it is not loaded.
+
+        The artifact is read off the event loop into a separate instance;
+        the live classifier only swaps references, so requests keep being
+        served while it loads.
+
+        Args:
+            classifier: The classifier serving requests in this worker
+
+        Returns:
+            bool: Whether another model was swapped in
+        """
+        active = await self._on_db(self.active)
+        if active is None or active["version"] in (
+            classifier.model_version,
+            self._skipped,
+        ):
+            return False
+        try:
+            loaded = await asyncio.to_thread(self._load, classifier, active["path"])
+        except (ModelArtifactError, OSError) as e:
+            self._skipped = active["version"]
+            logger.warning(
+                f"Keeping the current model instead of version "
+                f"{active['version']}: {str(e)}"
+            )
+            return False
+        classifier.adopt(loaded)
+        result_cache.model_version = active["version"]
+        MODEL_SWAPS.labels(active["engine"]).inc()
+        return True
+
+    def _claim_trainer(self) -> bool:
+        """Take the training lease unless another worker holds it."""
+        now = time.time()
+        cursor = self._get_db().execute(
+            "UPDATE state SET trainer = ?, trainer_until = ? "
+            "WHERE trainer_until < ? OR trainer = ?",
+            (self._holder, now + self.settings.lease_seconds, now, self._holder),
+        )
+        return cursor.rowcount == 1
+
+    def _release_trainer(self) -> None:
+        self._get_db().execute(
+            "UPDATE state SET trainer = NULL, trainer_until = 0 WHERE trainer = ?",
+            (self._holder,),
+        )
+
+    def _feedback(self) -> Tuple[Dict[str, Any], List[sqlite3.Row], List[sqlite3.Row]]:
+        """Get the state, the feedback not yet learned and the feedback learned."""
+        state = self._state()
+        db = self._get_db()
+        new = db.execute(
+            "SELECT * FROM feedback WHERE id > ? ORDER BY id",
+            (state["feedback_id"],),
+        ).fetchall()
+        learned = db.execute(
+            "SELECT * FROM feedback WHERE id <= ? ORDER BY id",
+            (state["feedback_id"],),
+        ).fetchall()
+        return state, new, learned
+
+    def _base_model(
+        self, live: TFIDFClassifier, active: Optional[Dict[str, Any]]
+    ) -> TFIDFClassifier:
+        """Load the active version, or the configured model without one."""
+        classifier = type(live)(live.settings)
+        if active is not None and active["engine"] == type(live).__name__:
+            try:
+                classifier.load(active["path"])
+                return classifier
+            except (ModelArtifactError, OSError) as e:
+                logger.warning(f"Training from the configured model: {str(e)}")
+        classifier.prepare()
+        return classifier
+
+    def _learn(
+        self,
+        base: TFIDFClassifier,
+        new: List[sqlite3.Row],
+        learned: List[sqlite3.Row],
+    ) -> TFIDFClassifier:
+        """
+        Build the model that learns the new feedback.
+
+        The hashing engine is updated online with the new examples only.
+        TF-IDF has a fixed vocabulary, so it is refitted on the configured
+        training data plus all feedback.
+        """
+        if isinstance(base, HashingClassifier):
+            base.update(
+                [row["text"] for row in new], [row["document_type"] for row in new]
+            )
+            return base
+
+        training_data = {
+            label: list(texts)
+            for label, texts in base.settings.tfidf_training_data.items()
+        }
+        for row in learned + new:
+            training_data.setdefault(row["document_type"], []).append(row["text"])
+        updated = type(base)(base.settings)
+        updated.train(training_data)
+        return updated
+
+    def _store(self, classifier: TFIDFClassifier, version: str) -> str:
+        """Write a model version's artifact, returning its path."""
+        path = os.path.join(self._versions_dir(), f"{version}.joblib")
+        partial = f"{path}.{self._holder}.tmp"
+        classifier.save(partial, version)
+        os.replace(partial, path)
+        return path
+
+    def _next_version(self) -> str:
+        """Name the next model version; numbers are not reused after pruning."""
+        last = self._get_db().execute("SELECT MAX(rowid) FROM versions").fetchone()[0]
+        return f"{time.strftime('%Y%m%d%H%M%S')}-v{(last or 0) + 1}"
+
+    async def _register(
+        self,
+        classifier: TFIDFClassifier,
+        feedback_id: int,
+        examples: int,
+        activate: bool,
+    ) -> str:
+        """Store a model as a new version, making it active if asked."""
+        version = await self._on_db(self._next_version)
+        # Writing the artifact does not hold up the registry's database thread
+        path = await asyncio.to_thread(self._store, classifier, version)
+        await self._on_db(
+            self._add_version,
+            classifier,
+            version,
+            path,
+            feedback_id,
+            examples,
+            activate,
+        )
+        return version
+
+    def _add_version(
+        self,
+        classifier: TFIDFClassifier,
+        version: str,
+        path: str,
+        feedback_id: int,
+        examples: int,
+        activate: bool,
+    ) -> None:
+        """Record a stored model version, making it active if asked."""
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    version,
+                    type(classifier).__name__,
+                    path,
+                    feedback_id,
+                    examples,
+                    time.time(),
+                ),
+            )
+            if activate:
+                db.execute(
+                    "UPDATE state SET active = ?, feedback_id = ?",
+                    (version, feedback_id),
+                )
+
+    def prune(self) -> None:
+        """Delete versions beyond `keep_versions`, never the active one."""
+        active = self._state()["active"]
+        for row in self.versions()[self.settings.keep_versions + 1 :]:
+            if row["version"] == active:
+                continue
+            self._get_db().execute(
+                "DELETE FROM versions WHERE version = ?", (row["version"],)
+            )
+            try:
+                os.remove(row["path"])
+            except FileNotFoundError:
+                pass
+
+    async def train(
+        self, classifier: TFIDFClassifier, min_examples: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Learn pending feedback into a new model version and activate it.
+
+        Fitting runs in a thread, so this worker keeps serving requests. The
+        first run also stores the model it started from, to roll back to.
+
+        Args:
+            classifier: The live text classifier, whose engine and settings
+                the new version is trained with
+            min_examples: Pending examples needed to train; defaults to
+                `min_examples` of the settings
+
+        Returns:
+            Optional[str]: The activated version, or None if there was too
+                little feedback or another worker is training
+        """
+        if min_examples is None:
+            min_examples = self.settings.min_examples
+        if not await self._on_db(self._claim_trainer):
+            return None
+        try:
+            state, new, learned = await self._on_db(self._feedback)
+            if not new or len(new) < min_examples:
+                return None
+
+            active = await self._on_db(self.active)
+            base = await asyncio.to_thread(self._base_model, classifier, active)
+            if active is None:
+                await self._register(base, state["feedback_id"], 0, activate=False)
+            updated = await asyncio.to_thread(self._learn, base, new, learned)
+            examples = len(new) + (active["examples"] if active else 0)
+            version = await self._register(
+                updated, new[-1]["id"], examples, activate=True
+            )
+            await self._on_db(self.prune)
+            logger.info(
+                f"Learned {len(new)} feedback examples into model version {version}"
+            )
+            return version
+        finally:
+            await self._on_db(self._release_trainer)
+
+    async def _work(self, live: Callable[[], TFIDFClassifier]) -> None:
+        """Swap in activated versions and train on feedback until cancelled."""
+        while True:
+            try:
+                await self.sync(live())
+                now = time.time()
+                if now - self._checked_at >= self.settings.train_interval_seconds:
+                    self._checked_at = now
+                    if await self.train(live()):
+                        await self.sync(live())
+            except (sqlite3.Error, OSError, ModelArtifactError, ValueError) as e:
+                logger.warning(f"Error updating the model: {str(e)}")
+            await asyncio.sleep(self.settings.poll_interval_seconds)
+
+    async def start(self, live: Callable[[], TFIDFClassifier]) -> None:
+        """
+        Load the active version, then keep the live classifier up to date.
+
+        Args:
+            live: Gets the text classifier serving requests in this worker,
+                which a configuration reload may replace
+        """
+        try:
+            await self.sync(live())
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading the model registry: {str(e)}")
+        if self.settings.enabled:
+            # Let a fresh worker serve first rather than train on startup
+            self._checked_at = time.time()
+            self._task = asyncio.create_task(self._work(live))
+
+    async def stop(self) -> None:
+        """Stop polling and training; a training run is abandoned."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def close(self) -> None:
+        """Close the database; it is reopened on next use."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+model_registry = ModelRegistry(config.feedback)
+
+
+def known_document_types(classifier: TFIDFClassifier) -> Set[str]:
+    """Get the document types feedback may assign."""
+    classes = getattr(classifier.classifier, "classes_", [])
+    return set(classifier.settings.tfidf_training_data) | {
+        str(label) for label in classes
+    }
+
+
+async def record_feedback(
+    file: UploadFile, document_type: str, classifier: TFIDFClassifier
+) -> FeedbackResponse:
+    """
+    Record the correct document type of a file for the trainer.
+
+    The text is extracted as the text classifier reads it, leading pages
+    only, so the model learns from what it will see.
+
+    Args:
+        file: The validated upload
+        document_type: The correct document type
+        classifier: The live text classifier
+
+    Returns:
+        FeedbackResponse: The recorded feedback and the trainer's backlog
+
+    Raises:
+        FeedbackError: If the document type is unknown or the file has no text
+        AdmissionRejectedError: If text extraction is saturated
+    """
+    known = known_document_types(classifier)
+    if document_type not in known:
+        raise FeedbackError(
+            f"Unknown document type '{document_type}'; "
+            f"expected one of {', '.join(sorted(known))}"
+        )
+    document = DocumentContext(file)
+    try:
+        text = await document.get_text_prefix(
+            max_pages=classifier.settings.classifier.tfidf_max_pages,
+            max_chars=classifier.settings.classifier.tfidf_max_chars,
+        )
+        content = await document.get_content()
+        sha256 = await asyncio.to_thread(
+            lambda: hashlib.sha256(content).hexdigest()
+        )
+    except ValueError as e:
+        raise FeedbackError(str(e))
+    finally:
+        document.close()
+    if not text.strip():
+        raise FeedbackError("No text could be extracted from the document")
+
+    feedback_id, duplicate = await model_registry._on_db(
+        model_registry.add, text, document_type, file.filename or "", sha256
+    )
+    if not duplicate:
+        FEEDBACK.labels(document_type).inc()
+    active = await model_registry._on_db(model_registry.active)
+    return FeedbackResponse(
+        feedback_id=feedback_id,
+        document_type=document_type,
+        duplicate=duplicate,
+        pending=await model_registry._on_db(model_registry.pending),
+        model_version=active["version"] if active else classifier.model_version,
+    )
+
+
+async def model_versions(classifier: TFIDFClassifier) -> ModelVersionsResponse:
+    """
+    Describe the kept model versions and the trainer's backlog.
+
+    Args:
+        classifier: The live text classifier
+
+    Returns:
+        ModelVersionsResponse: The versions, newest first
+    """
+    active = await model_registry._on_db(model_registry.active)
+    pending = await model_registry._on_db(model_registry.pending)
+    versions = await model_registry._on_db(model_registry.versions)
+    return ModelVersionsResponse(
+        engine=type(classifier).__name__,
+        active=active["version"] if active else None,
+        serving=classifier.model_version,
+        pending=pending,
+        versions=[
+            ModelVersion(
+                version=row["version"],
+                engine=row["engine"],
+                examples=row["examples"],
+                created_at=row["created_at"],
+                active=active is not None and row["version"] == active["version"],
+            )
+            for row in versions
+        ],
+    )
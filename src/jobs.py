@@ -0,0 +1,483 @@
+import asyncio
+import logging
+import os
+import shutil
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from fastapi import UploadFile
+from .cache import result_cache
+from .config import JobsConfig, config
+from .models import ClassificationResponse, JobResponse
+from .utils.content import close_content, read_upload
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Classifies a stored file; returns the result and whether it is final, or
+# should be retried because a transient failure degraded it
+JobHandler = Callable[[str, str], Awaitable[Tuple[ClassificationResponse, bool]]]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobQueue:
+    """
+    Persistent priority queue of classification jobs.
+
+    Jobs live in an SQLite database in WAL mode, next to one file per
+    queued job, in a directory shared by every uvicorn worker. Workers claim
+    jobs with a single UPDATE, so each job runs once however many processes
+    poll; a job whose worker died is claimed again once its lease expires.
+
+    The methods below run synchronously; coroutines call them through
+    `_on_db`, which runs them on a thread of the queue's own, so waiting on
+    another worker's write lock never blocks the event loop.
+    """
+
+    def __init__(self, settings: JobsConfig):
+        """
+        Initialize the queue. The database is opened on first use.
+
+        Args:
+            settings: Location, worker, retry and capacity configuration
+        """
+        self.settings = settings
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_thread = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="job-queue"
+        )
+        # Wakes this process's idle workers when a job is added here
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pruned_at = 0.0
+
+    def _get_db(self) -> sqlite3.Connection:
+        """Open the queue database, creating it on first use."""
+        if self._db is None:
+            os.makedirs(self._files_dir(), exist_ok=True)
+            connection = sqlite3.connect(
+                os.path.join(self.settings.directory, "queue.db"),
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, dedup_key TEXT NOT NULL, "
+                "filename TEXT NOT NULL, priority INTEGER NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "result TEXT, error TEXT, created_at REAL NOT NULL, "
+                "updated_at REAL NOT NULL, due_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_queue "
+                "ON jobs (status, priority DESC, created_at)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_dedup_key ON jobs (dedup_key)"
+            )
+            self._db = connection
+        return self._db
+
+    async def _on_db(self, function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a queue operation on the queue's own thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._db_thread, lambda: function(*args, **kwargs)
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements under the database write lock."""
+        db = self._get_db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def _files_dir(self) -> str:
+        return os.path.join(self.settings.directory, "files")
+
+    def file_path(self, job_id: str) -> str:
+        """Get the path of a job's stored file."""
+        return os.path.join(self._files_dir(), job_id)
+
+    def _remove_file(self, job_id: str) -> None:
+        try:
+            os.remove(self.file_path(job_id))
+        except FileNotFoundError:
+            pass
+
+    def find(self, dedup_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the latest job for a file that has not failed.
+
+        Args:
+            dedup_key: The file's result cache key
+
+        Returns:
+            Optional[Dict[str, Any]]: The job, or None
+        """
+        row = (
+            self._get_db()
+            .execute(
+                "SELECT * FROM jobs WHERE dedup_key = ? AND status != ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (dedup_key, FAILED),
+            )
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def depth(self) -> int:
+        """Get the number of queued and running jobs."""
+        return (
+            self._get_db()
+            .execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            )
+            .fetchone()[0]
+        )
+
+    def add(
+        self, job_id: str, dedup_key: str, filename: str, priority: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue a job whose file is already stored at `file_path(job_id)`.
+
+        A job for the same file that has not failed is returned instead,
+        with its priority raised to the new one if it is still queued.
+
+        Args:
+            job_id: Identifier of the new job
+            dedup_key: The file's result cache key
+            filename: Name of the submitted file
+            priority: Jobs with a higher priority run first
+
+        Returns:
+            Tuple[Dict[str, Any], bool]: The job and whether it already existed
+
+        Raises:
+            QueueFullError: If the queue holds `max_queued` jobs
+        """
+        now = time.time()
+        with self._transaction() as db:
+            existing = self.find(dedup_key)
+            if existing is None and self.depth() >= self.settings.max_queued:
+                raise QueueFullError(
+                    f"Job queue is full ({self.settings.max_queued} jobs)"
+                )
+            if existing is None:
+                db.execute(
+                    "INSERT INTO jobs (id, dedup_key, filename, priority, status, "
+                    "created_at, updated_at, due_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, dedup_key, filename, priority, QUEUED, now, now, now),
+                )
+            elif existing["status"] == QUEUED and existing["priority"] < priority:
+                db.execute(
+                    "UPDATE jobs SET priority = ? WHERE id = ?",
+                    (priority, existing["id"]),
+                )
+                existing["priority"] = priority
+        if existing is not None:
+            return existing, True
+        if self._wakeup is not None:
+            # Called on the queue's thread, not the one running the loop
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return self.get(job_id), False
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: The job identifier
+
+        Returns:
+            Optional[Dict[str, Any]]: The job, or None if it is unknown or expired
+        """
+        row = (
+            self._get_db()
+            .execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the next due job, highest priority first, and lease it.
+
+        Returns:
+            Optional[Dict[str, Any]]: The claimed job, or None if none is due
+        """
+        now = time.time()
+        row = (
+            self._get_db()
+            .execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, "
+                "updated_at = ?, due_at = ? WHERE id = ("
+                "SELECT id FROM jobs WHERE status IN (?, ?) AND due_at <= ? "
+                "ORDER BY priority DESC, created_at LIMIT 1) RETURNING *",
+                (RUNNING, now, now + self.settings.lease_seconds, QUEUED, RUNNING, now),
+            )
+            .fetchone()
+        )
+        return dict(row) if row else None
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Claim a job off the event loop, handing it back if cancelled."""
+        claim = asyncio.ensure_future(self._on_db(self.claim))
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            job = await claim
+            if job is not None:
+                await self._on_db(
+                    self._finish,
+                    job["id"],
+                    QUEUED,
+                    attempts=job["attempts"] - 1,
+                    due_at=0,
+                )
+            raise
+
+    def _finish(self, job_id: str, status: str, **fields: Any) -> None:
+        """Record the outcome of a run and update the job's status."""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._get_db().execute(
+            f"UPDATE jobs SET status = ?, updated_at = ?, {assignments} WHERE id = ?",
+            (status, time.time(), *fields.values(), job_id),
+        )
+        if status in (SUCCEEDED, FAILED):
+            self._remove_file(job_id)
+
+    def prune(self) -> None:
+        """Delete finished jobs past their retention time."""
+        cutoff = time.time() - self.settings.result_ttl_seconds
+        self._get_db().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (SUCCEEDED, FAILED, cutoff),
+        )
+        self._pruned_at = time.time()
+
+    async def _run(self, job: Dict[str, Any], handler: JobHandler) -> None:
+        """Run a claimed job and record its result, retry or failure."""
+        job_id = job["id"]
+        if job["attempts"] > self.settings.max_attempts:
+            # Its lease expired on every attempt, so the job kills its worker
+            await self._on_db(
+                self._finish,
+                job_id,
+                FAILED,
+                error="Job did not finish within its lease",
+            )
+            return
+
+        try:
+            response, final = await handler(self.file_path(job_id), job["filename"])
+            error = None
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back without counting the attempt
+            await self._on_db(
+                self._finish, job_id, QUEUED, attempts=job["attempts"] - 1, due_at=0
+            )
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            response, final, error = None, False, str(e)
+
+        if not final and job["attempts"] < self.settings.max_attempts:
+            delay = self.settings.retry_backoff_seconds * 2 ** (job["attempts"] - 1)
+            await self._on_db(
+                self._finish,
+                job_id,
+                QUEUED,
+                error=error or "Extraction was overloaded",
+                due_at=time.time() + delay,
+            )
+        elif response is not None:
+            # Out of attempts, a degraded result still beats none
+            await self._on_db(
+                self._finish, job_id, SUCCEEDED, result=response.model_dump_json()
+            )
+        else:
+            await self._on_db(self._finish, job_id, FAILED, error=error)
+
+    async def _work(self, handler: JobHandler) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            try:
+                self._wakeup.clear()
+                job = await self._claim()
+                if job is not None:
+                    await self._run(job, handler)
+                    continue
+                if time.time() - self._pruned_at > 60:
+                    await self._on_db(self.prune)
+            except sqlite3.Error as e:
+                logger.warning(f"Error accessing the job queue: {str(e)}")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), self.settings.poll_interval_seconds
+                )
+            except TimeoutError:
+                pass
+
+    def start(self, handler: JobHandler) -> None:
+        """
+        Start this process's job workers.
+
+        Args:
+            handler: Classifies a stored file, given its path and filename
+        """
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._work(handler))
+            for _ in range(self.settings.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the workers, returning their running jobs to the queue."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Close the database; it is reopened on next use."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+job_queue = JobQueue(config.jobs)
+
+
+def _store_upload(file: UploadFile, path: str) -> None:
+    """
+    Keep an upload beyond its request at `path`.
+
+    An upload spooled to a named file is hard-linked rather than copied.
+    """
+    # The queue creates its directories when it opens its database
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    source = getattr(file.file, "name", None)
+    if isinstance(source, str) and os.path.isfile(source):
+        file.file.flush()
+        try:
+            os.link(source, path)
+            return
+        except OSError:
+            # The spool directory is on another filesystem
+            pass
+    file.file.seek(0)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(file.file, target)
+    file.file.seek(0)
+
+
+def job_response(job: Dict[str, Any], deduplicated: bool = False) -> JobResponse:
+    """
+    Describe a job for the API.
+
+    Args:
+        job: The job as stored
+        deduplicated: Whether the job was returned for a duplicate submission
+
+    Returns:
+        JobResponse: The job's status and, once it has succeeded, its result
+    """
+    result = job["result"]
+    return JobResponse(
+        job_id=job["id"],
+        status=job["status"],
+        filename=job["filename"],
+        priority=job["priority"],
+        attempts=job["attempts"],
+        deduplicated=deduplicated,
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        result=ClassificationResponse.model_validate_json(result) if result else None,
+        error=job["error"] if job["status"] != SUCCEEDED else None,
+    )
+
+
+async def submit_job(file: UploadFile, priority: int = 0) -> JobResponse:
+    """
+    Queue a file for classification by the job workers.
+
+    Files are deduplicated by their result cache key, so resubmitting a
+    file returns the job already queued, running or finished for it.
+
+    Args:
+        file: The validated upload
+        priority: Jobs with a higher priority run first
+
+    Returns:
+        JobResponse: The queued or existing job
+
+    Raises:
+        QueueFullError: If the queue holds `max_queued` jobs
+    """
+    content = await asyncio.to_thread(read_upload, file)
+    key = result_cache.make_key(content, file.filename)
+    close_content(content)
+    job_id = uuid.uuid4().hex
+    path = job_queue.file_path(job_id)
+    # Store the file before queueing, as the job it would duplicate may fail
+    # in the meantime; a spooled upload is only hard-linked
+    await asyncio.to_thread(_store_upload, file, path)
+    try:
+        job, deduplicated = await job_queue._on_db(
+            job_queue.add, job_id, key, file.filename, priority
+        )
+    except BaseException:
+        os.remove(path)
+        raise
+    if deduplicated:
+        os.remove(path)
+    return job_response(job, deduplicated)
+
+
+async def get_job(job_id: str) -> Optional[JobResponse]:
+    """
+    Look up a job for polling.
+
+    Args:
+        job_id: The job identifier
+
+    Returns:
+        Optional[JobResponse]: The job, or None if it is unknown or expired
+    """
+    job = await job_queue._on_db(job_queue.get, job_id)
+    return job_response(job) if job else None
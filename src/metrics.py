@@ -0,0 +1,114 @@
+import os
+from typing import Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Set by the server before the workers start; every worker writes its samples
+# to this directory and /metrics merges them, whichever worker serves it
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Extraction can take seconds, filename matching microseconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+REQUEST_SECONDS = Histogram(
+    "heron_request_seconds",
+    "Time spent serving a request, by route",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "heron_stage_seconds",
+    "Time spent in each stage of classifying a file",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+CLASSIFIER_SECONDS = Histogram(
+    "heron_classifier_seconds",
+    "Time spent in each classifier of the chain",
+    ["classifier"],
+    buckets=LATENCY_BUCKETS,
+)
+DECISIONS = Counter(
+    "heron_decisions_total",
+    "Classification results, by the classifier that decided them",
+    ["classifier", "document_type"],
+)
+EXTRACTION_FAILURES = Counter(
+    "heron_extraction_failures_total",
+    "Text extractions that failed, by file type and reason",
+    ["file_type", "reason"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "heron_admission_rejections_total",
+    "Extractions turned away by admission control, by extractor and reason",
+    ["extractor", "reason"],
+)
+CACHE_LOOKUPS = Counter(
+    "heron_cache_lookups_total",
+    "Result cache lookups, by the tier that answered",
+    ["result"],
+)
+FEEDBACK = Counter(
+    "heron_feedback_total",
+    "Corrected labels received, by document type",
+    ["document_type"],
+)
+MODEL_SWAPS = Counter(
+    "heron_model_swaps_total",
+    "Model versions activated in a worker, by text engine",
+    ["engine"],
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "heron_executor_queue_depth",
+    "Extraction jobs queued or running, by pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text format.
+
+    In multiprocess mode the samples of all workers are merged; otherwise
+    only this process's samples are reported.
+
+    Returns:
+        Tuple[bytes, str]: The exposition body and its content type
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges so they stop counting towards totals."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())
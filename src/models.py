@@ -1,6 +1,24 @@
 from pydantic import BaseModel, Field
 from fastapi import UploadFile
-from typing import Optional
+from typing import Dict, List, Optional
+
+
+class ClassifierVote(BaseModel):
+    """One classifier's contribution to a scored classification."""
+
+    classifier_name: str = Field(..., description="Name of the classifier")
+    document_type: str = Field(
+        default="unknown", description="The document type the classifier voted for"
+    )
+    score: float = Field(default=0.0, description="Calibrated score of the vote")
+    weight: float = Field(..., description="Configured weight of the classifier")
+    elapsed_ms: float = Field(
+        default=0.0, description="Time the classifier ran for, in milliseconds"
+    )
+    status: str = Field(
+        default="completed",
+        description="'completed', 'failed', or 'cancelled' once the decision was made",
+    )
 
 
 class ClassifierResult(BaseModel):
@@ -12,6 +30,12 @@ class ClassifierResult(BaseModel):
     classifier_name: str = Field(
         ..., description="Name of the classifier that made the decision"
     )
+    score: Optional[float] = Field(
+        None, description="Calibrated confidence in the document type, from 0 to 1"
+    )
+    votes: Optional[List[ClassifierVote]] = Field(
+        None, description="Per-classifier votes, for results of the scoring mode"
+    )
 
 
 class ClassificationRequest(BaseModel):
@@ -23,7 +47,26 @@ class ClassificationRequest(BaseModel):
 class ClassificationResponse(ClassifierResult):
     """Response model for file classification."""
 
-    pass
+    cached: bool = Field(
+        default=False, description="Whether the result was served from the cache"
+    )
+    pages_processed: Optional[int] = Field(
+        None, description="Number of pages extracted, for paged documents"
+    )
+    pages_total: Optional[int] = Field(
+        None, description="Total number of pages, for paged documents"
+    )
+    ocr_pages: Optional[List[int]] = Field(
+        None, description="Numbers of the pages read by OCR, for scanned PDFs"
+    )
+    config_version: Optional[str] = Field(
+        None, description="Version of the configuration the file was classified with"
+    )
+    degraded: Optional[bool] = Field(
+        None,
+        description="Set when content extraction was overloaded and the result "
+        "comes from the filename alone",
+    )
 
 
 class ClassificationError(BaseModel):
@@ -31,3 +74,129 @@ class ClassificationError(BaseModel):
 
     error: str = Field(..., description="Error message")
     details: Optional[str] = Field(None, description="Additional error details")
+
+
+class BatchItemResult(BaseModel):
+    """Result for a single file of a batch."""
+
+    index: int = Field(..., description="Position of the file in the batch")
+    filename: str = Field(..., description="Name of the file within the batch")
+    result: Optional[ClassificationResponse] = Field(
+        None, description="Classification result, if the file was classified"
+    )
+    error: Optional[ClassificationError] = Field(
+        None, description="Error for this file, if it could not be classified"
+    )
+
+
+class BatchClassificationResponse(BaseModel):
+    """Response model for batch file classification."""
+
+    results: List[BatchItemResult] = Field(
+        ..., description="Per-file results in upload order"
+    )
+
+
+class JobResponse(BaseModel):
+    """Response model for an asynchronous classification job."""
+
+    job_id: str = Field(..., description="Identifier to poll the job with")
+    status: str = Field(
+        ..., description="'queued', 'running', 'succeeded' or 'failed'"
+    )
+    filename: str = Field(..., description="Name of the submitted file")
+    priority: int = Field(..., description="Jobs with a higher priority run first")
+    attempts: int = Field(..., description="Number of times the job has been run")
+    deduplicated: bool = Field(
+        default=False,
+        description="Whether an existing job for the same file was returned",
+    )
+    created_at: float = Field(..., description="Submission time, as a Unix time")
+    updated_at: float = Field(..., description="Time of the last status change")
+    result: Optional[ClassificationResponse] = Field(
+        None, description="Classification result, once the job has succeeded"
+    )
+    error: Optional[str] = Field(None, description="Error of the last failed run")
+
+
+class FeedbackResponse(BaseModel):
+    """Response model for a corrected label."""
+
+    feedback_id: int = Field(..., description="Identifier of the recorded feedback")
+    document_type: str = Field(..., description="The correct document type")
+    duplicate: bool = Field(
+        default=False,
+        description="Whether the same file was already given the same label",
+    )
+    pending: int = Field(
+        ..., description="Feedback examples waiting for the next model update"
+    )
+    model_version: Optional[str] = Field(
+        None, description="Version of the model currently active"
+    )
+
+
+class ModelVersion(BaseModel):
+    """A stored version of the text model."""
+
+    version: str = Field(..., description="Identifier of the version")
+    engine: str = Field(..., description="Text classifier class of the model")
+    examples: int = Field(..., description="Feedback examples the model has learned")
+    created_at: float = Field(..., description="Training time, as a Unix time")
+    active: bool = Field(
+        default=False, description="Whether every worker serves this version"
+    )
+
+
+class ModelVersionsResponse(BaseModel):
+    """Response model for the model versions endpoint."""
+
+    engine: str = Field(..., description="Configured text classifier class")
+    active: Optional[str] = Field(
+        None, description="The active version, until which workers catch up"
+    )
+    serving: Optional[str] = Field(
+        None, description="Version of the model this worker is serving"
+    )
+    pending: int = Field(
+        ..., description="Feedback examples waiting for the next model update"
+    )
+    versions: List[ModelVersion] = Field(
+        ..., description="Versions kept for rollback, newest first"
+    )
+
+
+class ClassifierStageStats(BaseModel):
+    """Running statistics of one classifier for one file type."""
+
+    classifier_name: str = Field(..., description="Name of the classifier")
+    samples: int = Field(..., description="Number of runs recorded")
+    hit_rate: float = Field(
+        ..., description="Decayed share of runs that returned a document type"
+    )
+    explored_hit_rate: float = Field(
+        default=0.0,
+        description="Decayed hit rate over exploration runs, where every "
+        "classifier runs; the adaptive order ranks on it",
+    )
+    mean_latency_ms: float = Field(
+        ..., description="Decayed mean time per run, in milliseconds"
+    )
+    skipped: bool = Field(
+        default=False, description="Whether the classifier is currently skipped"
+    )
+
+
+class ClassifierStatsResponse(BaseModel):
+    """Response model for the classifier statistics endpoint."""
+
+    mode: str = Field(..., description="The composite classifier mode")
+    pinned_order: Optional[List[str]] = Field(
+        None, description="The pinned classifier order, if any"
+    )
+    worker_pid: int = Field(
+        ..., description="Process the statistics belong to; each worker learns alone"
+    )
+    file_types: Dict[str, List[ClassifierStageStats]] = Field(
+        ..., description="Per file type, the classifiers in their current run order"
+    )
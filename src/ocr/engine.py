@@ -0,0 +1,155 @@
+import logging
+from collections import OrderedDict
+from typing import Optional
+from PIL import Image
+from ..config import OCRConfig
+from ..utils.content import Content
+from .preprocess import dhash, load_image, preprocess
+
+logger = logging.getLogger(__name__)
+
+
+class OCRCache:
+    """
+    LRU of OCR texts keyed by perceptual image hash and OCR settings.
+
+    Each worker process keeps its own cache, so a re-uploaded or re-encoded
+    image is not recognised again by the worker that saw it before.
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Number of texts kept before the oldest is evicted
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a text, marking it as recently used."""
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+        return text
+
+    def set(self, key: str, text: str) -> None:
+        """Store a text, evicting the least recently used one if full."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class TesserocrEngine:
+    """Recognizes text with a tesseract instance that lives as long as the worker."""
+
+    name = "tesserocr"
+
+    def __init__(self, settings: OCRConfig):
+        import tesserocr
+
+        self._api = tesserocr.PyTessBaseAPI(
+            lang=settings.lang, psm=tesserocr.PSM(settings.psm)
+        )
+
+    def recognize(self, image: Image.Image) -> str:
+        self._api.SetImage(image)
+        return self._api.GetUTF8Text()
+
+
+class PytesseractEngine:
+    """Recognizes text by running the tesseract binary for each image."""
+
+    name = "pytesseract"
+
+    def __init__(self, settings: OCRConfig):
+        self._lang = settings.lang
+        self._config = f"--psm {settings.psm}"
+
+    def recognize(self, image: Image.Image) -> str:
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=self._lang, config=self._config)
+
+
+def create_engine(settings: OCRConfig):
+    """
+    Create the configured OCR engine.
+
+    Args:
+        settings: OCR settings
+
+    Returns:
+        The engine; tesserocr when available unless pytesseract is configured
+    """
+    if settings.engine in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine(settings)
+        except Exception as e:
+            if settings.engine == "tesserocr":
+                raise
+            logger.info(f"tesserocr unavailable, using pytesseract: {str(e)}")
+    return PytesseractEngine(settings)
+
+
+# One engine and cache per worker process, created on first use
+_engine = None
+_engine_settings: Optional[OCRConfig] = None
+_cache: Optional[OCRCache] = None
+
+
+def _get_engine(settings: OCRConfig):
+    """Get this process's engine, recreating it if the settings changed."""
+    global _engine, _engine_settings, _cache
+    if _engine is None or _engine_settings != settings:
+        _engine = create_engine(settings)
+        _engine_settings = settings
+        _cache = OCRCache(settings.cache_max_entries)
+    return _engine
+
+
+def warm_up(settings: OCRConfig) -> None:
+    """Create the engine ahead of the first image, logging rather than failing."""
+    try:
+        _get_engine(settings)
+    except Exception as e:
+        logger.warning(f"Could not start the OCR engine: {str(e)}")
+
+
+def recognize_image(image: Image.Image, settings: OCRConfig) -> str:
+    """
+    Recognize the text of a decoded image, going through the OCR cache.
+
+    Args:
+        image: The decoded image
+        settings: Preprocessing, engine and cache settings
+
+    Returns:
+        str: The recognized text
+    """
+    engine = _get_engine(settings)
+    prepared = preprocess(image, settings)
+    key = f"{dhash(prepared, settings.hash_size)}:{settings.model_dump_json()}"
+    text = _cache.get(key)
+    if text is None:
+        text = engine.recognize(prepared).strip()
+        _cache.set(key, text)
+    return text
+
+
+def recognize(content: Content, settings: OCRConfig) -> str:
+    """
+    Recognize the text of an image file.
+
+    Args:
+        content: The content of the image file
+        settings: Preprocessing, engine and cache settings
+
+    Returns:
+        str: The recognized text
+    """
+    return recognize_image(load_image(content, settings), settings)
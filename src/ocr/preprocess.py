@@ -0,0 +1,153 @@
+import math
+from typing import Optional
+import numpy as np
+from PIL import Image, ImageOps
+from ..config import OCRConfig
+from ..utils.content import Content, open_stream
+
+# Resolutions written by cameras and editors that do not know the real one
+PLACEHOLDER_DPI = {72, 96}
+
+
+def _source_dpi(image: Image.Image) -> Optional[float]:
+    """Get the resolution recorded in the image, if it looks genuine."""
+    dpi = image.info.get("dpi")
+    if not dpi:
+        return None
+    value = float(dpi[0])
+    if value <= 0 or round(value) in PLACEHOLDER_DPI:
+        return None
+    return value
+
+
+def scale_factor(image: Image.Image, settings: OCRConfig) -> float:
+    """
+    Get the factor that brings an image to the target resolution.
+
+    Scans that record their DPI are scaled to `target_dpi`, enlarging by at
+    most `max_upscale`. Every image is then kept within `max_pixels`.
+
+    Args:
+        image: The image to scale
+        settings: OCR settings
+
+    Returns:
+        float: The factor to multiply both sides by
+    """
+    factor = 1.0
+    dpi = _source_dpi(image)
+    if dpi:
+        factor = min(settings.target_dpi / dpi, settings.max_upscale)
+    width, height = image.size
+    if width * height * factor * factor > settings.max_pixels:
+        factor = math.sqrt(settings.max_pixels / (width * height))
+    return factor
+
+
+def otsu_threshold(image: Image.Image) -> int:
+    """
+    Get the grey level that best separates text from background.
+
+    Args:
+        image: A grayscale image
+
+    Returns:
+        int: Pixels above the threshold are background
+    """
+    histogram = np.asarray(image.histogram()[:256], dtype=np.float64)
+    total = histogram.sum()
+    if not total:
+        return 127
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = total - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+    between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(between))
+
+
+def load_image(content: Content, settings: OCRConfig) -> Image.Image:
+    """
+    Decode an image at no more than the resolution OCR will use.
+
+    JPEGs are decoded straight at a reduced scale, so a 12MP photo never
+    exists in memory at full size.
+
+    Args:
+        content: The content of the image file
+        settings: OCR settings
+
+    Returns:
+        Image.Image: The decoded image, upright
+    """
+    with open_stream(content) as stream:
+        image = Image.open(stream)
+        width = image.width
+        factor = scale_factor(image, settings)
+        if factor < 1:
+            image.draft(
+                "L" if settings.grayscale else "RGB",
+                (int(width * factor), int(image.height * factor)),
+            )
+        image.load()
+    dpi = _source_dpi(image)
+    if dpi and image.width != width:
+        # Keep the recorded resolution true to the decoded pixels
+        scaled = dpi * image.width / width
+        image.info["dpi"] = (scaled, scaled)
+    return ImageOps.exif_transpose(image)
+
+
+def preprocess(image: Image.Image, settings: OCRConfig) -> Image.Image:
+    """
+    Prepare an image for OCR.
+
+    Args:
+        image: The decoded image
+        settings: Resolution, grayscale and binarisation settings
+
+    Returns:
+        Image.Image: The image to pass to tesseract
+    """
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    if settings.grayscale:
+        image = image.convert("L")
+
+    factor = scale_factor(image, settings)
+    if abs(factor - 1) > 0.01:
+        size = (
+            max(1, round(image.width * factor)),
+            max(1, round(image.height * factor)),
+        )
+        # Area averaging is the cheapest filter that does not alias text
+        resample = Image.Resampling.BOX if factor < 1 else Image.Resampling.BICUBIC
+        image = image.resize(size, resample)
+
+    if settings.grayscale and settings.binarize:
+        threshold = otsu_threshold(image)
+        image = image.point(lambda level: 255 if level > threshold else 0)
+    return image
+
+
+def dhash(image: Image.Image, size: int = 8) -> str:
+    """
+    Get the difference hash of an image.
+
+    Re-encoded, resized or slightly recompressed copies of an image get the
+    same hash, so it can key a cache of OCR results.
+
+    Args:
+        image: The image to hash
+        size: Side of the hash grid; the hash has size * size bits
+
+    Returns:
+        str: The hash as hex
+    """
+    small = image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = int("".join("1" if bit else "0" for bit in bits), 2)
+    return f"{value:0{size * size // 4}x}"
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import os
+import re
+from typing import Dict, NamedTuple, Optional, Tuple, Type
+from .cache import result_cache
+from .classifiers.base import BaseClassifier
+from .classifiers.composite import CompositeClassifier
+from .classifiers.filename import FilenameClassifier
+from .classifiers.fuzzy import FuzzyClassifier
+from .classifiers.hashing import HashingClassifier
+from .classifiers.regex import RegexClassifier
+from .classifiers.scoring import ScoringClassifier
+from .classifiers.stats import ClassifierStats
+from .classifiers.tfidf import TFIDFClassifier
+from .config import (
+    CONFIG_FILE_ENV,
+    RELOADABLE_SECTIONS,
+    AdaptiveConfig,
+    AppConfig,
+    ReloadConfig,
+    config,
+    load_config,
+)
+
+logger = logging.getLogger(__name__)
+
+# Text models selectable with `classifier.text_engine`
+TEXT_ENGINES: Dict[str, Type[TFIDFClassifier]] = {
+    "tfidf": TFIDFClassifier,
+    "hashing": HashingClassifier,
+}
+
+# Every classifier run is recorded; adaptive mode also orders by the results.
+# Shared by all snapshots, as classifiers keep their names across reloads
+classifier_stats = ClassifierStats(decay=config.adaptive.decay)
+
+
+class ClassifierSnapshot(NamedTuple):
+    """
+    The classifiers built from one configuration, with precompiled matchers.
+
+    A request takes the current snapshot once and uses it throughout, so a
+    reload that swaps in a new snapshot never changes a request midway.
+    """
+
+    settings: AppConfig
+    # Short and full hash of the classification-relevant settings
+    version: str
+    fingerprint: str
+    # In order of preference
+    classifiers: Tuple[BaseClassifier, ...]
+    # The model feedback is learned into
+    text_classifier: TFIDFClassifier
+    classifier: CompositeClassifier
+    # Batches run the cheap filename stage over every file before any
+    # content is read, then send only the misses through the content stage
+    filename_classifier: CompositeClassifier
+    content_classifier: CompositeClassifier
+    adaptive: Optional[AdaptiveConfig]
+
+    @property
+    def scoring(self) -> bool:
+        """Whether content classifiers may overrule a filename match."""
+        return self.settings.classifier.composite_mode == "scoring"
+
+
+def build_snapshot(
+    settings: AppConfig, previous: Optional[ClassifierSnapshot] = None
+) -> ClassifierSnapshot:
+    """
+    Build the classifiers for a configuration.
+
+    The text model of the previous snapshot is reused when its settings are
+    unchanged; otherwise the new one still has to be prepared.
+
+    Args:
+        settings: The configuration to build from
+        previous: The snapshot currently serving, if any
+
+    Returns:
+        ClassifierSnapshot: The new snapshot
+
+    Raises:
+        re.error: If a regex pattern does not compile
+    """
+    engine = TEXT_ENGINES[settings.classifier.text_engine]
+    text_classifier = engine(settings)
+    if previous is not None:
+        reused = previous.text_classifier
+        if (
+            type(reused) is engine
+            and reused.is_trained
+            and reused.fingerprint() == text_classifier.fingerprint()
+        ):
+            text_classifier.adopt(reused)
+
+    classifiers = (
+        FilenameClassifier(settings),
+        FuzzyClassifier(settings),
+        RegexClassifier(settings),
+        text_classifier,
+    )
+    mode = settings.classifier.composite_mode
+    adaptive = settings.adaptive if mode == "adaptive" else None
+    if mode == "scoring":
+        classifier = ScoringClassifier(list(classifiers), settings.scoring)
+    else:
+        classifier = CompositeClassifier(list(classifiers), classifier_stats, adaptive)
+    fingerprint = settings.fingerprint()
+    return ClassifierSnapshot(
+        settings=settings,
+        version=fingerprint[:12],
+        fingerprint=fingerprint,
+        classifiers=classifiers,
+        text_classifier=text_classifier,
+        classifier=classifier,
+        filename_classifier=CompositeClassifier(
+            [c for c in classifiers if not c.requires_content]
+        ),
+        content_classifier=CompositeClassifier(
+            [c for c in classifiers if c.requires_content], classifier_stats, adaptive
+        ),
+        adaptive=adaptive,
+    )
+
+
+_current = build_snapshot(config)
+
+
+def current() -> ClassifierSnapshot:
+    """Get the snapshot new requests classify with."""
+    return _current
+
+
+def activate(snapshot: ClassifierSnapshot) -> None:
+    """
+    Make a snapshot the one new requests classify with.
+
+    Args:
+        snapshot: A snapshot whose text model is prepared
+    """
+    global _current
+    # Requests already running keep the snapshot they took
+    _current = snapshot
+    result_cache.fingerprint = snapshot.fingerprint
+    classifier_stats.decay = snapshot.settings.adaptive.decay
+
+
+class ConfigWatcher:
+    """
+    Reloads the configuration file when it changes.
+
+    A changed file is parsed, validated and built into a new snapshot off
+    the event loop, then swapped in by `activate`. A file that fails any of
+    these steps is logged and the running snapshot is kept.
+    """
+
+    def __init__(self, path: Optional[str], settings: ReloadConfig):
+        """
+        Initialize the watcher.
+
+        Args:
+            path: The configuration file; nothing is watched when None
+            settings: Polling configuration
+        """
+        self.path = path
+        self.settings = settings
+        self._stamp = self._stat()
+        self._task: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        """Get the modification time and size of the file."""
+        if self.path is None:
+            return None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def reload(self) -> ClassifierSnapshot:
+        """
+        Build a snapshot from the file and activate it.
+
+        Returns:
+            ClassifierSnapshot: The activated snapshot
+
+        Raises:
+            ConfigFileError: If the file cannot be read or is invalid
+            ModelArtifactError: If the configured model artifact does not
+                match the new settings
+        """
+        settings = await asyncio.to_thread(load_config, self.path)
+        previous = current()
+        ignored = [
+            name
+            for name in AppConfig.model_fields
+            if name not in RELOADABLE_SECTIONS
+            and getattr(settings, name) != getattr(previous.settings, name)
+        ]
+        if ignored:
+            logger.warning(
+                f"Changes to {', '.join(ignored)} in {self.path} apply on restart"
+            )
+            # Keep the running values, so the version and the cache
+            # fingerprint only change with settings that take effect
+            settings = settings.model_copy(
+                update={name: getattr(previous.settings, name) for name in ignored}
+            )
+        snapshot = await asyncio.to_thread(build_snapshot, settings, previous)
+        if not snapshot.text_classifier.is_trained:
+            await asyncio.to_thread(snapshot.text_classifier.prepare)
+        activate(snapshot)
+        logger.info(f"Loaded configuration {snapshot.version} from {self.path}")
+        return snapshot
+
+    async def check(self) -> bool:
+        """
+        Reload the file if it changed since it was last read.
+
+        Returns:
+            bool: Whether a new snapshot was activated
+        """
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return False
+        # A broken file is not retried until it changes again
+        self._stamp = stamp
+        try:
+            await self.reload()
+        except (ValueError, OSError, re.error) as e:
+            logger.error(f"Keeping configuration {current().version}: {str(e)}")
+            return False
+        return True
+
+    async def _watch(self) -> None:
+        """Check the file until cancelled."""
+        while True:
+            await asyncio.sleep(self.settings.poll_interval_seconds)
+            await self.check()
+
+    def start(self) -> None:
+        """Start watching the file, if there is one and reloading is enabled."""
+        if self.path is not None and self.settings.enabled:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop watching the file."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+config_watcher = ConfigWatcher(os.environ.get(CONFIG_FILE_ENV), config.reload)
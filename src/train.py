@@ -0,0 +1,75 @@
+"""
+Offline training of the text model.
+
+Usage:
+    python -m src.train --output models/tfidf.joblib [--corpus corpus.jsonl]
+        [--engine tfidf|hashing]
+
+Without `--corpus` the model is fitted on `config.tfidf_training_data`. A
+corpus is either a JSON object mapping document types to example texts, or
+a JSON Lines file with one `{"label": ..., "text": ...}` object per line.
+`--engine` defaults to `classifier.text_engine`; the service only loads an
+artifact of the engine it is configured with.
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List
+from .snapshot import TEXT_ENGINES
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+
+def load_corpus(path: str) -> Dict[str, List[str]]:
+    """
+    Load a labelled training corpus.
+
+    Args:
+        path: Path of a .json or .jsonl corpus file
+
+    Returns:
+        Dict[str, List[str]]: Example texts keyed by document type
+    """
+    with open(path, encoding="utf-8") as corpus_file:
+        if not path.endswith(".jsonl"):
+            return json.load(corpus_file)
+
+        training_data: Dict[str, List[str]] = defaultdict(list)
+        for line in corpus_file:
+            if line.strip():
+                example = json.loads(line)
+                training_data[example["label"]].append(example["text"])
+        return dict(training_data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the text classifier")
+    parser.add_argument(
+        "--output", required=True, help="Path of the model artifact to write"
+    )
+    parser.add_argument(
+        "--corpus", help="Labelled corpus to train on instead of the config data"
+    )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(TEXT_ENGINES),
+        default=config.classifier.text_engine,
+        help="Text model to train",
+    )
+    args = parser.parse_args()
+
+    training_data = load_corpus(args.corpus) if args.corpus else None
+    classifier = TEXT_ENGINES[args.engine]()
+    classifier.train(training_data or config.tfidf_training_data)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    version = classifier.save(args.output)
+    print(f"Wrote {classifier.engine_name} model {version} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import posixpath
+import tarfile
+import zipfile
+from typing import IO, List
+from fastapi import UploadFile
+from ..config import ARCHIVE_EXTENSIONS, MAX_FILE_SIZE_MB
+from .upload import spool_file
+
+
+def is_archive(filename: str) -> bool:
+    """Check if the filename looks like a supported archive."""
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _spool_member(name: str, source: IO[bytes]) -> UploadFile:
+    """
+    Copy an archive member into a named temporary file.
+
+    At most one byte more than the size limit is copied, so oversized
+    members (including decompression bombs) are never fully inflated and
+    still fail the regular file size check.
+    """
+    limit = MAX_FILE_SIZE_MB * 1024 * 1024 + 1
+    spool = spool_file()
+    copied = 0
+    while copied < limit:
+        chunk = source.read(min(64 * 1024, limit - copied))
+        if not chunk:
+            break
+        spool.write(chunk)
+        copied += len(chunk)
+    spool.flush()
+    spool.seek(0)
+    return UploadFile(file=spool, filename=name, size=copied)
+
+
+def _is_hidden(name: str) -> bool:
+    """Check if an archive member is metadata added by the archiver."""
+    return name.startswith("__MACOSX/") or posixpath.basename(name).startswith(".")
+
+
+def expand_archive(file: UploadFile, max_files: int) -> List[UploadFile]:
+    """
+    Expand a zip or tar archive into one upload per regular file.
+
+    Args:
+        file: The uploaded archive
+        max_files: Maximum number of members to accept
+
+    Returns:
+        List[UploadFile]: The archive members in archive order
+
+    Raises:
+        ValueError: If the archive is invalid or has too many members
+    """
+    members: List[UploadFile] = []
+
+    def add(name: str, source: IO[bytes]) -> None:
+        if len(members) >= max_files:
+            raise ValueError(f"Archive has more than {max_files} files")
+        members.append(_spool_member(name, source))
+
+    try:
+        file.file.seek(0)
+        if file.filename.lower().endswith(".zip"):
+            with zipfile.ZipFile(file.file) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or _is_hidden(info.filename):
+                        continue
+                    with archive.open(info) as source:
+                        add(info.filename, source)
+        else:
+            with tarfile.open(fileobj=file.file, mode="r:*") as archive:
+                for info in archive:
+                    if not info.isfile() or _is_hidden(info.name):
+                        continue
+                    source = archive.extractfile(info)
+                    if source is not None:
+                        with source:
+                            add(info.name, source)
+    except (zipfile.BadZipFile, tarfile.TarError, ValueError) as e:
+        for member in members:
+            member.file.close()
+        if isinstance(e, ValueError):
+            raise
+        raise ValueError(f"Invalid archive '{file.filename}': {e}")
+    finally:
+        file.file.seek(0)
+
+    return members
@@ -0,0 +1,165 @@
+import mmap
+import os
+import threading
+import uuid
+from io import BytesIO
+from typing import BinaryIO, Optional, Union
+from fastapi import UploadFile
+
+
+class MappedFile:
+    """
+    Read-only memory map of an upload spooled to a named file.
+
+    Supports the buffer protocol, so it can be hashed, sliced through a
+    memoryview or decoded like bytes without copying the file into Python
+    memory. Pickling sends only the path, so a process pool worker maps the
+    same file instead of receiving the content through a pipe.
+
+    The file is mapped under a hard link of its own, so it stays readable
+    by name when the upload deletes its spool file. The link and the map
+    are released on `close` once no extraction job `retain`s them.
+    """
+
+    def __init__(self, path: str, private_link: bool = True):
+        """
+        Map a file.
+
+        Args:
+            path: Path of the file; it must not change while mapped
+            private_link: Map the file under a link owned by this object;
+                copies unpickled in a worker use the owner's link
+        """
+        self.path = path
+        self._link: Optional[str] = None
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._users = 0
+        self._closed = False
+        if private_link:
+            link = f"{path}.{uuid.uuid4().hex[:8]}"
+            try:
+                os.link(path, link)
+                self.path = self._link = link
+            except OSError:
+                # Linking is not supported here; map the file under its name
+                pass
+        with open(self.path, "rb") as f:
+            self.size = os.fstat(f.fileno()).st_size
+            # Empty files cannot be mapped
+            self._map = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+            )
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self._map if self._map is not None else b"")
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __reduce__(self):
+        return MappedFile, (self.path, False)
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def open(self) -> BinaryIO:
+        """Open the file for parsers that need a stream."""
+        return open(self.path, "rb")
+
+    def retain(self) -> None:
+        """Keep the file and its map until a matching `release`."""
+        with self._lock:
+            self._users += 1
+
+    def release(self) -> None:
+        """Drop a `retain`, finishing a `close` that waited for it."""
+        with self._lock:
+            self._users -= 1
+            dispose = self._closed and self._users == 0
+        if dispose:
+            self._dispose()
+
+    def close(self) -> None:
+        """Unmap the file and remove its link once no job uses them."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            dispose = self._users == 0
+        if dispose:
+            self._dispose()
+
+    def _dispose(self) -> None:
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # A memoryview of the map is still alive; it unmaps when freed
+                pass
+        if self._link is not None:
+            try:
+                os.remove(self._link)
+            except FileNotFoundError:
+                pass
+
+
+# File content as handed to extractors
+Content = Union[bytes, MappedFile]
+
+
+def open_stream(content: Content) -> BinaryIO:
+    """
+    Get a binary stream over file content without copying it.
+
+    Args:
+        content: The file content
+
+    Returns:
+        BinaryIO: A stream positioned at the start of the content
+    """
+    if isinstance(content, MappedFile):
+        return content.open()
+    # BytesIO shares a bytes object instead of copying it
+    return BytesIO(content)
+
+
+def close_content(content: Optional[Content]) -> None:
+    """
+    Release the map behind file content, if it is mapped.
+
+    Args:
+        content: The file content, or None if it was never read
+    """
+    if isinstance(content, MappedFile):
+        content.close()
+
+
+def read_upload(file: UploadFile) -> Content:
+    """
+    Get the content of an upload, mapping it when it is spooled to a named file.
+
+    Uploads held in memory, or in anonymous temporary files, are read into
+    bytes.
+
+    Args:
+        file: The uploaded file
+
+    Returns:
+        Content: The mapped file or its bytes
+    """
+    path = getattr(file.file, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        file.file.flush()
+        return MappedFile(path)
+    file.file.seek(0)
+    try:
+        return file.file.read()
+    finally:
+        file.file.seek(0)
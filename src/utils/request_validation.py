@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import UploadFile
 from ..config import ALLOWED_EXTENSIONS, MAX_FILE_SIZE_MB
 
@@ -9,7 +10,33 @@ def allowed_file(filename: str) -> bool:
 
 async def file_size_check(file: UploadFile) -> bool:
     """Check if the file size is allowed."""
-    file.file.seek(0, 2)  # Move to the end of the file
-    file_size = file.file.tell()  # Get current position (file size)
-    file.file.seek(0)  # Reset position for classification
+    file_size = file.size
+    if file_size is None:
+        # Only uploads not built by the multipart parser lack a size
+        file.file.seek(0, 2)
+        file_size = file.file.tell()
+        file.file.seek(0)
     return file_size <= MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+async def validate_file(file: Optional[UploadFile]) -> Optional[str]:
+    """
+    Validate an uploaded file before classification.
+
+    Args:
+        file: The uploaded file
+
+    Returns:
+        Optional[str]: A description of the problem, or None if the file is valid
+    """
+    if not file or not file.filename:
+        return "No file or filename provided"
+
+    if not allowed_file(file.filename):
+        allowed = ", ".join(ALLOWED_EXTENSIONS)
+        return f"File type not allowed. Allowed types: {allowed}"
+
+    if not await file_size_check(file):
+        return f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB"
+
+    return None
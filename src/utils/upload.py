@@ -0,0 +1,123 @@
+from tempfile import NamedTemporaryFile
+from typing import IO, Any, Callable, Coroutine
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData
+from starlette.formparsers import MultiPartException, MultiPartParser
+from ..config import MAX_FILE_SIZE_MB, config
+
+MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
+
+# Allowance per file for multipart boundaries and part headers
+PART_OVERHEAD = 16 * 1024
+
+
+class UploadTooLargeError(MultiPartException):
+    """Raised as soon as an upload exceeds the file size limit."""
+
+    def __init__(self, message: str = ""):
+        super().__init__(
+            message or f"File too large. Maximum size is {MAX_FILE_SIZE_MB}MB"
+        )
+
+
+def spool_file() -> IO[bytes]:
+    """Create a named temporary file, deleted on close, to spool an upload to."""
+    return NamedTemporaryFile(prefix="upload-")
+
+
+class DiskSpoolingMultiPartParser(MultiPartParser):
+    """
+    Multipart parser that writes every uploaded file straight to disk.
+
+    Files go to named temporary files so extractors can map them instead of
+    reading them into memory, and a file part is rejected as soon as it
+    grows past the size limit rather than once it has been received.
+    """
+
+    def __init__(self, *args: Any, max_file_size: int = MAX_FILE_SIZE, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.max_file_size = max_file_size
+        self._part_size = 0
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        self._part_size = 0
+        if upload is not None:
+            # Replace the in-memory spool before any data arrives
+            upload.file.close()
+            upload.file = spool_file()
+            self._files_to_close_on_error.append(upload.file)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current_part.file is not None:
+            self._part_size += end - start
+            if self._part_size > self.max_file_size:
+                raise UploadTooLargeError()
+        super().on_part_data(data, start, end)
+
+
+async def parse_multipart_to_disk(request: Request, max_files: int) -> FormData:
+    """
+    Parse a multipart request, spooling every file part to a temporary file.
+
+    Args:
+        request: The incoming request
+        max_files: Maximum number of file parts to accept
+
+    Returns:
+        FormData: The parsed form, with files backed by named temporary files
+
+    Raises:
+        UploadTooLargeError: If a file exceeds the size limit, checked
+            against Content-Length before any of the body is read
+        ValueError: If the body is not valid multipart form data
+    """
+    content_type = request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        raise ValueError("Request must be multipart/form-data")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > max_files * (MAX_FILE_SIZE + PART_OVERHEAD):
+            raise UploadTooLargeError("Request body too large")
+
+    parser = DiskSpoolingMultiPartParser(
+        request.headers, request.stream(), max_files=max_files
+    )
+    try:
+        return await parser.parse()
+    except UploadTooLargeError:
+        raise
+    except MultiPartException as e:
+        raise ValueError(e.message)
+
+
+class SpoolingRequest(Request):
+    """Request whose multipart form is parsed by `parse_multipart_to_disk`."""
+
+    async def _get_form(self, **kwargs: Any) -> FormData:
+        content_type = self.headers.get("content-type", "")
+        if self._form is None and content_type.startswith("multipart/form-data"):
+            try:
+                self._form = await parse_multipart_to_disk(
+                    self, config.batch.max_files
+                )
+            except UploadTooLargeError as e:
+                raise HTTPException(status_code=413, detail=e.message)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        return await super()._get_form(**kwargs)
+
+
+class SpoolingRoute(APIRoute):
+    """Route that parses uploads with `SpoolingRequest`."""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def spooling_handler(request: Request) -> Response:
+            return await handler(SpoolingRequest(request.scope, request.receive))
+
+        return spooling_handler
@@ -0,0 +1,120 @@
+import asyncio
+from contextlib import asynccontextmanager
+from io import BytesIO
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from src.config import AdmissionConfig, ExtractorLimit
+from src.extractors.admission import AdmissionController, AdmissionRejectedError
+
+
+def _reject(status_code: int):
+    """Make a stand-in for `admission.admit` that turns everything away."""
+
+    @asynccontextmanager
+    async def admit(extractor):
+        raise AdmissionRejectedError(f"{extractor} saturated", status_code, 7)
+        yield
+
+    return admit
+
+
+@pytest.mark.asyncio
+async def test_controller_sheds_per_extractor_class():
+    """Test that a saturated class is turned away without blocking others."""
+    controller = AdmissionController(
+        AdmissionConfig(
+            limits={
+                "ImageExtractor": ExtractorLimit(
+                    concurrency=1, max_waiting=1, queue_timeout_seconds=0.05
+                )
+            },
+            retry_after_seconds=3,
+        )
+    )
+    async with controller.admit("ImageExtractor"):
+        waiter = asyncio.ensure_future(
+            controller.admit("ImageExtractor").__aenter__()
+        )
+        await asyncio.sleep(0)
+        assert controller.waiting("ImageExtractor") == 1
+
+        # The waiting line is full, so the next one is refused at once
+        with pytest.raises(AdmissionRejectedError) as shed:
+            async with controller.admit("ImageExtractor"):
+                pass
+        assert shed.value.status_code == 429
+        assert shed.value.retry_after == 3
+
+        # The waiter runs out of queue time while the slot is held
+        with pytest.raises(AdmissionRejectedError) as timed_out:
+            await waiter
+        assert timed_out.value.status_code == 503
+
+        # Other classes have their own slots
+        async with controller.admit("TextExtractor"):
+            pass
+    assert controller.waiting("ImageExtractor") == 0
+
+
+def test_classify_file_sheds_with_retry_after(mocker):
+    """Test that a rejected extraction answers 429 with Retry-After."""
+    from src.app import app
+
+    mocker.patch("src.document.admission.admit", _reject(429))
+    files = {"file": ("3f2a9c.txt", BytesIO(b"INVOICE\nBill to: Jane"))}
+    with TestClient(app) as client:
+        response = client.post("/classify_file", files=files)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+
+@pytest.mark.asyncio
+async def test_degraded_mode_answers_from_the_filename(mocker):
+    """Test that an overloaded extraction falls back to the filename."""
+    from src.classifier import _classify_document
+    from src.document import DocumentContext
+    from src.snapshot import current
+
+    mocker.patch("src.document.admission.admit", _reject(503))
+    file = UploadFile(file=BytesIO(b"Bill to: Jane"), filename="invoice_1.txt")
+    document = DocumentContext(file)
+    snapshot = current()
+    response = await _classify_document(
+        document, snapshot.content_classifier, snapshot
+    )
+
+    assert response.document_type == "invoice"
+    assert response.degraded is True
+    assert not document.cacheable
+
+
+@pytest.mark.asyncio
+async def test_rejection_while_exploring_does_not_degrade_a_found_answer(mocker):
+    """Test that content stages run only to be measured cannot degrade a hit."""
+    from src.classifier import _classify_document
+    from src.classifiers.composite import CompositeClassifier
+    from src.classifiers.filename import FilenameClassifier
+    from src.classifiers.regex import RegexClassifier
+    from src.classifiers.stats import ClassifierStats
+    from src.config import AdaptiveConfig, config
+    from src.document import DocumentContext
+    from src.snapshot import current
+
+    mocker.patch("src.document.admission.admit", _reject(429))
+    mocker.patch.object(config.admission, "degraded_mode", False)
+    stats = ClassifierStats()
+    # Every request explores until the file type is measured
+    chain = CompositeClassifier(
+        [FilenameClassifier(), RegexClassifier()], stats, AdaptiveConfig()
+    )
+    document = DocumentContext(
+        UploadFile(file=BytesIO(b"Statement period"), filename="bank_statement_1.txt")
+    )
+    response = await _classify_document(document, chain, current())
+
+    assert response.document_type == "bank_statement"
+    assert response.classifier_name == "FilenameClassifier"
+    assert response.degraded is None
+    assert document.cacheable
+    assert stats.get("txt", "RegexClassifier") is None
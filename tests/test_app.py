@@ -1,8 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
 from io import BytesIO
-from src.app import app, allowed_file
+from src.app import app
 from src.models import ClassifierResult
+from src.utils.request_validation import allowed_file
 
 
 @pytest.fixture
@@ -49,4 +50,123 @@ def test_success(client, mocker):
     assert response.json() == {
         "document_type": "test_class",
         "classifier_name": "TestClassifier",
+        "cached": False,
     }
+
+
+def test_oversized_upload_is_rejected_while_streaming(client, mocker):
+    classify = mocker.patch("src.app.classify_file")
+    response = client.post(
+        "/classify_file",
+        files={"file": ("big.txt", BytesIO(b"x" * (10 * 1024 * 1024 + 1)))},
+    )
+    assert response.status_code == 413
+    assert "File too large" in response.json()["detail"]
+    classify.assert_not_called()
+
+
+def test_classify_files_returns_results_in_order(client):
+    response = client.post(
+        "/classify_files",
+        files=[
+            ("files", ("invoice_2024.txt", BytesIO(b"anything"))),
+            ("files", ("notes.exe", BytesIO(b"MZ"))),
+            ("files", ("9c1e.txt", BytesIO(b"Statement period: March"))),
+        ],
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["filename"] for item in results] == [
+        "invoice_2024.txt",
+        "notes.exe",
+        "9c1e.txt",
+    ]
+    assert results[0]["result"]["document_type"] == "invoice"
+    assert results[0]["result"]["classifier_name"] == "FilenameClassifier"
+    assert "File type not allowed" in results[1]["error"]["details"]
+    assert results[2]["result"]["document_type"] == "bank_statement"
+    assert results[2]["result"]["classifier_name"] == "RegexClassifier"
+
+
+def test_classify_files_expands_zip_archives(client):
+    import zipfile
+
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a/7f3e.txt", "Bill to: ACME Corp")
+        zf.writestr("a/licence.txt", "")
+    archive.seek(0)
+
+    response = client.post(
+        "/classify_files", files=[("files", ("batch.zip", archive))]
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [item["filename"] for item in results] == ["a/7f3e.txt", "a/licence.txt"]
+    assert [item["result"]["document_type"] for item in results] == [
+        "invoice",
+        "drivers_licence",
+    ]
+
+
+def test_classify_files_without_files(client):
+    response = client.post("/classify_files", files={})
+    assert response.status_code == 400
+    assert "No files provided" in response.json()["detail"]
+
+
+def test_classify_files_stream_yields_ndjson_lines(client):
+    import json
+
+    response = client.post(
+        "/classify_files/stream",
+        files=[
+            ("files", ("4d2a.txt", BytesIO(b"Amount due: $10"))),
+            ("files", ("bank_statement.txt", BytesIO(b"anything"))),
+        ],
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    # Filename matches are streamed before content matches
+    assert [line["index"] for line in lines] == [1, 0]
+    assert lines[0]["result"]["document_type"] == "bank_statement"
+    assert lines[1]["result"]["document_type"] == "invoice"
+
+
+def test_classify_files_stream_requires_multipart(client):
+    response = client.post("/classify_files/stream", json={})
+    assert response.status_code == 400
+
+
+def test_metrics_endpoint(client):
+    client.post(
+        "/classify_file",
+        files={"file": ("invoice_7.txt", BytesIO(b"INVOICE\nBill to: Jane"))},
+    )
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'heron_request_seconds_count{route="/classify_file"}' in body
+    assert 'heron_stage_seconds_count{stage="upload_parse"}' in body
+    assert "heron_decisions_total{" in body
+    assert "heron_cache_lookups_total{" in body
+
+
+def test_classifier_stats_endpoint(client):
+    client.post(
+        "/classify_file",
+        files={"file": ("3f2a9c.txt", BytesIO(b"INVOICE\nBill to: Jane"))},
+    )
+    response = client.get("/admin/classifier_stats")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "sequential"
+    names = [stage["classifier_name"] for stage in body["file_types"]["txt"]]
+    assert names == [
+        "FilenameClassifier",
+        "FuzzyClassifier",
+        "RegexClassifier",
+        "TFIDFClassifier",
+    ]
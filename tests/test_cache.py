@@ -0,0 +1,77 @@
+import pytest
+from fastapi import UploadFile
+from io import BytesIO
+from src.cache import ResultCache
+from src.classifier import classify_file
+from src.config import CacheConfig
+
+
+@pytest.fixture
+def cache():
+    """Create a small in-memory cache."""
+    return ResultCache(CacheConfig(max_entries=2), fingerprint="test")
+
+
+def test_cache_key_depends_on_content_filename_and_config(cache):
+    """Test that every key component changes the cache key."""
+    key = cache.make_key(b"content", "Invoice.pdf")
+    assert key == cache.make_key(b"content", "invoice.pdf")
+    assert key != cache.make_key(b"other content", "invoice.pdf")
+    assert key != cache.make_key(b"content", "statement.pdf")
+    other_config = ResultCache(CacheConfig(), fingerprint="changed")
+    assert key != other_config.make_key(b"content", "invoice.pdf")
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used(cache):
+    """Test that the memory tier evicts the least recently used entry."""
+    await cache.set("a", {"document_type": "invoice"})
+    await cache.set("b", {"document_type": "bank_statement"})
+    await cache.get("a")
+    await cache.set("c", {"document_type": "drivers_licence"})
+    assert await cache.get("a") is not None
+    assert await cache.get("b") is None
+    assert cache.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_entries(mocker):
+    """Test that entries are not served past their TTL."""
+    cache = ResultCache(CacheConfig(ttl_seconds=10), fingerprint="test")
+    clock = mocker.patch("src.cache.time.time", return_value=1000.0)
+    await cache.set("a", {"document_type": "invoice"})
+    clock.return_value = 1011.0
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_is_shared_between_instances(tmp_path):
+    """Test that a result written by one worker is visible to another."""
+    settings = CacheConfig(disk_path=str(tmp_path / "cache.sqlite3"))
+    worker = ResultCache(settings, fingerprint="test")
+    await worker.set("a", {"document_type": "invoice"})
+    other_worker = ResultCache(settings, fingerprint="test")
+    assert await other_worker.get("a") == {"document_type": "invoice"}
+    assert other_worker.stats["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_classify_file_reports_cache_hits(mocker):
+    """Test that a repeated upload is answered from the cache."""
+    mocker.patch(
+        "src.classifier.result_cache",
+        ResultCache(CacheConfig(), fingerprint="test"),
+    )
+    from src.snapshot import current
+
+    spy = mocker.spy(current().classifier, "classify")
+
+    def upload():
+        return UploadFile(file=BytesIO(b"Invoice number 42"), filename="a1b2.txt")
+
+    first = await classify_file(upload())
+    second = await classify_file(upload())
+    assert first.cached is False
+    assert second.cached is True
+    assert second.document_type == first.document_type == "invoice"
+    assert spy.call_count == 1
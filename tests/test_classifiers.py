@@ -101,3 +101,402 @@ async def test_classifier_empty_file():
     assert isinstance(result, ClassifierResult)
     assert result.document_type == "unknown"
     assert result.classifier_name == "FuzzyClassifier"
+
+
+@pytest.mark.asyncio
+async def test_composite_classifier_extracts_text_once(mocker):
+    """Test that content classifiers share a single text extraction."""
+    from src.extractors.text import TextExtractor
+
+    spy = mocker.spy(TextExtractor, "_extract_text_handler")
+    upload = UploadFile(
+        file=BytesIO(b"nothing to see here"), filename="3f2a9c.txt"
+    )
+    classifier = CompositeClassifier(
+        classifiers=[RegexClassifier(), TFIDFClassifier()]
+    )
+    await classifier.classify(upload)
+    assert spy.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_document_context_memoizes_extraction_errors(mocker):
+    """Test that a failed extraction is not retried by later classifiers."""
+    from src.document import DocumentContext
+    from src.extractors.text import TextExtractor
+
+    spy = mocker.spy(TextExtractor, "_extract_text_handler")
+    document = DocumentContext(
+        UploadFile(file=BytesIO(b"\xff\xfe\xfa"), filename="broken.txt")
+    )
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await document.get_text()
+    assert spy.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_regex_classifier_stops_at_first_matching_page(mocker):
+    """Test that priority regex matching leaves later PDF pages unextracted."""
+    from pathlib import Path
+    from src.document import DocumentContext
+
+    mocker.patch("src.document.config.extraction.stream_pages", True)
+    path = Path(__file__).parent.parent / "files" / "bank_statement_1.pdf"
+    document = DocumentContext(
+        UploadFile(file=BytesIO(path.read_bytes()), filename="3f2a9c.pdf")
+    )
+    result = await RegexClassifier().classify(document)
+    assert result.document_type == "bank_statement"
+    assert document.pages_processed == 1
+    assert document.page_count == 2
+
+
+@pytest.mark.asyncio
+async def test_tfidf_classifier_loads_saved_artifact(
+    tmp_path, sample_drivers_license_file
+):
+    """Test that a saved TF-IDF model can be loaded and used."""
+    path = str(tmp_path / "tfidf.joblib")
+    trained = TFIDFClassifier()
+    trained.train()
+    version = trained.save(path)
+
+    classifier = TFIDFClassifier()
+    classifier.load(path)
+    assert classifier.is_trained
+    assert classifier.model_version == version
+    result = await classifier.classify(sample_drivers_license_file)
+    assert result.document_type == "drivers_licence"
+
+
+def test_tfidf_classifier_rejects_artifact_for_other_config(tmp_path, mocker):
+    """Test that an artifact trained under another config fails to load."""
+    from src.classifiers.tfidf import ModelArtifactError
+    from src.config import AppConfig
+
+    path = str(tmp_path / "tfidf.joblib")
+    trained = TFIDFClassifier()
+    trained.train()
+    trained.save(path)
+
+    mocker.patch.object(AppConfig, "tfidf_fingerprint", return_value="changed")
+    with pytest.raises(ModelArtifactError):
+        TFIDFClassifier().load(path)
+
+
+def test_tfidf_classifier_trains_once_under_concurrency(mocker):
+    """Test that concurrent first calls fit the model only once."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    classifier = TFIDFClassifier()
+    spy = mocker.spy(classifier.classifier, "fit")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: classifier.train(), range(8)))
+    assert spy.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_hashing_classifier_updates_online(sample_drivers_license_file):
+    """Test that the hashing engine classifies and learns from new examples."""
+    from src.classifiers.hashing import HashingClassifier
+
+    classifier = HashingClassifier()
+    classifier.train()
+    version = classifier.model_version
+    result = await classifier.classify(sample_drivers_license_file)
+    assert result.document_type == "drivers_licence"
+    assert result.classifier_name == "HashingClassifier"
+
+    assert classifier.update(["opening balance closing balance"], ["bank_statement"])
+    assert classifier.model_version == f"{version}+1"
+    with pytest.raises(ValueError):
+        classifier.update(["purchase order"], ["purchase_order"])
+
+
+def test_hashing_classifier_artifact_round_trip(tmp_path):
+    """Test that a loaded hashing model can still be updated, and only loads
+    into its own engine."""
+    from src.classifiers.hashing import HashingClassifier
+    from src.classifiers.tfidf import ModelArtifactError
+
+    path = str(tmp_path / "hashing.joblib")
+    trained = HashingClassifier()
+    trained.train()
+    version = trained.save(path)
+
+    classifier = HashingClassifier()
+    classifier.load(path)
+    assert classifier.update(["statement period"], ["bank_statement"]) == (
+        f"{version}+1"
+    )
+    with pytest.raises(ModelArtifactError):
+        TFIDFClassifier().load(path)
+
+
+def test_multi_pattern_matcher_keeps_priority_semantics():
+    """Test that the single-pass matcher agrees with the per-pattern loop."""
+    import random
+    import re
+    from src.classifiers.matchers import MultiPatternMatcher
+    from src.config import config
+
+    patterns = config.regex_patterns.model_dump()
+    patterns["receipt"] = [r"ab+c", r"total +paid"]
+    compiled = {
+        doc_type: [re.compile(p, re.IGNORECASE) for p in sources]
+        for doc_type, sources in patterns.items()
+    }
+    matcher = MultiPatternMatcher(patterns)
+    # A quantified anchor character must not break the single-pass pattern
+    assert matcher._combined.pattern != "(?!)"
+    phrases = [
+        "abbbc",
+        "total   paid",
+        "Bill To",
+        "bank  statement",
+        "DL Number",
+        "driver id",
+        "account balance",
+        "statement period",
+        "INVOICE",
+        "lorem",
+        "ipsum",
+        "licence",
+    ]
+    rng = random.Random(7)
+    for _ in range(200):
+        text = " ".join(rng.choice(phrases) for _ in range(rng.randint(0, 6)))
+        expected = next(
+            (t for t, ps in compiled.items() if any(p.search(text) for p in ps)),
+            None,
+        )
+        assert matcher.first_match(text) == expected
+
+
+def test_multi_pattern_matcher_counts_every_type():
+    """Test that match counts are reported for every document type."""
+    from src.classifiers.matchers import MultiPatternMatcher
+
+    matcher = MultiPatternMatcher(
+        {"invoice": [r"invoice", r"bill\s*to"], "receipt": [r"\d+\s*paid"]}
+    )
+    counts = matcher.count_matches("Invoice 1; bill to x; invoice 2; 10 paid")
+    assert counts == {"invoice": 3, "receipt": 1}
+
+
+def test_filename_matcher_agrees_with_per_type_loops():
+    """Test that the precompiled filename matcher keeps the original answers."""
+    import random
+    from rapidfuzz import process
+    from src.classifiers.matchers import FilenameMatcher
+    from src.config import config
+
+    patterns = config.patterns.model_dump()
+    matcher = FilenameMatcher(patterns)
+    words = ["bank", "statement", "invoice", "licence", "scan", "id card", "2024"]
+    rng = random.Random(3)
+    filenames = [
+        "_".join(rng.choice(words) for _ in range(rng.randint(1, 3))) + ".pdf"
+        for _ in range(100)
+    ]
+
+    for filename, doc_type in zip(filenames, matcher.substring_matches(filenames)):
+        expected = next(
+            (t for t, ps in patterns.items() if any(p in filename for p in ps)),
+            None,
+        )
+        assert doc_type == expected
+
+    for filename, (doc_type, score) in zip(
+        filenames, matcher.fuzzy_matches(filenames)
+    ):
+        best_type, best_score = None, 0
+        for t, ps in patterns.items():
+            match = process.extractOne(filename, ps)
+            if match and match[1] > best_score:
+                best_type, best_score = t, match[1]
+        assert doc_type == best_type
+        assert score == pytest.approx(best_score)
+
+    cutoff = config.classifier.similarity_threshold
+    for filename, (doc_type, score) in zip(
+        filenames, matcher.fuzzy_matches(filenames, cutoff)
+    ):
+        assert (doc_type is not None) == (score >= cutoff)
+
+
+def test_aho_corasick_reports_lowest_label():
+    """Test that overlapping keywords resolve to the lowest label."""
+    from src.classifiers.matchers import AhoCorasick
+
+    automaton = AhoCorasick([("statement", 1), ("men", 2), ("ate", 0)])
+    assert automaton.first_label("bank_statement.pdf") == 0
+    assert automaton.first_label("payments.pdf") == 2
+    assert automaton.first_label("receipt.pdf") is None
+
+
+def test_classify_filenames_batch():
+    """Test batch filename classification falls through to the fuzzy stage."""
+    from src.classifier import classify_filenames
+
+    results = classify_filenames(["Invoice_1.pdf", "bank statment.pdf", "x.pdf"])
+    assert [r.document_type for r in results] == [
+        "invoice",
+        "bank_statement",
+        "unknown",
+    ]
+    assert results[0].classifier_name == "FilenameClassifier"
+    assert results[1].classifier_name == "FuzzyClassifier"
+
+
+def _fake_classifier(name, document_type, score, requires_content, delay=0.0):
+    """Build a classifier class called `name` returning a fixed vote."""
+    import asyncio
+    from src.classifiers.base import BaseClassifier
+
+    async def classify(self, file):
+        await asyncio.sleep(delay)
+        return ClassifierResult(
+            document_type=document_type, classifier_name=name, score=score
+        )
+
+    attributes = {"requires_content": requires_content, "classify": classify}
+    return type(name, (BaseClassifier,), attributes)()
+
+
+def _scoring_classifier(classifiers, **settings):
+    from src.classifiers.scoring import ScoringClassifier
+    from src.config import ScoringConfig
+
+    weights = {"Name": 1.0, "Regex": 1.0, "Model": 0.8, "Slow": 1.0}
+    return ScoringClassifier(classifiers, ScoringConfig(weights=weights, **settings))
+
+
+@pytest.mark.asyncio
+async def test_scoring_classifier_lets_content_overrule_filename(sample_file):
+    """Test that agreeing content classifiers outvote a filename match."""
+    classifier = _scoring_classifier(
+        [
+            _fake_classifier("Name", "invoice", 1.0, requires_content=False),
+            _fake_classifier("Regex", "bank_statement", 1.0, requires_content=True),
+            _fake_classifier("Model", "bank_statement", 0.9, requires_content=True),
+        ]
+    )
+    result = await classifier.classify(sample_file)
+    assert result.document_type == "bank_statement"
+    assert result.classifier_name == "Regex"
+    assert [vote.status for vote in result.votes] == ["completed"] * 3
+    assert result.votes[2].score == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_scoring_classifier_cancels_once_decided(sample_file):
+    """Test that classifiers still running are cancelled after a decisive lead."""
+    classifier = _scoring_classifier(
+        [
+            _fake_classifier("Name", "invoice", 1.0, requires_content=False),
+            _fake_classifier("Regex", "invoice", 1.0, requires_content=True),
+            _fake_classifier("Slow", "bank_statement", 1.0, True, delay=10),
+        ],
+        decision_margin=1.5,
+    )
+    result = await classifier.classify(sample_file)
+    assert result.document_type == "invoice"
+    assert [vote.status for vote in result.votes] == [
+        "completed",
+        "completed",
+        "cancelled",
+    ]
+    assert result.votes[2].elapsed_ms < 5000
+
+
+def test_classifier_stats_rank_by_cost_per_hit():
+    """Test that stages are ordered by latency over hit rate and rare ones skipped."""
+    from src.classifiers.stats import ClassifierStats
+    from src.config import AdaptiveConfig
+
+    chain = [
+        _fake_classifier("Name", "invoice", 1.0, requires_content=False),
+        _fake_classifier("Regex", "invoice", 1.0, requires_content=True),
+        _fake_classifier("Model", "invoice", 1.0, requires_content=True),
+    ]
+    stats = ClassifierStats()
+    for i in range(20):
+        stats.record("pdf", "Name", False, 0.0001, explored=True)
+        stats.record("pdf", "Regex", i % 2 == 0, 0.05, explored=True)
+        stats.record("pdf", "Model", True, 0.06, explored=True)
+    # Regex only runs here after Model missed, so these misses say nothing
+    # about its own hit rate and must not change the order
+    for _ in range(50):
+        stats.record("pdf", "Regex", False, 0.05)
+    settings = AdaptiveConfig(min_samples=10, explore_rate=0.0)
+
+    ranked = stats.rank("pdf", chain, settings)
+    assert [(c.__class__.__name__, skipped) for c, skipped in ranked] == [
+        ("Model", False),
+        ("Regex", False),
+        ("Name", True),
+    ]
+    plan, explore = stats.plan("pdf", chain, settings)
+    assert [c.__class__.__name__ for c in plan] == ["Model", "Regex"]
+    assert not explore
+    # Unmeasured file types keep the default order and explore
+    assert stats.plan("docx", chain, settings) == (chain, True)
+
+    pinned = AdaptiveConfig(pinned_order=["Name", "Regex"])
+    plan, explore = stats.plan("pdf", chain, pinned)
+    assert [c.__class__.__name__ for c in plan] == ["Name", "Regex"]
+    assert not explore
+
+
+@pytest.mark.asyncio
+async def test_adaptive_composite_does_not_record_failed_stages():
+    """Test that a stage that raises leaves its statistics unchanged."""
+    from src.classifiers.base import BaseClassifier
+    from src.classifiers.stats import ClassifierStats
+    from src.config import AdaptiveConfig
+    from src.extractors.executor import ExecutorSaturatedError
+
+    async def classify(self, file):
+        raise ExecutorSaturatedError("Extraction pool 'process' is saturated")
+
+    shed = type("Shed", (BaseClassifier,), {"classify": classify})()
+    stats = ClassifierStats()
+    stats.record("pdf", "Shed", True, 0.05, explored=True)
+    classifier = CompositeClassifier(
+        [shed, _fake_classifier("Regex", "invoice", 1.0, requires_content=True)],
+        stats,
+        AdaptiveConfig(min_samples=5, explore_rate=0.0),
+    )
+    for _ in range(5):
+        upload = UploadFile(file=BytesIO(b"x"), filename="3f2a9c.pdf")
+        assert (await classifier.classify(upload)).document_type == "invoice"
+
+    stage = stats.get("pdf", "Shed")
+    assert stage.samples == 1
+    assert stage.explored_hit_rate == 1.0
+    assert stats.get("pdf", "Regex").explored == 5
+
+
+@pytest.mark.asyncio
+async def test_adaptive_composite_skips_filename_stage_for_uuid_names(mocker):
+    """Test that a filename stage that never hits stops running."""
+    from src.classifiers.stats import ClassifierStats
+    from src.config import AdaptiveConfig
+
+    name_stage = _fake_classifier("Name", "unknown", None, requires_content=False)
+    spy = mocker.spy(type(name_stage), "classify")
+    classifier = CompositeClassifier(
+        [
+            name_stage,
+            _fake_classifier("Regex", "invoice", 1.0, requires_content=True),
+        ],
+        ClassifierStats(),
+        AdaptiveConfig(min_samples=5, explore_rate=0.0),
+    )
+    for _ in range(10):
+        upload = UploadFile(file=BytesIO(b"x"), filename="3f2a9c.pdf")
+        result = await classifier.classify(upload)
+        assert result.document_type == "invoice"
+    assert spy.call_count == 5
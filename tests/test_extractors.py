@@ -0,0 +1,249 @@
+import asyncio
+import os
+import pickle
+import time
+import pytest
+from src.config import ExecutorConfig
+from src.extractors.executor import (
+    PROCESS_POOL,
+    THREAD_POOL,
+    ExecutorSaturatedError,
+    ExtractionExecutor,
+)
+from src.extractors.text import TextExtractor
+
+
+@pytest.fixture
+def executor():
+    """Create an executor with a single slot per pool."""
+    pool = ExtractionExecutor(
+        ExecutorConfig(
+            process_workers=1,
+            thread_workers=1,
+            max_queue_depth=1,
+            job_timeout_seconds=0.2,
+        )
+    )
+    yield pool
+    pool.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_job_in_thread_pool(executor):
+    """Test that a job runs in the thread pool and returns its result."""
+    result = await executor.run(
+        THREAD_POOL, TextExtractor()._extract_text_handler, b" hello "
+    )
+    assert result == "hello"
+    assert executor.queue_depth(THREAD_POOL) == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_runs_job_in_process_pool(executor):
+    """Test that a job runs in a worker process."""
+    result = await executor.run(
+        PROCESS_POOL,
+        TextExtractor()._extract_text_handler,
+        b"invoice",
+        timeout=30,
+    )
+    assert result == "invoice"
+
+
+@pytest.mark.asyncio
+async def test_executor_times_out_slow_jobs(executor):
+    """Test that a job exceeding the per-job timeout is abandoned."""
+    with pytest.raises(TimeoutError):
+        await executor.run(THREAD_POOL, time.sleep, 1)
+    assert executor.queue_depth(THREAD_POOL) == 0
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_jobs_when_saturated(executor):
+    """Test that jobs are rejected once the queue depth is reached."""
+    running = asyncio.ensure_future(
+        executor.run(THREAD_POOL, time.sleep, 0.1, timeout=1)
+    )
+    await asyncio.sleep(0)
+    with pytest.raises(ExecutorSaturatedError):
+        await executor.run(THREAD_POOL, time.sleep, 0)
+    await running
+
+
+def _office_bytes(kind: str) -> bytes:
+    """Build a small DOCX or XLSX file in memory."""
+    from io import BytesIO
+
+    buffer = BytesIO()
+    if kind == "docx":
+        import docx
+
+        document = docx.Document()
+        document.add_paragraph("Invoice")
+        document.save(buffer)
+    else:
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        workbook.active["A1"] = "Invoice"
+        workbook.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (b"%PDF-1.7\n...", "application/pdf"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00", "image/png"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpeg"),
+        (b"hello world", None),
+    ],
+)
+def test_sniff_mime_type_signatures(content, expected):
+    from src.extractors.detection import sniff_mime_type
+
+    assert sniff_mime_type(content) == expected
+
+
+def test_sniff_mime_type_tells_office_formats_apart():
+    from src.extractors.detection import DOCX_MIME, XLSX_MIME, sniff_mime_type
+
+    assert sniff_mime_type(_office_bytes("docx")) == DOCX_MIME
+    assert sniff_mime_type(_office_bytes("xlsx")) == XLSX_MIME
+    # A zip header alone is left to libmagic
+    assert sniff_mime_type(_office_bytes("docx")[:2048]) is None
+
+
+def test_detect_mime_type_skips_libmagic_for_known_signatures(mocker):
+    from src.extractors import detection
+
+    handle = mocker.patch.object(detection, "_magic_handle")
+    assert detection.detect_mime_type(b"%PDF-1.4") == "application/pdf"
+    handle.assert_not_called()
+
+
+def test_factory_reuses_extractor_instances():
+    from io import BytesIO
+    from fastapi import UploadFile
+    from src.extractors.factory import TextExtractorFactory
+
+    first, second = (
+        TextExtractorFactory.get_extractor(
+            UploadFile(file=BytesIO(b"%PDF-1.4"), filename=name)
+        )
+        for name in ("a.pdf", "b.pdf")
+    )
+    assert first is second
+
+
+def test_spooled_uploads_are_mapped_not_copied():
+    """Test that spooled uploads are mapped and cross processes as a path."""
+    from fastapi import UploadFile
+    from src.extractors.detection import sniff_mime_type
+    from src.utils.content import MappedFile, read_upload
+    from src.utils.upload import spool_file
+
+    spool = spool_file()
+    spool.write(b" Invoice 42 ")
+    content = read_upload(UploadFile(file=spool, filename="a.txt"))
+
+    assert isinstance(content, MappedFile)
+    assert len(pickle.dumps(content)) < 200
+    assert TextExtractor()._extract_text_handler(content) == "Invoice 42"
+    assert sniff_mime_type(content) is None
+
+    # A job still running keeps the file after the upload is gone
+    content.retain()
+    spool.close()
+    content.close()
+    in_worker = pickle.loads(pickle.dumps(content))
+    assert TextExtractor()._extract_text_handler(in_worker) == "Invoice 42"
+    in_worker.close()
+    content.release()
+    assert not os.path.exists(content.path)
+
+
+def test_tabular_extractor_reads_only_top_of_each_sheet():
+    """Test that workbooks are cut to their leading rows and cells."""
+    from io import BytesIO
+    import openpyxl
+    from src.config import TabularConfig
+    from src.extractors.tabular import TabularExtractor
+
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Statement"
+    sheet.append(["Account", "Balance", "Currency"])
+    for row in range(2000):
+        sheet.append([f"ACC{row}", row, "GBP"])
+    workbook.create_sheet("Notes").append(["Closing balance"])
+    buffer = BytesIO()
+    workbook.save(buffer)
+
+    extractor = TabularExtractor()
+    extractor.settings = TabularConfig(max_rows=3, max_columns=2)
+    text = extractor._extract_text_handler(buffer.getvalue())
+
+    assert text == (
+        "Sheet: Statement\nAccount Balance\nACC0 0\nACC1 1\n\n"
+        "Sheet: Notes\nClosing balance"
+    )
+
+    extractor.settings = TabularConfig(max_cells=4)
+    assert extractor._extract_text_handler(buffer.getvalue()) == (
+        "Sheet: Statement\nAccount Balance Currency\nACC0"
+    )
+
+
+def test_csv_files_use_tabular_extractor():
+    """Test that CSV files, which sniff as plain text, are read as tables."""
+    from io import BytesIO
+    from fastapi import UploadFile
+    from src.config import TabularConfig
+    from src.extractors.factory import TextExtractorFactory
+    from src.extractors.tabular import TabularExtractor
+
+    content = b"Date;Description;Amount\n" + b"2024-01-02;Card payment;12.50\n" * 5000
+    extractor = TextExtractorFactory.get_extractor(
+        UploadFile(file=BytesIO(content), filename="export.csv"),
+        mime_type="text/plain",
+    )
+    assert isinstance(extractor, TabularExtractor)
+
+    tabular = TabularExtractor()
+    tabular.settings = TabularConfig(max_rows=2)
+    assert tabular._extract_text_handler(content) == (
+        "Date Description Amount\n2024-01-02 Card payment 12.50"
+    )
+
+
+def test_docx_extractor_reads_headers_tables_and_stops_at_budget():
+    """Test that headers, footers and tables are read, within the budget."""
+    from io import BytesIO
+    import docx
+    from src.extractors.docx import DocxExtractor
+
+    document = docx.Document()
+    section = document.sections[0]
+    section.header.paragraphs[0].text = "Invoice No. INV-0042"
+    section.footer.paragraphs[0].text = "Sort code 12-34-56"
+    paragraph = document.add_paragraph("Bill to:")
+    paragraph.paragraph_format.tab_stops.add_tab_stop(docx.shared.Inches(2))
+    paragraph.add_run().add_tab()
+    paragraph.add_run("Jane Doe")
+    table = document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = "Total"
+    table.cell(0, 1).text = "120.00"
+    for _ in range(1000):
+        document.add_paragraph("Terms and conditions apply.")
+    buffer = BytesIO()
+    document.save(buffer)
+
+    extractor = DocxExtractor()
+    text = extractor._extract_text_handler(buffer.getvalue())
+    assert text.startswith(
+        "Invoice No. INV-0042\nSort code 12-34-56\nBill to:\tJane Doe\nTotal\n120.00\n"
+    )
+
+    extractor.max_chars = 100
+    assert len(extractor._extract_text_handler(buffer.getvalue())) <= 100
@@ -0,0 +1,92 @@
+from io import BytesIO
+import pytest
+from fastapi.testclient import TestClient
+from src.cache import result_cache
+from src.classifiers.hashing import HashingClassifier
+from src.config import FeedbackConfig
+from src.feedback import FeedbackError, ModelRegistry, model_registry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Create a model registry in a temporary directory."""
+    registry = ModelRegistry(FeedbackConfig(directory=str(tmp_path), min_examples=2))
+    yield registry
+    registry.close()
+
+
+@pytest.mark.asyncio
+async def test_registry_learns_feedback_online_and_rolls_back(registry, monkeypatch):
+    """Test that feedback trains a new version that workers swap in and out."""
+    monkeypatch.setattr(result_cache, "model_version", "")
+    text = "Quarterly remittance advice for supplier payments"
+    registry.add(text, "invoice", "advice.txt", "a")
+    assert registry.add(text, "invoice", "advice.txt", "a") == (1, True)
+    live = HashingClassifier()
+    live.train()
+    assert await registry.train(live) is None
+
+    registry.add(text + " received", "invoice", "advice-2.txt", "b")
+    version = await registry.train(live)
+    base, trained = registry.versions()[1], registry.versions()[0]
+    assert trained["version"] == version and trained["examples"] == 2
+    assert registry.pending() == 0
+
+    assert await registry.sync(live) and live.model_version == version
+    assert not await registry.sync(live)
+    assert result_cache.model_version == version
+
+    assert registry.activate() == base["version"]
+    assert await registry.sync(live) and live.model_version == base["version"]
+    with pytest.raises(FeedbackError):
+        registry.activate()
+    with pytest.raises(FeedbackError):
+        registry.activate("unknown")
+
+
+def test_feedback_endpoint_updates_the_served_model(tmp_path, monkeypatch):
+    """Test recording feedback, training on it and rolling the model back."""
+    from src.app import app
+    from src.snapshot import current
+
+    text_classifier = current().text_classifier
+    model_registry.close()
+    monkeypatch.setattr(
+        model_registry, "settings", FeedbackConfig(directory=str(tmp_path))
+    )
+    monkeypatch.setattr(model_registry, "_skipped", None)
+    monkeypatch.setattr(result_cache, "model_version", "")
+    for name in ("vectorizer", "classifier", "model_version", "is_trained"):
+        monkeypatch.setattr(text_classifier, name, getattr(text_classifier, name))
+
+    def upload(content: bytes):
+        return {"file": ("7d1e0b.txt", BytesIO(content))}
+
+    try:
+        with TestClient(app) as client:
+            response = client.post(
+                "/feedback",
+                files=upload(b"Remittance advice\nSupplier: Acme"),
+                data={"document_type": "invoice"},
+            )
+            assert response.status_code == 202
+            assert response.json()["pending"] == 1
+
+            response = client.post(
+                "/feedback",
+                files=upload(b"Remittance advice"),
+                data={"document_type": "purchase_order"},
+            )
+            assert response.status_code == 422
+
+            model = client.post("/admin/model/train").json()
+            assert model["active"] == model["serving"]
+            assert model["pending"] == 0
+            assert [v["examples"] for v in model["versions"]] == [1, 0]
+
+            base = model["versions"][1]["version"]
+            model = client.post("/admin/model/rollback").json()
+            assert model["active"] == model["serving"] == base
+            assert client.post("/admin/model/rollback").status_code == 404
+    finally:
+        model_registry.close()
@@ -0,0 +1,161 @@
+import asyncio
+import os
+import time
+from io import BytesIO
+import pytest
+from fastapi.testclient import TestClient
+from src.config import JobsConfig
+from src.jobs import (
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    JobQueue,
+    QueueFullError,
+    job_queue,
+    submit_job,
+)
+from src.models import ClassificationResponse
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """Create a queue in a temporary directory."""
+    queue = JobQueue(
+        JobsConfig(
+            directory=str(tmp_path),
+            max_queued=2,
+            retry_backoff_seconds=0,
+            poll_interval_seconds=0.01,
+        )
+    )
+    yield queue
+    queue.close()
+
+
+def _add(queue: JobQueue, name: str, priority: int = 0):
+    """Queue a job for a stored file named after its key."""
+    path = queue.file_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(name.encode())
+    return queue.add(name, f"key-{name}", f"{name}.txt", priority)
+
+
+def test_queue_runs_higher_priority_first_and_deduplicates(queue):
+    """Test priority order, deduplication by key and backpressure."""
+    _add(queue, "low", priority=1)
+    _add(queue, "high", priority=5)
+    job, deduplicated = queue.add("again", "key-low", "low.txt", 9)
+    assert deduplicated and job["id"] == "low" and job["priority"] == 9
+
+    with pytest.raises(QueueFullError):
+        _add(queue, "third")
+
+    assert queue.claim()["id"] == "low"
+    assert queue.claim()["id"] == "high"
+    assert queue.claim() is None
+
+
+@pytest.mark.asyncio
+async def test_queue_retries_degraded_results(queue):
+    """Test that a job retried after a transient failure succeeds."""
+    calls = []
+
+    async def handler(path, filename):
+        calls.append(filename)
+        response = ClassificationResponse(
+            document_type="invoice", classifier_name="RegexClassifier"
+        )
+        if len(calls) == 1:
+            raise RuntimeError("worker crashed")
+        # The second run is degraded, the third is final
+        return response, len(calls) == 3
+
+    job, _ = _add(queue, "invoice")
+    queue.start(handler)
+    try:
+        deadline = time.monotonic() + 5
+        while queue.get(job["id"])["status"] not in (SUCCEEDED, FAILED):
+            assert time.monotonic() < deadline
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+
+    job = queue.get(job["id"])
+    assert job["status"] == SUCCEEDED
+    assert job["attempts"] == 3
+    assert ClassificationResponse.model_validate_json(job["result"]).document_type == (
+        "invoice"
+    )
+
+
+@pytest.mark.asyncio
+async def test_queue_returns_running_jobs_on_shutdown(queue):
+    """Test that stopping the workers puts their jobs back in the queue."""
+    started = asyncio.Event()
+
+    async def handler(path, filename):
+        started.set()
+        await asyncio.sleep(60)
+
+    job, _ = _add(queue, "scan")
+    queue.start(handler)
+    await asyncio.wait_for(started.wait(), 5)
+    await queue.stop()
+
+    job = queue.get(job["id"])
+    assert job["status"] == QUEUED
+    assert job["attempts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_resubmitting_a_failed_file_stores_it_again(queue, monkeypatch):
+    """Test that a duplicate keeps no file and a new job after a failure has one."""
+    from fastapi import UploadFile
+
+    monkeypatch.setattr("src.jobs.job_queue", queue)
+    upload = UploadFile(file=BytesIO(b"INVOICE"), filename="a.txt")
+    first = await submit_job(upload)
+    again = await submit_job(upload)
+    assert again.deduplicated and again.job_id == first.job_id
+    assert os.listdir(os.path.dirname(queue.file_path(first.job_id))) == [
+        first.job_id
+    ]
+
+    queue._finish(first.job_id, FAILED, error="Extraction failed")
+    retry = await submit_job(upload)
+    assert not retry.deduplicated
+    assert os.path.exists(queue.file_path(retry.job_id))
+
+
+def test_jobs_endpoint_classifies_in_the_background(tmp_path, monkeypatch):
+    """Test submitting a job, polling it and resubmitting the same file."""
+    job_queue.close()
+    settings = JobsConfig(directory=str(tmp_path), poll_interval_seconds=0.01)
+    monkeypatch.setattr(job_queue, "settings", settings)
+    from src.app import app
+
+    files = {"file": ("3f2a9c.txt", BytesIO(b"INVOICE\nBill to: Jane"))}
+    try:
+        with TestClient(app) as client:
+            response = client.post("/jobs", files=files, data={"priority": "5"})
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] in ("queued", "running", "succeeded")
+            assert job["priority"] == 5
+
+            deadline = time.monotonic() + 10
+            while job["status"] != "succeeded":
+                assert time.monotonic() < deadline
+                time.sleep(0.02)
+                job = client.get(f"/jobs/{job['job_id']}").json()
+            assert job["result"]["document_type"] == "invoice"
+
+            files["file"][1].seek(0)
+            again = client.post("/jobs", files=files).json()
+            assert again["job_id"] == job["job_id"]
+            assert again["deduplicated"] is True
+
+            assert client.get("/jobs/unknown").status_code == 404
+    finally:
+        job_queue.close()
@@ -0,0 +1,119 @@
+import time
+from io import BytesIO
+from pathlib import Path
+import pytest
+from PIL import Image
+from src.config import OCRConfig
+from src.extractors.executor import THREAD_POOL
+from src.extractors.pdf import PDFExtractor
+from src.ocr import engine
+from src.ocr.preprocess import dhash, load_image, preprocess
+
+SAMPLES = Path(__file__).parent.parent / "files"
+
+
+def _jpeg(size, dpi=None) -> bytes:
+    """Encode a sample licence photo at the given size."""
+    image = Image.open(SAMPLES / "drivers_license_3.jpg").convert("RGB").resize(size)
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", quality=90, **({"dpi": dpi} if dpi else {}))
+    return buffer.getvalue()
+
+
+def test_preprocess_downscales_large_photos_to_pixel_budget():
+    """Test that phone-sized photos are shrunk, grayscaled and binarised."""
+    settings = OCRConfig(max_pixels=1_000_000)
+    image = preprocess(load_image(_jpeg((4000, 3000)), settings), settings)
+    assert image.mode == "L"
+    assert image.width * image.height <= 1_000_000 * 1.01
+    assert set(image.getdata()) <= {0, 255}
+
+
+def test_preprocess_scales_scans_to_target_dpi():
+    """Test that a scan with a real DPI is brought to the target resolution."""
+    settings = OCRConfig(target_dpi=300, binarize=False)
+    content = _jpeg((600, 400), dpi=(150, 150))
+    image = preprocess(load_image(content, settings), settings)
+    assert image.size == (1200, 800)
+
+
+def test_dhash_is_stable_across_resolutions():
+    """Test that preprocessed copies of an image share a perceptual hash."""
+    settings = OCRConfig()
+    small, large = (
+        preprocess(load_image(_jpeg(size), settings), settings)
+        for size in ((1500, 954), (3000, 1908))
+    )
+    assert dhash(small, 16) == dhash(large, 16)
+    other = preprocess(
+        load_image((SAMPLES / "drivers_license_1.jpg").read_bytes(), settings),
+        settings,
+    )
+    assert dhash(other, 16) != dhash(small, 16)
+
+
+def test_recognize_caches_by_perceptual_hash(mocker):
+    """Test that a re-encoded image is not sent to the OCR engine again."""
+
+    class FakeEngine:
+        calls = 0
+
+        def recognize(self, image):
+            FakeEngine.calls += 1
+            return " DRIVER LICENSE \n"
+
+    settings = OCRConfig(engine="pytesseract", cache_max_entries=8)
+    mocker.patch.object(engine, "create_engine", return_value=FakeEngine())
+    mocker.patch.object(engine, "_engine", None)
+    assert engine.recognize(_jpeg((1500, 954)), settings) == "DRIVER LICENSE"
+    assert engine.recognize(_jpeg((3000, 1908)), settings) == "DRIVER LICENSE"
+    assert FakeEngine.calls == 1
+
+
+def _scanned_pdf(pages: int) -> bytes:
+    """Build a PDF whose pages are images without a text layer."""
+    image = Image.open(SAMPLES / "drivers_license_3.jpg").convert("RGB")
+    buffer = BytesIO()
+    image.save(
+        buffer, "PDF", save_all=True, append_images=[image] * (pages - 1)
+    )
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_pdf_extractor_ocrs_leading_scanned_pages(mocker):
+    """Test that image-only PDF pages are rendered within budget and OCRed."""
+    sizes = []
+
+    def fake_recognize(image, settings):
+        sizes.append(image.size)
+        return "DRIVER LICENSE"
+
+    mocker.patch.object(engine, "recognize_image", side_effect=fake_recognize)
+    extractor = PDFExtractor()
+    extractor.executor_pool = THREAD_POOL
+    extractor.ocr_settings = OCRConfig(pdf_max_pages=2, pdf_max_page_pixels=100_000)
+
+    batch = await extractor.extract_pages(_scanned_pdf(3))
+
+    assert batch.pages == ["DRIVER LICENSE", "DRIVER LICENSE", ""]
+    assert batch.total == 3
+    assert batch.ocr_pages == (0, 1)
+    assert not batch.partial
+    assert all(width * height <= 100_000 for width, height in sizes)
+
+
+@pytest.mark.asyncio
+async def test_pdf_extractor_gives_up_ocr_past_deadline(mocker):
+    """Test that OCR past the document's deadline is skipped and flagged."""
+    mocker.patch.object(engine, "recognize_image", return_value="text")
+    extractor = PDFExtractor()
+    extractor.executor_pool = THREAD_POOL
+
+    batch = await extractor.extract_pages(
+        _scanned_pdf(1), deadline=time.monotonic() - 1
+    )
+
+    assert batch.pages == [""]
+    assert batch.ocr_pages == ()
+    assert batch.partial
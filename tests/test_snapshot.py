@@ -0,0 +1,77 @@
+import json
+import pytest
+from src import snapshot
+from src.cache import result_cache
+from src.classifier import classify_filenames
+from src.config import ConfigFileError, ReloadConfig, load_config
+from src.snapshot import ConfigWatcher, classifier_stats, current
+
+
+def test_load_config_validates_the_file(tmp_path):
+    """Test that a file overrides some settings and invalid files are rejected."""
+    path = tmp_path / "heron.json"
+    path.write_text(json.dumps({"classifier": {"confidence_threshold": 0.5}}))
+    settings = load_config(str(path))
+    assert settings.classifier.confidence_threshold == 0.5
+    assert settings.classifier.text_engine == "tfidf"
+
+    path.write_text(json.dumps({"classifier": {"confidence_threshold": "high"}}))
+    with pytest.raises(ConfigFileError):
+        load_config(str(path))
+    path.write_text("{")
+    with pytest.raises(ConfigFileError):
+        load_config(str(path))
+    # A misspelt mode must not silently fall back to the default behaviour
+    for settings in ({"composite_mode": "scoreing"}, {"regex_mode": "most-matches"}):
+        path.write_text(json.dumps({"classifier": settings}))
+        with pytest.raises(ConfigFileError):
+            load_config(str(path))
+
+
+@pytest.mark.asyncio
+async def test_watcher_swaps_in_a_new_snapshot(tmp_path, monkeypatch):
+    """Test that a changed file is reloaded and a broken one is ignored."""
+    monkeypatch.setattr(snapshot, "_current", current())
+    monkeypatch.setattr(result_cache, "fingerprint", result_cache.fingerprint)
+    monkeypatch.setattr(classifier_stats, "decay", classifier_stats.decay)
+    previous = current()
+    if not previous.text_classifier.is_trained:
+        previous.text_classifier.prepare()
+    path = tmp_path / "heron.json"
+    watcher = ConfigWatcher(str(path), ReloadConfig())
+    assert not await watcher.check()
+
+    patterns = previous.settings.patterns.model_dump()
+    patterns["invoice"].append("remittance")
+    path.write_text(json.dumps({"patterns": patterns, "adaptive": {"decay": 0.9}}))
+    assert await watcher.check()
+    reloaded = current()
+    assert reloaded.version != previous.version
+    assert result_cache.fingerprint == reloaded.fingerprint
+    assert classifier_stats.decay == 0.9
+    # The text model does not depend on the patterns, so it is kept
+    assert reloaded.text_classifier.classifier is previous.text_classifier.classifier
+    assert [r.document_type for r in classify_filenames(["remittance.pdf"])] == [
+        "invoice"
+    ]
+    unchanged = classify_filenames(["remittance.pdf"], previous)
+    assert unchanged[0].document_type == "unknown"
+
+    # Sections that apply on restart do not change the served version
+    path.write_text(
+        json.dumps(
+            {
+                "patterns": patterns,
+                "adaptive": {"decay": 0.9},
+                "ocr": {"target_dpi": 150},
+            }
+        )
+    )
+    assert await watcher.check()
+    assert current().version == reloaded.version
+    assert current().settings.ocr == previous.settings.ocr
+    reloaded = current()
+
+    path.write_text(json.dumps({"classifier": {"composite_mode": "scoreing"}}))
+    assert not await watcher.check()
+    assert current() is reloaded